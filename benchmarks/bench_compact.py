@@ -0,0 +1,40 @@
+"""Benchmark: catlist.json vs. the compact columnar encoding.
+
+Run from the repo root:  python benchmarks/bench_compact.py
+Encodes the local catlist.json in memory, so no network is needed.
+"""
+
+import json
+import time
+from pathlib import Path
+
+from catime.compact import CompactCatlist, encode_catlist
+
+
+def bench(label: str, fn, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<24} {best * 1000:8.2f} ms")
+    return best
+
+
+def main():
+    raw = Path("catlist.json").read_text(encoding="utf-8")
+    cats = json.loads(raw)
+    compact = json.dumps(encode_catlist(cats), ensure_ascii=False, separators=(",", ":"))
+    print(f"catlist.json             {len(raw.encode()):>8} bytes  ({len(cats)} cats)")
+    print(f"catlist.compact.json     {len(compact.encode()):>8} bytes  "
+          f"({len(compact.encode()) / len(raw.encode()):.0%})")
+
+    before = bench("parse catlist.json", lambda: json.loads(raw))
+    after = bench("parse compact", lambda: CompactCatlist(json.loads(compact)))
+    bench("parse compact + latest", lambda: CompactCatlist(json.loads(compact))[-1])
+    bench("parse compact + all rows", lambda: list(CompactCatlist(json.loads(compact))), repeat=5)
+    print(f"parse speedup            {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
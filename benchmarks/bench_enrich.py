@@ -0,0 +1,45 @@
+"""Benchmark: enrich every cat of a month, linear scan vs. per-month number index.
+
+Run from the repo root:  python benchmarks/bench_enrich.py [YYYY-MM]
+Uses the local catlist.json and cats/YYYY-MM.json, so no network is needed.
+"""
+
+import sys
+import time
+
+from catime import cli
+
+
+def enrich_linear(cat: dict) -> dict:
+    """The previous enrich_cat: scan the month list for every cat."""
+    details = cli.fetch_detail(cat["timestamp"][:7], local=True)
+    detail = next((d for d in details if d.get("number") == cat.get("number")), None)
+    return {**cat, **detail} if detail else cat
+
+
+def bench(label: str, enrich, cats: list[dict], repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for cat in cats:
+            enrich(cat)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<14} {best * 1000:8.2f} ms  ({len(cats)} cats)")
+    return best
+
+
+def main():
+    cats = cli.load_local_catlist()
+    month = sys.argv[1] if len(sys.argv) > 1 else max(c["timestamp"][:7] for c in cats)
+    month_cats = cli.filter_by_query(cats, month)
+    # Warm both caches so only the lookup is measured.
+    cli.fetch_detail(month, local=True)
+    cli.fetch_detail_index(month, local=True)
+
+    before = bench("linear scan", enrich_linear, month_cats)
+    after = bench("number index", lambda c: cli.enrich_cat(c, local=True).detail, month_cats)
+    print(f"speedup        {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark: memory held by a 100k-entry catlist, dicts vs. Cat records.
+
+Run from the repo root:  python benchmarks/bench_memory.py [N]
+Builds a synthetic catlist shaped like the real one (a few dozen model
+strings, templated URLs, ~10% failures) and parses it with json.loads, as
+fetch_catlist does, so repeated strings are separate objects per entry.
+"""
+
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from catime import cli
+
+MODELS = [
+    "gemini-3-pro-image-preview",
+    "gemini-2.5-flash-image",
+    "gemini-2.5-flash-image (fallback from gemini-3-pro-image-preview, reason: timeout after 180.0s)",
+    "gpt-image-2 (codex-image-service / $imagegen)",
+]
+CHARACTERS = [("momo", "墨墨"), ("captain", "Captain"), ("mochi", "麻糬"), ("linlin", "鈴鈴")]
+
+
+def synthetic_catlist(n: int) -> str:
+    rng = random.Random(42)
+    start = 1767225600  # 2026-01-01 00:00 UTC
+    cats = []
+    for i in range(n):
+        ts = time.strftime("%Y-%m-%d %H:%M UTC", time.gmtime(start + i * 3600))
+        if rng.random() < 0.1:
+            cats.append({"number": None, "timestamp": ts, "url": None, "model": "all failed",
+                         "status": "failed", "error": "Failed to generate any images - All models failed."})
+            continue
+        cat = {
+            "number": i + 1, "timestamp": ts, "status": "success", "model": rng.choice(MODELS),
+            "url": f"https://github.com/yazelin/catime/releases/download/cats-{ts[:7]}/"
+                   f"cat_{ts[:10]}_{ts[11:13]}{ts[14:16]}_UTC.webp",
+            "title": f"貓咪 {i}", "inspiration": "original",
+        }
+        if rng.random() < 0.2:
+            cat["character"], cat["character_name"] = rng.choice(CHARACTERS)
+        cats.append(cat)
+    return json.dumps(cats, ensure_ascii=False)
+
+
+def measure(label: str, build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{label:<12} {size / 1e6:8.1f} MB")
+    return size, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    raw = synthetic_catlist(n)
+    print(f"{n} synthetic cats, {len(raw.encode()) / 1e6:.1f} MB of JSON")
+    before, dicts = measure("dicts", lambda: json.loads(raw))
+    del dicts
+    after, _ = measure("Cat records", lambda: cli.load_cats(json.loads(raw)))
+    print(f"saving       {1 - after / before:8.0%}  ({before / after:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@
   // raw.githubusercontent.com 429-throttles anonymous requests (60/hr per IP).
   const CATLIST_URL = "catlist.json";
   const CATS_BASE_URL = "cats/";
+  // Cats newer than the last compaction: one JSON record per line,
+  // {"index": <catlist entry>, "detail": <cats/YYYY-MM.json entry>}.
+  const JOURNAL_URL = "journal.jsonl";
   const LIKES_URL = "likes.json";
   const COMMENT_MAP_URL = "comment_map.json";
   const PAGE_SIZE = 20;
@@ -14,6 +17,7 @@
   let selectedDate = ""; // "YYYY-MM-DD" or ""
   let searchQuery = "";
   const detailCache = {}; // month -> detail array
+  const journalDetails = {}; // cat number -> detail not yet in its month file
   let likesData = {};    // "catNumber" -> count
   let commentMap = {};   // "catNumber" -> comment URL
 
@@ -124,8 +128,29 @@
     ));
   }
 
+  // Journal records, newest last; a missing or unreadable journal is empty.
+  function fetchJournal(bust) {
+    return fetch(JOURNAL_URL + (bust ? "?_=" + Date.now() : ""), { cache: "no-cache" })
+      .then(r => r.ok ? r.text() : "")
+      .then(text => text.split("\n").map(line => {
+        try { return JSON.parse(line); } catch { return null; }
+      }).filter(r => r && r.index && typeof r.index === "object"))
+      .catch(() => []);
+  }
+
+  // catlist.json followed by the journal's entries it does not have yet.
+  function withJournal(data, records) {
+    if (!Array.isArray(data)) return data;
+    const seen = new Set(data.map(c => c && c.timestamp));
+    records.forEach(r => {
+      if (r.detail && typeof r.detail.number !== "undefined") journalDetails[r.detail.number] = r.detail;
+      if (!seen.has(r.index.timestamp)) data.push(r.index);
+    });
+    return data;
+  }
+
   async function fetchCatlist() {
-    const resp = await fetch(CATLIST_URL);
+    const [resp, records] = await Promise.all([fetch(CATLIST_URL), fetchJournal(false)]);
     if (!resp.ok) throw new Error("HTTP " + resp.status);
     let data;
     try {
@@ -133,7 +158,7 @@
     } catch {
       throw new Error("Invalid JSON");
     }
-    return normalizeCatlist(data);
+    return normalizeCatlist(withJournal(data, records));
   }
 
   // Fetch data
@@ -172,8 +197,11 @@
   function checkForNewCats() {
     if (!allCats.length) return;
     const cachedMax = allCats.reduce((m, c) => Math.max(m, c.number || 0), 0);
-    fetch(CATLIST_URL + (CATLIST_URL.includes("?") ? "&" : "?") + "_=" + Date.now())
-      .then(r => r.ok ? r.json() : null)
+    Promise.all([
+      fetch(CATLIST_URL + (CATLIST_URL.includes("?") ? "&" : "?") + "_=" + Date.now()).then(r => r.ok ? r.json() : null),
+      fetchJournal(true),
+    ])
+      .then(([list, records]) => withJournal(list, records))
       .then(fresh => {
         if (!Array.isArray(fresh)) return;
         const newCats = fresh
@@ -650,7 +678,7 @@
         detailCache[month] = [];
       }
     }
-    return detailCache[month].find(d => d.number === cat.number) || {};
+    return detailCache[month].find(d => d.number === cat.number) || journalDetails[cat.number] || {};
   }
 
   function populateLightboxDetail(cat, detail) {
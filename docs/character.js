@@ -10,13 +10,23 @@
 
   var charUrl = 'characters/' + encodeURIComponent(charId) + '.json';
   var catlistUrl = 'catlist.json';
+  var journalUrl = 'journal.jsonl';
 
   Promise.all([
     fetch(charUrl).then(function (r) { if (!r.ok) throw new Error('Character not found'); return r.json(); }),
-    fetch(catlistUrl).then(function (r) { return r.ok ? r.json() : []; })
+    fetch(catlistUrl).then(function (r) { return r.ok ? r.json() : []; }),
+    // Cats newer than the last compaction, one {"index": ...} record per line.
+    fetch(journalUrl, { cache: 'no-cache' }).then(function (r) { return r.ok ? r.text() : ''; }).catch(function () { return ''; })
   ]).then(function (results) {
     var char = results[0];
-    var catlist = results[1];
+    var catlist = Array.isArray(results[1]) ? results[1] : [];
+    var seen = {};
+    catlist.forEach(function (e) { seen[e.timestamp] = true; });
+    results[2].split('\n').forEach(function (line) {
+      var record;
+      try { record = JSON.parse(line); } catch (e) { return; }
+      if (record && record.index && !seen[record.index.timestamp]) catlist.push(record.index);
+    });
     renderProfile(char);
     renderGallery(char, catlist);
   }).catch(function (err) {
@@ -1,6 +1,7 @@
 """Generate a cat image using nanobanana-py, upload as GitHub Release asset. Run by GitHub Actions hourly."""
 
 import asyncio
+import hashlib
 import json
 import os
 import random
@@ -8,10 +9,20 @@ import re
 import shutil
 import subprocess
 import sys
+import threading
 import time
-from datetime import datetime, timezone
+from datetime import UTC, datetime
 from pathlib import Path
 
+# Helpers shared with the catime CLI live in src/; the workflow runs this
+# script from a plain checkout without installing the package.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from catime.archive import Archive
+from catime.compact import COMPACT_NAME, write_compact
+from catime.journal import JOURNAL_NAME, append_record, index_entries, read_records
+from catime.shards import SHARD_DIR, write_shards
+from catime.stats import ROLLUP_PATH, load_rollup, update_rollup, write_rollup
+
 # ── gemini-web 自架 API 支援 ──
 # 設定 GEMINI_WEB_BASE_URL 環境變數即可將所有 API 呼叫導向自架的 gemini-web 服務
 # 例如：GEMINI_WEB_BASE_URL=https://ching-tech.ddns.net/gemini-web
@@ -42,6 +53,94 @@ def _patch_nanobanana():
 
 _patch_nanobanana()
 
+# ── Gemini rate limiting ──
+# Every Gemini text call in a run (news, style filter, summary, stage 1,
+# stage 2) takes a token from one shared bucket. Under GEMINI_RPM requests
+# per minute nothing waits; a 429 / RESOURCE_EXHAUSTED empties the bucket
+# and blocks further calls for the server's retry delay (or an exponential
+# backoff when it gives none).
+GEMINI_RPM = float(os.getenv("GEMINI_RPM") or 10)
+GEMINI_BACKOFF_BASE = 2.0
+GEMINI_BACKOFF_MAX = 60.0
+_RETRY_DELAY_RE = re.compile(r"retry(?:Delay)?['\"]?\s*(?:in|:)\s*['\"]?(\d+(?:\.\d+)?)s", re.IGNORECASE)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    text = str(error)
+    return getattr(error, "code", None) == 429 or "429" in text or "RESOURCE_EXHAUSTED" in text
+
+
+class GeminiRateLimiter:
+    """Thread-safe token bucket: `rpm` requests per minute, bursting up to `burst`."""
+
+    def __init__(self, rpm: float, burst: float | None = None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rpm / 60.0
+        self.capacity = float(burst or rpm)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._failures = 0
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token if one is free; otherwise return seconds to wait. Caller holds the lock."""
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                delay = self._take()
+            if delay <= 0:
+                return waited
+            self._sleep(delay)
+            waited += delay
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def back_off(self, error: Exception) -> float:
+        """Hold every caller back after a rate-limit error; returns the delay chosen."""
+        match = _RETRY_DELAY_RE.search(str(error))
+        with self._lock:
+            if match:
+                delay = min(float(match.group(1)), GEMINI_BACKOFF_MAX)
+            else:
+                delay = min(GEMINI_BACKOFF_MAX, GEMINI_BACKOFF_BASE * 2 ** self._failures)
+            self._failures += 1
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, self._clock() + delay)
+        print(f"  Gemini rate limited, holding requests for {delay:.1f}s.")
+        return delay
+
+
+GEMINI_LIMITER = GeminiRateLimiter(GEMINI_RPM)
+
+
+def gemini_generate(client, **kwargs):
+    """client.models.generate_content(**kwargs) through the shared rate limiter."""
+    GEMINI_LIMITER.acquire()
+    try:
+        response = client.models.generate_content(**kwargs)
+    except Exception as e:
+        if _is_rate_limited(e):
+            GEMINI_LIMITER.back_off(e)
+        raise
+    GEMINI_LIMITER.succeeded()
+    return response
+
 SUMMARY_PROMPT = (
     "You are analyzing recent AI-generated cat image prompts to identify repetitive patterns.\n\n"
     "Here are the most recent prompts and stories:\n{entries}\n\n"
@@ -56,7 +155,7 @@ SUMMARY_PROMPT = (
 
 NEWS_PROMPT = (
     "Search for today's interesting world news and current events.\n\n"
-    "Pick 3-5 news items that are:\n"
+    "Pick 12-15 news items that are:\n"
     "- Fun, heartwarming, quirky, cultural, scientific, sports, weather, travel, tourism, or lifestyle related\n"
     "- From DIFFERENT regions of the world\n"
     "- AVOID: war, terrorism, political controversy, violent crime, natural disasters with casualties\n\n"
@@ -217,8 +316,8 @@ STYLE_FILTER_PROMPT = (
 )
 
 
-def _filter_styles_with_ai(styles: dict, avoid_list: list[str]) -> dict[str, set[int]]:
-    """Use Gemini Flash to determine which style indices to exclude per category."""
+def _filter_styles_with_ai(styles: dict, avoid_list: list[str]) -> dict[str, set[int]] | None:
+    """Use Gemini Flash to determine which style indices to exclude per category; None if the call fails."""
     # Format style options for the prompt
     lines = []
     for category, entries in styles.items():
@@ -229,14 +328,15 @@ def _filter_styles_with_ai(styles: dict, avoid_list: list[str]) -> dict[str, set
 
     try:
         client = _create_genai_client()
-        response = client.models.generate_content(
+        response = gemini_generate(
+            client,
             model="gemini-2.5-flash",
             contents=STYLE_FILTER_PROMPT.format(avoid_list=avoid_text, style_options=style_options),
             config={"response_mime_type": "application/json"},
         )
         # Parse with no required keys — partial results are fine
         result = parse_ai_response_generic(response.text, [])
-        if result and isinstance(result, dict):
+        if isinstance(result, dict):
             excluded = {}
             for category in styles:
                 indices = result.get(category, [])
@@ -249,7 +349,46 @@ def _filter_styles_with_ai(styles: dict, avoid_list: list[str]) -> dict[str, set
             return excluded
     except Exception as e:
         print(f"Style filter AI call failed ({e}), skipping filter.")
-    return {}
+    return None
+
+
+# The AI exclusions depend only on the avoid list (which changes every 5
+# cats) and the style files, so they are memoized in the repo and reused
+# until one of them changes.
+STYLE_FILTER_CACHE = Path("style_filter_cache.json")
+STYLE_FILTER_CACHE_MAX = 8
+
+
+def _style_filter_key(styles: dict, avoid_list: list[str]) -> str:
+    """Hash of everything the AI style filter's answer depends on."""
+    payload = {
+        "avoid_list": avoid_list,
+        "styles": styles,
+        "blocklist": safe_load_json(Path(__file__).parent / "style_blocklist.json", {}),
+        "prompt": STYLE_FILTER_PROMPT,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def filter_styles_memoized(styles: dict, avoid_list: list[str]) -> dict[str, set[int]]:
+    """_filter_styles_with_ai, answered from style_filter_cache.json when the inputs are unchanged."""
+    key = _style_filter_key(styles, avoid_list)
+    cache = load_json_dict(STYLE_FILTER_CACHE)
+    hit = cache.get(key)
+    if isinstance(hit, dict) and isinstance(hit.get("excluded"), dict):
+        print("Style filter: inputs unchanged, reusing cached exclusions.")
+        return {category: set(indices) for category, indices in hit["excluded"].items()}
+
+    excluded = _filter_styles_with_ai(styles, avoid_list)
+    if excluded is None:  # the AI call failed: skip the filter and try again next run
+        return {}
+    cache[key] = {
+        "excluded": {category: sorted(indices) for category, indices in excluded.items()},
+        "created_at": datetime.now(UTC).strftime("%Y-%m-%d %H:%M UTC"),
+    }
+    newest = sorted(cache.items(), key=lambda item: str(item[1].get("created_at", "")))
+    atomic_write_json(STYLE_FILTER_CACHE, dict(newest[-STYLE_FILTER_CACHE_MAX:]))
+    return excluded
 
 
 def pick_random_styles(avoid_list: list[str] | None = None) -> dict:
@@ -260,7 +399,7 @@ def pick_random_styles(avoid_list: list[str] | None = None) -> dict:
     styles = load_style_reference()
     if not styles:
         return {}
-    excluded = _filter_styles_with_ai(styles, avoid_list) if avoid_list else {}
+    excluded = filter_styles_memoized(styles, avoid_list) if avoid_list else {}
     bl = load_style_blocklist()
     picks = {}
     for category, entries in styles.items():
@@ -385,7 +524,7 @@ def select_character(now: datetime) -> dict | None:
         if not last:
             return True
         try:
-            last_dt = datetime.strptime(last, "%Y-%m-%d %H:%M UTC").replace(tzinfo=timezone.utc)
+            last_dt = datetime.strptime(last, "%Y-%m-%d %H:%M UTC").replace(tzinfo=UTC)
             return (now - last_dt).total_seconds() > cooldown_hours * 3600
         except ValueError:
             return True
@@ -603,6 +742,49 @@ def load_monthly_detail(month: str) -> list:
     return load_json_list(month_path)
 
 
+# The creative-notes summary reads the newest prompts from this small ring
+# file, which update_catlist_and_push() appends to, instead of walking the
+# catlist and whole monthly detail files.
+RECENT_PROMPTS = Path("recent_prompts.json")
+RECENT_PROMPTS_MAX = 20
+CREATIVE_NOTES_WINDOW = 10
+
+
+def _recent_record(detail: dict) -> dict:
+    return {k: detail.get(k, "") for k in ("number", "prompt", "story", "idea")}
+
+
+def rebuild_recent_prompts(limit: int = RECENT_PROMPTS_MAX) -> list[dict]:
+    """The newest `limit` prompt records from the journal and monthly detail files, oldest first."""
+    records = [r["detail"] for r in read_records(JOURNAL) if r.get("detail", {}).get("prompt")]
+    for month_path in sorted(Path("cats").glob("*.json"), reverse=True):
+        records = [d for d in load_monthly_detail(month_path.stem) if isinstance(d, dict) and d.get("prompt")] + records
+        if len(records) >= limit:
+            break
+    return [_recent_record(d) for d in records[-limit:]]
+
+
+def load_recent_prompts() -> list[dict]:
+    """Contents of the ring file, rebuilt from the detail files if it is missing."""
+    records = safe_load_json(RECENT_PROMPTS, None)
+    if isinstance(records, list):
+        return records
+    records = rebuild_recent_prompts()
+    if records:
+        atomic_write_json(RECENT_PROMPTS, records)
+    return records
+
+
+def append_recent_prompt(entry: dict) -> bool:
+    """Push a new cat's prompt/story/idea into the ring file; returns whether it was written."""
+    if not entry.get("prompt"):
+        return False
+    records = [r for r in load_recent_prompts() if r.get("number") != entry.get("number")]
+    records.append(_recent_record(entry))
+    atomic_write_json(RECENT_PROMPTS, records[-RECENT_PROMPTS_MAX:])
+    return True
+
+
 def maybe_update_creative_notes(cat_number: int) -> dict:
     """Update creative_notes.json every 5 cats. Returns current notes."""
     notes = load_creative_notes()
@@ -611,26 +793,7 @@ def maybe_update_creative_notes(cat_number: int) -> dict:
         return notes
 
     print(f"Cat #{cat_number} is a multiple of 5, updating creative notes...")
-    catlist_path = Path("catlist.json")
-    if not catlist_path.exists():
-        return notes
-
-    cats = load_json_list(catlist_path)
-    # Collect recent months from index timestamps (newest last)
-    months = sorted({
-        c["timestamp"][:7]
-        for c in cats
-        if isinstance(c, dict)
-        and c.get("status", "success") == "success"
-        and isinstance(c.get("timestamp"), str)
-    })
-    # Load details from recent months until we have enough entries
-    all_details = []
-    for month in reversed(months):
-        all_details = load_monthly_detail(month) + all_details
-        if sum(1 for c in all_details if c.get("prompt")) >= 10:
-            break
-    recent = [c for c in all_details if c.get("prompt")][-10:]
+    recent = [r for r in load_recent_prompts() if r.get("prompt")][-CREATIVE_NOTES_WINDOW:]
     if not recent:
         return notes
 
@@ -641,7 +804,8 @@ def maybe_update_creative_notes(cat_number: int) -> dict:
 
     try:
         client = _create_genai_client()
-        response = client.models.generate_content(
+        response = gemini_generate(
+            client,
             model="gemini-2.5-flash",
             contents=SUMMARY_PROMPT.format(entries=entries_text),
             config={"response_mime_type": "application/json"},
@@ -650,7 +814,7 @@ def maybe_update_creative_notes(cat_number: int) -> dict:
         if result and isinstance(result["avoid_list"], list):
             notes = {
                 "avoid_list": result["avoid_list"],
-                "updated_at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
+                "updated_at": datetime.now(UTC).strftime("%Y-%m-%d %H:%M UTC"),
             }
             Path("creative_notes.json").write_text(
                 json.dumps(notes, indent=2, ensure_ascii=False) + "\n"
@@ -675,7 +839,8 @@ def fetch_news_inspiration() -> list[str]:
     for attempt in range(2):
         try:
             client = _create_genai_client()
-            response = client.models.generate_content(
+            response = gemini_generate(
+                client,
                 model="gemini-2.5-flash",
                 contents=NEWS_PROMPT,
                 config=types.GenerateContentConfig(
@@ -686,31 +851,144 @@ def fetch_news_inspiration() -> list[str]:
             print(f"  [DEBUG] News raw response ({len(raw) if raw else 'None'}): {(raw or '')[:500]}")
             result = parse_ai_response_generic(raw, ["news"])
             if result and isinstance(result["news"], list):
-                news = result["news"][:5]
+                news = result["news"][:NEWS_POOL_FETCH]
                 for i, item in enumerate(news, 1):
                     print(f"  News {i}: {item[:80]}...")
                 return news
             if attempt == 0:
-                print("  News parse failed (attempt 1), retrying in 3s...")
-                time.sleep(3)
+                print("  News parse failed (attempt 1), retrying...")
             else:
                 print("  News parse failed (attempt 2), skipping news inspiration.")
         except Exception as e:
             if attempt == 0:
-                print(f"  News fetch failed ({e}), retrying in 3s...")
-                time.sleep(3)
+                print(f"  News fetch failed ({e}), retrying...")
             else:
                 print(f"  News fetch failed ({e}), skipping news inspiration.")
     return []
 
 
-def generate_prompt_and_story(timestamp: str, creative_notes: dict, character: dict | None = None) -> dict:
+# Fetched news is pooled in the repo and reused for NEWS_TTL_HOURS; each run
+# takes the NEWS_SAMPLE_SIZE items that were used least recently. A refresh
+# merges new items ahead of the old ones, keeping at most NEWS_POOL_MAX.
+NEWS_CACHE = Path("news_cache.json")
+NEWS_TTL_HOURS = float(os.getenv("NEWS_TTL_HOURS") or 6)
+NEWS_SAMPLE_SIZE = 3
+NEWS_POOL_FETCH = 15
+NEWS_POOL_MAX = 30
+
+
+def get_news_inspiration(now: datetime | None = None) -> list[str]:
+    """News items for this run, from the cached pool while it is fresh."""
+    now = now or datetime.now(UTC)
+    stamp = now.strftime("%Y-%m-%d %H:%M UTC")
+    cache = load_json_dict(NEWS_CACHE)
+    pool = [item for item in cache.get("items", []) if isinstance(item, str)]
+    try:
+        fetched_at = datetime.strptime(cache.get("fetched_at", ""), "%Y-%m-%d %H:%M UTC").replace(tzinfo=UTC)
+        fresh = (now - fetched_at).total_seconds() < NEWS_TTL_HOURS * 3600
+    except (TypeError, ValueError):
+        fresh = False
+
+    used = cache.get("used") if isinstance(cache.get("used"), dict) else {}
+    if fresh and pool:
+        print(f"Stage 0: Using cached news from {cache['fetched_at']} ({len(pool)} items).")
+    else:
+        news = fetch_news_inspiration()
+        if news:
+            pool = list(dict.fromkeys(news + pool))[:NEWS_POOL_MAX]
+            cache["fetched_at"] = stamp
+        elif pool:
+            print("  Reusing the stale news pool.")
+        else:
+            return []
+
+    # Least recently used first; never-used items ("") lead, ties broken at random.
+    # At least one item is left out, so even a tiny pool rotates between runs.
+    ranked = sorted(pool, key=lambda item: (used.get(item, ""), random.random()))
+    picks = ranked[:max(1, min(NEWS_SAMPLE_SIZE, len(pool) - 1))]
+    cache.update({
+        "items": pool,
+        "used": {item: (stamp if item in picks else used[item]) for item in pool if item in picks or item in used},
+    })
+    atomic_write_json(NEWS_CACHE, cache)
+    return picks
+
+
+def roll_news_inspiration() -> list[str]:
+    """Stage 0: news inspiration for 70% of runs; the other 30% are forced original."""
+    if random.random() < 0.30:
+        print("Inspiration roll: forced original (30% chance)")
+        return []
+    return get_news_inspiration()
+
+
+# ── Pre-generation stage graph ──
+#
+#   creative_notes ──► styles ──┐
+#   character ──────────────────┼──► stage 1 (idea) ──► stage 2 (render)
+#   news ───────────────────────┘
+#
+# Everything left of stage 1 is prepared by prepare_generation_inputs();
+# stages with no path between them run concurrently. The Gemini calls are
+# blocking, so threads overlap their network waits.
+
+
+def run_stages(stages: dict, max_workers: int = 4) -> dict:
+    """Run a stage graph {name: (deps, fn)} on a thread pool.
+
+    A stage starts as soon as all of its deps have finished and is called
+    with their results as keyword arguments. Returns {name: result}; a
+    stage's exception propagates. Raises ValueError for unknown or cyclic
+    dependencies.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    results: dict = {}
+    pending = dict(stages)
+    running: dict = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for name, (deps, fn) in list(pending.items()):
+                if all(dep in results for dep in deps):
+                    del pending[name]
+                    running[pool.submit(fn, **{dep: results[dep] for dep in deps})] = name
+            if not running:
+                raise ValueError(f"Unsatisfiable stage dependencies: {', '.join(sorted(pending))}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return results
+
+
+def prepare_generation_inputs(next_number: int, now: datetime) -> dict:
+    """Run the pre-generation stages; returns creative_notes, character, news and styles."""
+    started = time.monotonic()
+    inputs = run_stages({
+        "creative_notes": ((), lambda: maybe_update_creative_notes(next_number)),
+        "character": ((), lambda: select_character(now)),
+        "news": ((), roll_news_inspiration),
+        "styles": (("creative_notes",), lambda creative_notes: pick_random_styles(creative_notes.get("avoid_list", []))),
+    })
+    print(f"Pre-generation stages done in {time.monotonic() - started:.1f}s.")
+    return inputs
+
+
+def generate_prompt_and_story(
+    timestamp: str,
+    creative_notes: dict,
+    character: dict | None = None,
+    news: list[str] | None = None,
+    style_picks: dict | None = None,
+) -> dict:
     """Three-stage prompt generation: news -> idea -> render.
 
     Stage 0: NEWS_PROMPT + Google Search -> [news summaries] (optional inspiration)
     Stage 1: IDEA_PROMPT + avoid_list + news -> {"idea": ..., "story": ...}
     Stage 2: RENDER_PROMPT + idea + story + timestamp -> {"prompt": ...}
 
+    `news` and `style_picks` come from prepare_generation_inputs(); when
+    omitted they are fetched here, one after the other.
+
     Returns: {'prompt': str, 'story': str, 'idea': str, 'avoid_list': list, 'news_inspiration': list}
     """
     avoid_list = creative_notes.get("avoid_list", [])
@@ -722,12 +1000,8 @@ def generate_prompt_and_story(timestamp: str, creative_notes: dict, character: d
             f"{bullets}\n\n"
         )
 
-    # Stage 0: Fetch news inspiration (70% chance; 30% force original)
-    if random.random() < 0.30:
-        print("Inspiration roll: forced original (30% chance)")
-        news = []
-    else:
-        news = fetch_news_inspiration()
+    if news is None:
+        news = roll_news_inspiration()
     news_section = ""
     if news:
         bullets = "\n".join(f"- {item}" for item in news)
@@ -743,7 +1017,8 @@ def generate_prompt_and_story(timestamp: str, creative_notes: dict, character: d
     character_render_section = format_character_for_render(character) if character else ""
 
     # Pick random styles from style_reference.json, filtering out avoided styles
-    style_picks = pick_random_styles(avoid_list)
+    if style_picks is None:
+        style_picks = pick_random_styles(avoid_list)
     style_section = format_style_suggestion(style_picks)
     style_snippets = format_style_prompt_snippet(style_picks)
     style_snippets_section = f"Style reference snippets: {style_snippets}\n" if style_snippets else ""
@@ -771,10 +1046,6 @@ def generate_prompt_and_story(timestamp: str, creative_notes: dict, character: d
         'season': season,
     }
 
-    # Brief delay between API calls to avoid rate limiting
-    if news:
-        time.sleep(2)
-
     # Stage 1: Generate idea and story
     print(f"Stage 1: Generating idea (avoid_list has {len(avoid_list)} items, news has {len(news)} items)...")
     idea = ""
@@ -787,7 +1058,8 @@ def generate_prompt_and_story(timestamp: str, creative_notes: dict, character: d
         idea_input = character_idea_section + "\n" + idea_input
     for attempt in range(2):
         try:
-            response = client.models.generate_content(
+            response = gemini_generate(
+                client,
                 model="gemini-2.5-flash",
                 contents=idea_input,
                 config={"response_mime_type": "application/json"},
@@ -811,29 +1083,25 @@ def generate_prompt_and_story(timestamp: str, creative_notes: dict, character: d
                 print(f"Story: {story[:80]}...")
                 break
             if attempt == 0:
-                print(f"  Stage 1 parse failed (attempt 1), retrying in 3s... Raw: {(raw1 or '')[:300]}")
-                time.sleep(3)
+                print(f"  Stage 1 parse failed (attempt 1), retrying... Raw: {(raw1 or '')[:300]}")
             else:
                 print(f"  Stage 1 parse failed (attempt 2), using fallback. Raw: {(raw1 or '')[:300]}")
                 return fallback
         except Exception as e:
             if attempt == 0:
-                print(f"  Stage 1 failed ({e}), retrying in 3s...")
-                time.sleep(3)
+                print(f"  Stage 1 failed ({e}), retrying...")
             else:
                 print(f"  Stage 1 failed ({e}), using fallback.")
                 return fallback
 
-    # Brief delay between API calls to avoid rate limiting
-    time.sleep(2)
-
     # Stage 2: Convert idea to image prompt
     print("Stage 2: Converting idea to image prompt...")
     try:
         render_input = RENDER_PROMPT.format(idea=idea, story=story, timestamp=timestamp, style_snippets_section=style_snippets_section)
         if character_render_section:
             render_input = render_input + "\n" + character_render_section
-        response = client.models.generate_content(
+        response = gemini_generate(
+            client,
             model="gemini-2.5-flash",
             contents=render_input,
             config={"response_mime_type": "application/json"},
@@ -947,8 +1215,8 @@ async def _generate_via_codex_image_service(
 ) -> dict:
     """Use the self-hosted codex-image-service (Codex CLI behind FastAPI + nginx)."""
     import json as _json
-    import urllib.request
     import urllib.error
+    import urllib.request
 
     base_url = (os.environ.get("CODEX_IMAGE_BASE_URL") or "").rstrip("/")
     api_key = os.environ.get("CODEX_IMAGE_KEY") or ""
@@ -1264,41 +1532,185 @@ def post_issue_comment(issue_number: str, image_url: str, number: int, timestamp
     return None
 
 
-def update_catlist_and_push(entry: dict) -> int:
-    """Update catlist.json and monthly detail file, commit and push."""
-    index_fields = {"number", "timestamp", "url", "model", "status", "error", "title", "inspiration", "character", "character_name", "is_seasonal", "season"}
-    detail_fields = {"number", "prompt", "story", "idea", "title", "inspiration", "news_inspiration", "avoid_list", "style_picks", "comment_id", "character", "character_name", "is_seasonal", "season"}
+# New cats are appended to journal.jsonl (mirrored to docs/ for the gallery)
+# and published in the month shard, shard manifest and stats rollup on every
+# run. compact_journal() folds the journal into the full catlist.json and the
+# monthly detail files every CATLIST_COMPACT_EVERY entries, when a new month
+# starts, or on demand with `generate_cat.py --compact`.
+JOURNAL = Path(JOURNAL_NAME)
+CATLIST_COMPACT_EVERY = max(1, int(os.getenv("CATLIST_COMPACT_EVERY") or 6))
+
+# Run state: the few numbers an hourly run needs (next number, last
+# successful hour, ...), so it never parses the whole catlist for them.
+# The catlist and journal sizes tie the record to the data it was built
+# from; a mismatch (hand edit, merge) rebuilds it.
+# `generate_cat.py --check-state` verifies it against a full rebuild.
+RUN_STATE = Path("run_state.json")
+RUN_STATE_VERSION = 1
+
+
+def advance_run_state(state: dict, entry: dict) -> dict:
+    """State after appending one catlist entry."""
+    state = dict(state)
+    state["entries"] += 1
+    if entry.get("number") is not None:
+        state["last_number"] = entry["number"]
+    timestamp = entry.get("timestamp")
+    if entry.get("status", "success") == "success":
+        state["successes"] += 1
+        if isinstance(timestamp, str):
+            state["last_success_hour"] = timestamp[:13]
+            state["last_month_file"] = f"cats/{timestamp[:7]}.json"
+    else:
+        state["failures"] += 1
+    if isinstance(timestamp, str):
+        state["last_timestamp"] = timestamp
+    return state
+
+
+def build_run_state(cats: list) -> dict:
+    state = {
+        "version": RUN_STATE_VERSION,
+        "entries": 0,
+        "successes": 0,
+        "failures": 0,
+        "last_number": None,
+        "last_timestamp": None,
+        "last_success_hour": None,
+        "last_month_file": None,
+    }
+    for cat in cats:
+        if isinstance(cat, dict):
+            state = advance_run_state(state, cat)
+    return state
+
+
+def _data_stamp() -> dict:
+    return {
+        name: path.stat().st_size if path.exists() else 0
+        for name, path in (("catlist_bytes", Path("catlist.json")), ("journal_bytes", JOURNAL))
+    }
+
+
+def load_all_index_entries() -> list:
+    """catlist.json followed by the not yet compacted journal entries."""
+    return load_json_list(Path("catlist.json")) + index_entries(read_records(JOURNAL))
+
+
+def write_run_state(state: dict) -> None:
+    atomic_write_json(RUN_STATE, {**state, **_data_stamp()})
+
+
+def load_run_state() -> dict:
+    """Run state for the current catlist and journal, rebuilt when stale."""
+    state = load_json_dict(RUN_STATE)
+    stamp = _data_stamp()
+    if state.get("version") == RUN_STATE_VERSION and all(state.get(k) == v for k, v in stamp.items()):
+        return state
+    state = build_run_state(load_all_index_entries())
+    if any(stamp.values()):
+        write_run_state(state)
+    return state
+
+
+def check_run_state() -> bool:
+    """Compare run_state.json with a rebuild from the catlist and journal, repairing it if they differ."""
+    expected = {**build_run_state(load_all_index_entries()), **_data_stamp()}
+    actual = load_json_dict(RUN_STATE)
+    if actual == expected:
+        print(f"{RUN_STATE} is consistent ({expected['entries']} entries).")
+        return True
+    for key in sorted(set(actual) | set(expected)):
+        if actual.get(key) != expected.get(key):
+            print(f"{RUN_STATE}: {key} = {actual.get(key)!r}, expected {expected.get(key)!r}")
+    atomic_write_json(RUN_STATE, expected)
+    print(f"Rebuilt {RUN_STATE} from catlist.json and {JOURNAL}.")
+    return False
+
+
+# Mirror data files into docs/ so GitHub Pages serves them same-origin —
+# anonymous raw.githubusercontent.com requests get 429-throttled (60/hr per IP).
+def mirror_to_docs(src: Path) -> str:
+    dst = Path("docs") / src
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(src, dst)
+    return str(dst)
+
+
+def compact_journal() -> list[str]:
+    """Fold journal.jsonl into catlist.json, the monthly detail files and
+    their derived views, then empty it; returns the paths written."""
+    records = read_records(JOURNAL)
+    if not records:
+        return []
 
-    # Write lightweight index entry to catlist.json
     catlist_path = Path("catlist.json")
-    cats = load_json_list(catlist_path)
-    index_entry = {k: entry[k] for k in index_fields if k in entry}
-    cats.append(index_entry)
+    cats = load_json_list(catlist_path) + index_entries(records)
     atomic_write_json(catlist_path, cats)
+    written = ["catlist.json", mirror_to_docs(catlist_path)]
+    compact_path = Path(COMPACT_NAME)
+    write_compact(cats, compact_path)
+    written += [str(compact_path), mirror_to_docs(compact_path)]
+    # Per-month shards + manifest let clients skip the full history (only the
+    # current month's shard changes on a normal compaction).
+    for shard_path in write_shards(cats, Path(SHARD_DIR)):
+        written += [str(shard_path), mirror_to_docs(shard_path)]
+    # Stats rollup: fold in just the new entries (rebuilt when missing or
+    # stale) so `catime stats` never has to scan the whole catlist.
+    rollup_path = Path(ROLLUP_PATH)
+    write_rollup(rollup_path, update_rollup(load_rollup(rollup_path), cats))
+    written += [str(rollup_path), mirror_to_docs(rollup_path)]
+
+    details_by_month: dict[str, list[dict]] = {}
+    for record in records:
+        if record.get("detail"):
+            details_by_month.setdefault(record["index"]["timestamp"][:7], []).append(record["detail"])
+    for month, details in sorted(details_by_month.items()):
+        month_path = Path("cats") / f"{month}.json"
+        atomic_write_json(month_path, load_json_list(month_path) + details)
+        written += [str(month_path), mirror_to_docs(month_path)]
+
+    JOURNAL.write_text("")
+    written += [str(JOURNAL), mirror_to_docs(JOURNAL)]
+
+    # Keep a local SQLite archive (`catime index build`) in step, if there is one.
+    archive = Archive.open_existing(Path("."))
+    if archive is not None:
+        archive.refresh(Path("."), cats)
+        archive.close()
+    print(f"Compacted {len(records)} journal entries into catlist.json ({len(cats)} entries).")
+    return written
 
-    # Mirror data files into docs/ so GitHub Pages serves them same-origin —
-    # anonymous raw.githubusercontent.com requests get 429-throttled (60/hr per IP).
-    def mirror_to_docs(src: Path) -> str:
-        dst = Path("docs") / src
-        dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copyfile(src, dst)
-        return str(dst)
 
-    git_add_files = ["catlist.json", mirror_to_docs(catlist_path)]
+def update_catlist_and_push(entry: dict) -> int:
+    """Append the cat to the journal (compacting when due), commit and push."""
+    index_fields = {"number", "timestamp", "url", "model", "status", "error", "title", "inspiration", "character", "character_name", "is_seasonal", "season"}
+    detail_fields = {"number", "prompt", "story", "idea", "title", "inspiration", "news_inspiration", "avoid_list", "style_picks", "comment_id", "character", "character_name", "is_seasonal", "season"}
 
-    # Write detail entry to monthly file (only for successful cats with detail data)
+    run_state = load_run_state()
+    git_add_files = []
+    # Month files are final once their month ends, so fold last month's
+    # journal entries in before the first cat of a new month.
+    pending = read_records(JOURNAL)
+    if pending and pending[0]["index"].get("timestamp", "")[:7] != entry["timestamp"][:7]:
+        git_add_files += compact_journal()
+        pending = []
+
+    index_entry = {k: entry[k] for k in index_fields if k in entry}
+    # Detail entry only for successful cats with detail data
     has_detail = any(entry.get(k) for k in detail_fields if k != "number")
-    if has_detail:
-        month = entry["timestamp"][:7]  # "YYYY-MM"
-        cats_dir = Path("cats")
-        cats_dir.mkdir(exist_ok=True)
-        month_path = cats_dir / f"{month}.json"
-        monthly = load_json_list(month_path)
-        detail_entry = {k: entry[k] for k in detail_fields if k in entry}
-        monthly.append(detail_entry)
-        atomic_write_json(month_path, monthly)
-        git_add_files.append(str(month_path))
-        git_add_files.append(mirror_to_docs(month_path))
+    detail_entry = {k: entry[k] for k in detail_fields if k in entry} if has_detail else None
+    append_record(JOURNAL, index_entry, detail_entry)
+    # Only the journal line changes per run; shards, the rollup and the full
+    # views are rewritten at compaction, and readers append the journal.
+    git_add_files += [str(JOURNAL), mirror_to_docs(JOURNAL)]
+    if has_detail and append_recent_prompt(entry):
+        git_add_files.append(str(RECENT_PROMPTS))
+
+    if len(pending) + 1 >= CATLIST_COMPACT_EVERY:
+        git_add_files += compact_journal()
+    write_run_state(advance_run_state(run_state, index_entry))
+    git_add_files.append(str(RUN_STATE))
 
     subprocess.run(["git", "config", "user.name", "github-actions[bot]"], check=True)
     subprocess.run(
@@ -1308,6 +1720,9 @@ def update_catlist_and_push(entry: dict) -> int:
 
     if Path("creative_notes.json").exists():
         git_add_files.append("creative_notes.json")
+    for state_file in (STYLE_FILTER_CACHE, NEWS_CACHE):
+        if state_file.exists():
+            git_add_files.append(str(state_file))
     # Include character file updates (appearance counts)
     char_dir = Path("characters")
     if char_dir.exists():
@@ -1336,24 +1751,13 @@ def update_catlist_and_push(entry: dict) -> int:
 
 def already_has_cat_this_hour(now: datetime) -> bool:
     """Check if a successful cat already exists for the current hour."""
-    catlist_path = Path("catlist.json")
-    if not catlist_path.exists():
-        return False
-    cats = load_json_list(catlist_path)
-    hour_prefix = now.strftime("%Y-%m-%d %H:")
-    return any(
-        isinstance(c, dict)
-        and c.get("status", "success") == "success"
-        and isinstance(c.get("timestamp"), str)
-        and c["timestamp"].startswith(hour_prefix)
-        for c in cats
-    )
+    return load_run_state().get("last_success_hour") == now.strftime("%Y-%m-%d %H")
 
 
 def main():
     global RELEASE_TAG
     
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
     timestamp = now.strftime("%Y-%m-%d %H:%M UTC")
     
     # Dynamically set release tag based on current month (e.g., "cats-2026-03")
@@ -1365,19 +1769,17 @@ def main():
         print(f"Cat already exists for hour {now.strftime('%Y-%m-%d %H')} UTC, skipping.")
         return
 
-    # Read current count for numbering (needed before creative notes update)
-    catlist_path = Path("catlist.json")
-    cats = load_json_list(catlist_path)
-    next_number = len(cats) + 1
-
-    # Update creative notes if needed (every 5 cats)
-    creative_notes = maybe_update_creative_notes(next_number)
+    # Current count for numbering (needed before creative notes update)
+    next_number = load_run_state()["entries"] + 1
 
-    # Select character (or None for original)
-    character = select_character(now)
+    # Creative notes (every 5 cats), character, news and style picks
+    inputs = prepare_generation_inputs(next_number, now)
 
     print(f"Generating cat #{next_number} for {timestamp}...")
-    prompt_data = generate_prompt_and_story(timestamp, creative_notes, character)
+    prompt_data = generate_prompt_and_story(
+        timestamp, inputs["creative_notes"], inputs["character"],
+        news=inputs["news"], style_picks=inputs["styles"],
+    )
     prompt = prompt_data['prompt']
     story = prompt_data['story']
     idea = prompt_data.get('idea', '')
@@ -1462,4 +1864,11 @@ def main():
 
 
 if __name__ == "__main__":
+    if sys.argv[1:] == ["--check-state"]:
+        sys.exit(0 if check_run_state() else 1)
+    if sys.argv[1:] == ["--compact"]:
+        state = load_run_state()
+        print("\n".join(compact_journal()) or f"{JOURNAL} is empty, nothing to compact.")
+        write_run_state(state)
+        sys.exit(0)
     main()
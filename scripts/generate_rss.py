@@ -1,10 +1,15 @@
 #!/usr/bin/env python3
-"""Generate an Atom feed (docs/feed.xml) from catlist.json."""
+"""Generate an Atom feed (docs/feed.xml) from catlist.json and the journal."""
 
 import json
 import os
-from datetime import datetime, timezone
-from xml.etree.ElementTree import Element, SubElement, ElementTree
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+from xml.etree.ElementTree import Element, ElementTree, SubElement
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from catime.journal import JOURNAL_NAME, index_entries, read_records
 
 FEED_TITLE = "Catime - AI Cat Gallery"
 FEED_LINK = "https://yazelin.github.io/catime/"
@@ -17,9 +22,9 @@ MAX_ENTRIES = 20
 def parse_timestamp(ts: str) -> datetime:
     """Parse 'YYYY-MM-DD HH:MM UTC' into a timezone-aware datetime."""
     try:
-        return datetime.strptime(ts, "%Y-%m-%d %H:%M %Z").replace(tzinfo=timezone.utc)
+        return datetime.strptime(ts, "%Y-%m-%d %H:%M %Z").replace(tzinfo=UTC)
     except (ValueError, TypeError):
-        return datetime.min.replace(tzinfo=timezone.utc)
+        return datetime.min.replace(tzinfo=UTC)
 
 
 def build_feed(entries: list[dict]) -> ElementTree:
@@ -29,7 +34,7 @@ def build_feed(entries: list[dict]) -> ElementTree:
     SubElement(feed, "link", href=FEED_LINK, rel="alternate")
     SubElement(feed, "id").text = FEED_LINK
 
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    now = datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
     SubElement(feed, "updated").text = now
 
     for cat in entries:
@@ -61,6 +66,8 @@ def main() -> None:
 
     with open(catlist_path, encoding="utf-8") as f:
         cats = json.load(f)
+    # Cats not yet compacted into catlist.json
+    cats += index_entries(read_records(Path(repo_root) / JOURNAL_NAME))
 
     # Sort by timestamp descending and take latest 20
     cats.sort(key=lambda c: parse_timestamp(c.get("timestamp", "")), reverse=True)
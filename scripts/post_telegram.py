@@ -8,16 +8,21 @@ import urllib.error
 import urllib.request
 from pathlib import Path
 
+# Cats not yet compacted into catlist.json / cats/YYYY-MM.json are in the
+# journal (see src/catime/journal.py).
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from catime.journal import JOURNAL_NAME, read_records
+
 STATE_FILE = Path(".telegram_last_posted.json")
 
 
 def get_latest_cat() -> dict | None:
-    """Get the latest successful cat entry from catlist.json."""
+    """Get the latest successful cat entry from the journal or catlist.json."""
+    cats = [r["index"] for r in read_records(Path(JOURNAL_NAME))]
     catlist = Path("catlist.json")
-    if not catlist.exists():
-        return None
-    with catlist.open("r", encoding="utf-8") as f:
-        cats = json.load(f)
+    if catlist.exists():
+        with catlist.open("r", encoding="utf-8") as f:
+            cats = json.load(f) + cats
     for cat in reversed(cats):
         if isinstance(cat, dict) and cat.get("status") == "success":
             return cat
@@ -43,7 +48,11 @@ def save_last_posted_number(number: int) -> None:
 
 
 def get_cat_detail(cat: dict) -> dict:
-    """Try to get full detail (story, idea) from monthly file."""
+    """Try to get full detail (story, idea) from the journal or monthly file."""
+    for record in reversed(read_records(Path(JOURNAL_NAME))):
+        detail = record.get("detail")
+        if detail and detail.get("number") == cat.get("number"):
+            return {**cat, **detail}
     ts = cat.get("timestamp", "")
     month = ts[:7]
     month_path = Path("cats") / f"{month}.json"
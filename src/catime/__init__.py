@@ -1,3 +1,15 @@
 """catime - AI-generated hourly cat images."""
 
 __version__ = "0.4.10"
+
+
+def __getattr__(name):
+    # Client pulls in httpx; load it only when asked for.
+    if name in ("Client", "AsyncClient"):
+        from catime import client
+
+        return getattr(client, name)
+    raise AttributeError(f"module 'catime' has no attribute {name!r}")
+
+
+__all__ = ["AsyncClient", "Client", "__version__"]
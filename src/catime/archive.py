@@ -0,0 +1,295 @@
+"""Optional SQLite index over a local archive (catlist.json and cats/*.json).
+
+`catime index build` writes catime.sqlite3 next to the data files; from
+then on --local queries read it instead of parsing JSON. Catlist entries
+are rows keyed by catlist position, with indexes on number, timestamp,
+character and model, so a number lookup or a date query is one indexed
+SELECT. Detail entries are rows keyed by number, and an FTS5 table over
+title, idea, story and prompt serves `catime search`. Text is stored
+pre-tokenized with catime.search.tokenize, so CJK phrases match as
+character bigrams like the file-based search index.
+
+The index follows the files incrementally: new catlist entries are
+appended as rows, and only detail files whose size or mtime changed are
+re-read. Entries still in journal.jsonl (see catime.journal) count as
+catlist rows and details too.
+"""
+
+import json
+from collections.abc import Sequence
+from pathlib import Path
+
+ARCHIVE_NAME = "catime.sqlite3"
+SCHEMA_VERSION = 1
+# bm25() column weights for title, idea, story, prompt.
+FTS_WEIGHTS = (3.0, 1.0, 1.0, 1.0)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS cats (
+    position INTEGER PRIMARY KEY,
+    number INTEGER,
+    timestamp TEXT NOT NULL,
+    character TEXT,
+    model TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cats_number ON cats (number);
+CREATE INDEX IF NOT EXISTS cats_timestamp ON cats (timestamp);
+CREATE INDEX IF NOT EXISTS cats_character ON cats (character);
+CREATE INDEX IF NOT EXISTS cats_model ON cats (model);
+CREATE TABLE IF NOT EXISTS details (
+    number INTEGER PRIMARY KEY,
+    month TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS details_month ON details (month);
+CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5 (title, idea, story, prompt);
+"""
+
+# Sorts after any character that can follow a prefix in a timestamp.
+_PREFIX_END = "\uffff"
+
+
+def _file_stamp(path: Path) -> list[int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _tokens(text) -> str:
+    from catime.search import tokenize
+
+    return " ".join(tokenize(text)) if isinstance(text, str) else ""
+
+
+class Archive:
+    """A catime.sqlite3 database; `refresh(root)` syncs it with the data files under root."""
+
+    def __init__(self, path: Path):
+        import sqlite3
+
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        if self._meta("version") != SCHEMA_VERSION:
+            self.clear()
+
+    @classmethod
+    def open_existing(cls, root: Path) -> "Archive | None":
+        """The archive under `root` if one has been built, else None."""
+        path = root / ARCHIVE_NAME
+        return cls(path) if path.exists() else None
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _meta(self, key: str):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_meta(self, key: str, value) -> None:
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, json.dumps(value)))
+
+    def clear(self) -> None:
+        with self._db:
+            for table in ("meta", "cats", "details", "fts"):
+                self._db.execute(f"DELETE FROM {table}")
+            self._set_meta("version", SCHEMA_VERSION)
+
+    # -- updating ---------------------------------------------------------
+
+    def refresh(self, root: Path, cats: list[dict] | None = None) -> bool:
+        """Bring the archive up to date with the files under `root`.
+
+        `cats` is the parsed catlist, if the caller already has it. Returns
+        whether anything changed.
+        """
+        from catime.journal import (
+            JOURNAL_NAME,
+            index_entries,
+            month_details,
+            read_records,
+        )
+
+        changed = False
+        with self._db:
+            catlist_path = root / "catlist.json"
+            journal_path = root / JOURNAL_NAME
+            journal_stamp = _file_stamp(journal_path)
+            journal_changed = journal_stamp != self._meta("journal")
+            journal = read_records(journal_path)
+            pending = {r["index"].get("timestamp", "")[:7] for r in journal if r.get("detail")}
+            stamp = _file_stamp(catlist_path)
+            if stamp is not None and (stamp != self._meta("catlist") or journal_changed):
+                if cats is None:
+                    cats = json.loads(catlist_path.read_text(encoding="utf-8"))
+                self._update_cats(list(cats) + index_entries(journal))
+                self._set_meta("catlist", stamp)
+                changed = True
+
+            known = {key[6:]: value for key, value in self._db.execute(
+                "SELECT key, value FROM meta WHERE key LIKE 'month:%'")}
+            present = {p.stem: p for p in sorted((root / "cats").glob("*.json"))}
+            journal_months = pending | set(self._meta("journal_months") or []) if journal_changed else set()
+            # Months that had or have journal details are re-read in full.
+            known = {m: v for m, v in known.items() if m not in journal_months}
+            for month, path in present.items():
+                stamp = _file_stamp(path)
+                if stamp is not None and json.dumps(stamp) != known.get(month):
+                    details = json.loads(path.read_text(encoding="utf-8"))
+                    details += month_details(journal, month, (d.get("number") for d in details if isinstance(d, dict)))
+                    self._replace_month(month, details)
+                    self._set_meta(f"month:{month}", stamp)
+                    changed = True
+            for month in set(known) - set(present):
+                self._replace_month(month, [])
+                self._db.execute("DELETE FROM meta WHERE key = ?", (f"month:{month}",))
+                changed = True
+            if journal_changed:
+                # Journal details of months with no detail file yet.
+                for month in sorted(journal_months - set(present)):
+                    self._replace_month(month, month_details(journal, month))
+                self._set_meta("journal_months", sorted(pending))
+                self._set_meta("journal", journal_stamp)
+                changed = True
+        return changed
+
+    def _update_cats(self, cats: list[dict]) -> None:
+        """Append new catlist entries; start over if the stored prefix no longer matches."""
+        count = self._db.execute("SELECT count(*) FROM cats").fetchone()[0]
+        if count:
+            last = self._db.execute("SELECT timestamp FROM cats WHERE position = ?", (count - 1,)).fetchone()
+            if count > len(cats) or last is None or last[0] != cats[count - 1].get("timestamp"):
+                self._db.execute("DELETE FROM cats")
+                count = 0
+        self._db.executemany("INSERT INTO cats VALUES (?, ?, ?, ?, ?, ?)", (
+            (position, cat.get("number"), cat.get("timestamp", ""), cat.get("character"), cat.get("model"),
+             json.dumps(cat, ensure_ascii=False))
+            for position, cat in enumerate(cats[count:], count)
+        ))
+
+    def _replace_month(self, month: str, details: list[dict]) -> None:
+        numbers = [row[0] for row in self._db.execute("SELECT number FROM details WHERE month = ?", (month,))]
+        self._db.executemany("DELETE FROM fts WHERE rowid = ?", ((n,) for n in numbers))
+        self._db.execute("DELETE FROM details WHERE month = ?", (month,))
+        for detail in details:
+            number = detail.get("number") if isinstance(detail, dict) else None
+            if number is None:
+                continue
+            inserted = self._db.execute(
+                "INSERT OR IGNORE INTO details VALUES (?, ?, ?)",
+                (number, month, json.dumps(detail, ensure_ascii=False)),
+            ).rowcount
+            if inserted:
+                self._db.execute("INSERT INTO fts (rowid, title, idea, story, prompt) VALUES (?, ?, ?, ?, ?)", (
+                    number, _tokens(detail.get("title")), _tokens(detail.get("idea")),
+                    _tokens(detail.get("story")), _tokens(detail.get("prompt")),
+                ))
+
+    # -- queries ----------------------------------------------------------
+
+    def catlist(self) -> "ArchiveCatlist":
+        return ArchiveCatlist(self._db)
+
+    def detail(self, number: int) -> dict | None:
+        row = self._db.execute("SELECT data FROM details WHERE number = ?", (number,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def month_details(self, month: str) -> list[dict]:
+        return [json.loads(row[0]) for row in self._db.execute(
+            "SELECT data FROM details WHERE month = ? ORDER BY rowid", (month,))]
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """Cats matching every query term, else any term, ranked by bm25.
+
+        Returns result dicts shaped like catime.search.SearchIndex.search's.
+        """
+        terms = list(dict.fromkeys(_tokens(query).split()))
+        if not terms:
+            return []
+        quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+        rows = []
+        for match in (" AND ".join(quoted), " OR ".join(quoted)):
+            rows = self._db.execute(
+                f"SELECT fts.rowid, bm25(fts, {', '.join(map(str, FTS_WEIGHTS))}) AS rank, cats.data, details.data "
+                "FROM fts JOIN details ON details.number = fts.rowid "
+                "LEFT JOIN cats ON cats.number = fts.rowid "
+                "WHERE fts MATCH ? ORDER BY rank, fts.rowid LIMIT ?",
+                (match, limit),
+            ).fetchall()
+            if rows or len(terms) == 1:
+                break
+        results = []
+        for number, rank, cat_data, detail_data in rows:
+            cat = json.loads(cat_data) if cat_data else {}
+            detail = json.loads(detail_data)
+            results.append({
+                "number": number,
+                "score": round(-rank, 3),
+                "timestamp": cat.get("timestamp", ""),
+                "url": cat.get("url"),
+                "model": cat.get("model"),
+                "title": detail.get("title") or cat.get("title") or "",
+            })
+        return results
+
+
+class ArchiveTimeline:
+    """TimestampIndex's query methods, answered from the timestamp index."""
+
+    def __init__(self, db):
+        self._db = db
+
+    def between(self, start: str, end: str) -> list[int]:
+        """Positions with start <= timestamp < end, in timestamp order."""
+        return [row[0] for row in self._db.execute(
+            "SELECT position FROM cats WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp, position",
+            (start, end),
+        )]
+
+    def prefix(self, prefix: str) -> list[int]:
+        return self.between(prefix, prefix + _PREFIX_END)
+
+    def dates(self, start_date: str, end_date: str) -> list[int]:
+        return self.between(start_date, end_date + _PREFIX_END)
+
+
+class ArchiveCatlist(Sequence):
+    """Read-only catlist over the archive's rows, indexed by catlist position."""
+
+    def __init__(self, db):
+        self._db = db
+        self._len = db.execute("SELECT count(*) FROM cats").fetchone()[0]
+        self.timeline = ArchiveTimeline(db)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return [json.loads(row[0]) for row in self._db.execute(
+                "SELECT data FROM cats WHERE position >= ? AND position < ? ORDER BY position", (start, stop))]
+        position = key + len(self) if key < 0 else key
+        if not 0 <= position < len(self):
+            raise IndexError("catlist index out of range")
+        return json.loads(self._db.execute("SELECT data FROM cats WHERE position = ?", (position,)).fetchone()[0])
+
+    def __iter__(self):
+        for row in self._db.execute("SELECT data FROM cats ORDER BY position"):
+            yield json.loads(row[0])
+
+    def at(self, positions) -> list[dict]:
+        """Entries at several positions, in the order given."""
+        positions = list(positions)
+        found: dict[int, dict] = {}
+        for start in range(0, len(positions), 500):
+            chunk = positions[start:start + 500]
+            found.update((row[0], json.loads(row[1])) for row in self._db.execute(
+                f"SELECT position, data FROM cats WHERE position IN ({','.join('?' * len(chunk))})", chunk))
+        return [found[p] for p in positions]
@@ -1,13 +1,17 @@
-"""CLI entry point for catime - view AI-generated hourly cats."""
+"""CLI entry point for catime - view AI-generated hourly cats.
+
+Startup matters: agents call the CLI many times in a row, so heavy modules
+(httpx, argparse, datetime, re) are imported on the code paths that need
+them rather than at module level. tests/test_startup.py enforces a budget.
+"""
 
-import argparse
 import json
-import re
 import sys
-from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
-from catime.utils.http import safe_get_json
+from catime.records import Cat
+from catime.sources import fetch_errors
+from catime.timeline import filter_by_query, month_closed_since
 
 # Data files are served by GitHub Pages (no anonymous rate limit);
 # raw.githubusercontent.com (429-throttled at 60 req/hr/IP) stays as
@@ -16,9 +20,21 @@ PAGES_CATLIST_URL = "https://{owner}.github.io/{name}/catlist.json"
 PAGES_DETAIL_URL = "https://{owner}.github.io/{name}/cats/{month}.json"
 RAW_CATLIST_URL = "https://raw.githubusercontent.com/{repo}/main/catlist.json"
 RAW_DETAIL_URL = "https://raw.githubusercontent.com/{repo}/main/cats/{month}.json"
+PAGES_COMPACT_URL = "https://{owner}.github.io/{name}/catlist.compact.json"
+RAW_COMPACT_URL = "https://raw.githubusercontent.com/{repo}/main/catlist.compact.json"
+PAGES_SHARD_URL = "https://{owner}.github.io/{name}/catlist/{file}"
+RAW_SHARD_URL = "https://raw.githubusercontent.com/{repo}/main/catlist/{file}"
+PAGES_STATS_URL = "https://{owner}.github.io/{name}/stats/rollup.json"
+RAW_STATS_URL = "https://raw.githubusercontent.com/{repo}/main/stats/rollup.json"
+PAGES_JOURNAL_URL = "https://{owner}.github.io/{name}/journal.jsonl"
+RAW_JOURNAL_URL = "https://raw.githubusercontent.com/{repo}/main/journal.jsonl"
 DEFAULT_REPO = "yazelin/catime"
 
 _detail_cache: dict[str, list[dict]] = {}
+_detail_index_cache: dict[str, dict[int, dict]] = {}
+_detail_loaders: dict[tuple[str, bool], object] = {}
+_archives: dict[Path, object] = {}
+_journals: dict[str, list[dict]] = {}
 
 
 def _pages_urls(repo: str, template: str, **kwargs) -> str:
@@ -26,113 +42,455 @@ def _pages_urls(repo: str, template: str, **kwargs) -> str:
     return template.format(owner=owner, name=name, **kwargs)
 
 
-def _fetch_json_with_fallback(pages_url: str, raw_url: str):
+def _fetch_with_fallback(fetch, pages_url: str, raw_url: str, immutable_after: float | None = None, **kwargs):
+    from catime.utils import timings
+
     try:
-        result = safe_get_json(pages_url, timeout=10.0, max_retries=1, follow_redirects=True)
+        result = fetch(
+            pages_url, timeout=10.0, max_retries=1,
+            immutable_after=immutable_after, follow_redirects=True, **kwargs,
+        )
         if result is not None:
+            timings.record("fallback", pages_url, used="pages")
             return result
-    except Exception:
-        pass
-    return safe_get_json(raw_url, timeout=10.0, max_retries=3, follow_redirects=True)
+        timings.record("fallback", pages_url, used="raw", error="empty response")
+    except fetch_errors() as e:
+        timings.record("fallback", pages_url, used="raw", error=f"{type(e).__name__}: {e}")
+    return fetch(
+        raw_url, timeout=10.0, max_retries=3,
+        immutable_after=immutable_after, follow_redirects=True, **kwargs,
+    )
+
+
+def _fetch_json_with_fallback(pages_url: str, raw_url: str, immutable_after: float | None = None, **kwargs):
+    from catime.utils.http import cached_get_json
+
+    return _fetch_with_fallback(cached_get_json, pages_url, raw_url, immutable_after, **kwargs)
+
+
+def fetch_journal(repo: str) -> list[dict]:
+    """Journal records not yet compacted into catlist.json (see catime.journal); [] if none."""
+    if repo not in _journals:
+        from catime.journal import read_records
+        from catime.utils.http import cached_get_file
+
+        try:
+            _journals[repo] = read_records(_fetch_with_fallback(
+                cached_get_file,
+                _pages_urls(repo, PAGES_JOURNAL_URL),
+                RAW_JOURNAL_URL.format(repo=repo),
+            ))
+        except fetch_errors():
+            _journals[repo] = []
+    return _journals[repo]
 
 
 def fetch_catlist(repo: str) -> list[dict]:
-    return _fetch_json_with_fallback(
+    """The full catlist, from catlist.compact.json when the repo publishes it.
+
+    The compact form comes back as a CompactCatlist, a read-only sequence
+    that builds each entry dict on access; pending journal entries turn the
+    result into a plain list with them appended.
+    """
+    from catime.compact import CompactCatlist
+    from catime.journal import index_entries
+
+    try:
+        cats = CompactCatlist(_fetch_json_with_fallback(
+            _pages_urls(repo, PAGES_COMPACT_URL),
+            RAW_COMPACT_URL.format(repo=repo),
+        ))
+    except fetch_errors():
+        cats = _fetch_json_with_fallback(
+            _pages_urls(repo, PAGES_CATLIST_URL),
+            RAW_CATLIST_URL.format(repo=repo),
+        )
+    pending = index_entries(fetch_journal(repo))
+    return list(cats) + pending if pending else cats
+
+
+def fetch_catlist_file(repo: str) -> Path:
+    """Download catlist.json into the HTTP cache and return its path, for streaming."""
+    from catime.utils.http import cached_get_file
+
+    return _fetch_with_fallback(
+        cached_get_file,
         _pages_urls(repo, PAGES_CATLIST_URL),
         RAW_CATLIST_URL.format(repo=repo),
     )
 
 
-def fetch_detail(month: str, *, repo: str = DEFAULT_REPO, local: bool = False) -> list[dict]:
-    """Fetch monthly detail file, with caching."""
+def fetch_manifest(repo: str) -> dict | None:
+    """The catlist shard manifest, or None if the repo does not publish one."""
+    from catime.shards import MANIFEST_NAME, MANIFEST_VERSION
+
+    try:
+        manifest = _fetch_json_with_fallback(
+            _pages_urls(repo, PAGES_SHARD_URL, file=MANIFEST_NAME),
+            RAW_SHARD_URL.format(repo=repo, file=MANIFEST_NAME),
+        )
+    except fetch_errors():
+        return None
+    if isinstance(manifest, dict) and manifest.get("version") == MANIFEST_VERSION:
+        return manifest
+    return None
+
+
+def fetch_shards(months, *, repo: str, manifest: dict, max_workers: int = 4) -> dict[str, list[dict]]:
+    """Fetch month shards concurrently; a cached shard matching the manifest hash costs no request."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    def fetch(month: str) -> list[dict]:
+        meta = manifest["months"][month]
+        try:
+            entries = _fetch_json_with_fallback(
+                _pages_urls(repo, PAGES_SHARD_URL, file=f"{month}.json"),
+                RAW_SHARD_URL.format(repo=repo, file=f"{month}.json"),
+                expected_sha256=meta["sha256"],
+            )
+        except fetch_errors():
+            entries = None
+        if not isinstance(entries, list) or len(entries) != meta["count"]:
+            # Shard and manifest out of step (e.g. mid-deploy): cut it from the full list.
+            entries = fetch_catlist(repo)[meta["offset"]:meta["offset"] + meta["count"]]
+        return entries
+
+    months = list(months)
+    if len(months) <= 1:
+        return {month: fetch(month) for month in months}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(months))) as pool:
+        return dict(zip(months, pool.map(fetch, months)))
+
+
+def load_catlist(repo: str):
+    """Catlist for queries: shard-backed when the repo publishes a manifest, else the full list."""
+    manifest = fetch_manifest(repo)
+    if manifest is None:
+        return fetch_catlist(repo)
+    return sharded_catlist(repo, manifest)
+
+
+def sharded_catlist(repo: str, manifest: dict):
+    """A ShardedCatlist fetching the shards `manifest` describes on demand, then the journal's entries."""
+    from catime.journal import index_entries
+    from catime.shards import ShardedCatlist
+
+    return ShardedCatlist(
+        manifest, lambda months: fetch_shards(months, repo=repo, manifest=manifest),
+        pending=index_entries(fetch_journal(repo)),
+    )
+
+
+def load_rollup(repo: str, local: bool = False) -> dict:
+    """The generation stats rollup with the journal's pending entries folded in.
+
+    Rebuilt from the catlist if the repo does not publish one.
+    """
+    from catime import stats
+    from catime.journal import index_entries
+
+    if local:
+        rollup = stats.load_rollup(_local_root() / stats.ROLLUP_PATH)
+        if not rollup["entries"]:
+            return stats.update_rollup(rollup, load_local_catlist())
+        return stats.extend_rollup(rollup, index_entries(local_journal()))
+    try:
+        rollup = _fetch_json_with_fallback(_pages_urls(repo, PAGES_STATS_URL), RAW_STATS_URL.format(repo=repo))
+    except fetch_errors():
+        rollup = None
+    if isinstance(rollup, dict) and rollup.get("version") == stats.ROLLUP_VERSION:
+        return stats.extend_rollup(rollup, index_entries(fetch_journal(repo)))
+    return stats.update_rollup(stats.empty_rollup(), list(fetch_catlist(repo)))
+
+
+def fetch_detail(month: str, *, repo: str = DEFAULT_REPO, local: bool = False) -> list[dict] | None:
+    """Fetch monthly detail file, with caching.
+
+    Returns None when the remote file could not be fetched (a 404 is an empty
+    month); failures are not cached, so the next call tries again.
+    """
     if month in _detail_cache:
         return _detail_cache[month]
     details = []
     if local:
-        p = Path(__file__).resolve().parent.parent.parent / "cats" / f"{month}.json"
-        if p.exists():
+        archive = local_archive()
+        p = _local_root() / "cats" / f"{month}.json"
+        if archive is not None:
+            details = archive.month_details(month)
+        elif p.exists():
             details = json.loads(p.read_text())
+        if archive is None:
+            details = details + _journal_details(local_journal(), month, details)
     else:
         try:
             result = _fetch_json_with_fallback(
                 _pages_urls(repo, PAGES_DETAIL_URL, month=month),
                 RAW_DETAIL_URL.format(repo=repo, month=month),
+                immutable_after=month_closed_since(month),
             )
-            if result is not None:
-                details = result
-        except Exception:
-            pass
+        except fetch_errors() as e:
+            if getattr(getattr(e, "response", None), "status_code", None) != 404:
+                return None
+            result = []  # e.g. a month with only failed cats has no detail file
+        if not isinstance(result, list):
+            return None
+        details = result
+        if month_closed_since(month) is None:
+            # New cats of the open month sit in the journal until compaction.
+            details = details + _journal_details(fetch_journal(repo), month, details)
     _detail_cache[month] = details
+    _detail_index_cache[month] = _index_by_number(details)
     return details
 
 
-def enrich_cat(cat: dict, *, repo: str = DEFAULT_REPO, local: bool = False) -> dict:
-    """Merge monthly detail into a cat index entry."""
-    month = cat["timestamp"][:7]
-    details = fetch_detail(month, repo=repo, local=local)
-    detail = next((d for d in details if d.get("number") == cat.get("number")), None)
-    if detail:
-        return {**cat, **detail}
-    return cat
+def _journal_details(records: list[dict], month: str, details: list[dict]) -> list[dict]:
+    from catime.journal import month_details
+
+    return month_details(records, month, (d.get("number") for d in details if isinstance(d, dict)))
+
+
+def _index_by_number(details: list[dict]) -> dict[int, dict]:
+    index: dict[int, dict] = {}
+    for d in details:
+        if isinstance(d, dict) and d.get("number") is not None:
+            index.setdefault(d["number"], d)
+    return index
+
+
+def fetch_detail_index(month: str, *, repo: str = DEFAULT_REPO, local: bool = False) -> dict[int, dict]:
+    """Number -> detail mapping for a month, cached alongside fetch_detail's list."""
+    index = _detail_index_cache.get(month)
+    if index is None:
+        details = fetch_detail(month, repo=repo, local=local)
+        if details is None:
+            return {}
+        index = _index_by_number(details)
+        _detail_index_cache[month] = index
+    return index
+
+
+def prefetch_details(months, *, repo: str = DEFAULT_REPO, local: bool = False, max_workers: int = 4) -> None:
+    """Fetch several monthly detail files concurrently into the cache."""
+    if local and local_archive() is not None:
+        return  # details come from the archive one row at a time
+    pending = sorted(set(months) - _detail_cache.keys())
+    if len(pending) <= 1 or local:
+        for month in pending:
+            fetch_detail(month, repo=repo, local=local)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+        list(pool.map(lambda m: fetch_detail(m, repo=repo, local=local), pending))
+
+
+def detail_loader(*, repo: str = DEFAULT_REPO, local: bool = False):
+    """Cat detail loader for a data source, shared by every Cat built for it."""
+    key = (repo, local)
+    if key not in _detail_loaders:
+        archive = local_archive() if local else None
+
+        def load(month: str, number: int) -> dict | None:
+            if archive is not None:
+                return archive.detail(number)
+            return fetch_detail_index(month, repo=repo, local=local).get(number)
+
+        _detail_loaders[key] = load
+    return _detail_loaders[key]
+
+
+def enrich_cat(cat: dict, *, repo: str = DEFAULT_REPO, local: bool = False) -> Cat:
+    """Cat for an index entry; its detail fields load from the month file on first access."""
+    return Cat.from_dict(cat, detail_loader(repo=repo, local=local))
+
+
+def load_cats(entries, *, repo: str = DEFAULT_REPO, local: bool = False) -> list[Cat]:
+    """Catlist entries as Cats: the memory-lean form for holding a whole catlist."""
+    loader = detail_loader(repo=repo, local=local)
+    return [Cat.from_dict(entry, loader) for entry in entries]
+
+
+def _local_root() -> Path:
+    """Directory holding catlist.json and cats/ for --local queries.
+
+    A mirror written by `catime sync` wins over the package's source tree.
+    """
+    from catime.utils.paths import mirror_dir
+
+    mirror = mirror_dir()
+    if (mirror / "catlist.json").exists():
+        return mirror
+    return Path(__file__).resolve().parent.parent.parent
+
+
+def local_archive():
+    """The SQLite archive for --local data, refreshed against the files, or None if not built."""
+    from catime.archive import Archive
+
+    root = _local_root()
+    if root not in _archives:
+        archive = Archive.open_existing(root)
+        if archive is not None:
+            archive.refresh(root)
+        _archives[root] = archive
+    return _archives[root]
+
+
+def local_journal() -> list[dict]:
+    from catime.journal import JOURNAL_NAME, read_records
+
+    return read_records(_local_root() / JOURNAL_NAME)
 
 
 def load_local_catlist() -> list[dict]:
-    p = Path(__file__).resolve().parent.parent.parent / "catlist.json"
-    if p.exists():
-        return json.loads(p.read_text())
-    return []
+    archive = local_archive()
+    if archive is not None:
+        return archive.catlist()
+    from catime.journal import index_entries
+
+    p = _local_root() / "catlist.json"
+    cats = json.loads(p.read_text()) if p.exists() else []
+    return cats + index_entries(local_journal())
 
 
-def print_cat(cat: dict, index: int | None = None):
+def print_cat(cat: Cat, index: int | None = None, file=None):
     """Print a single cat entry."""
-    num = cat.get("number") or index
-    status = cat.get("status", "success")
-    if status == "failed":
-        print(f"Cat #{num or '?':>4}  [FAILED]  {cat['timestamp']}  error: {cat.get('error', '?')}")
+    num = cat.number or index
+    if cat.failed:
+        print(f"Cat #{num or '?':>4}  [FAILED]  {cat.timestamp}  error: {cat.error or '?'}", file=file)
     else:
-        print(f"Cat #{num:>4}  {cat['timestamp']}  model: {cat.get('model', '?')}")
-        print(f"  URL: {cat['url']}")
-        if cat.get("idea"):
-            print(f"  Idea: {cat['idea']}")
-        if cat.get("prompt"):
-            print(f"  Prompt: {cat['prompt']}")
-        if cat.get("story"):
-            print(f"  Story: {cat['story']}")
+        print(f"Cat #{num:>4}  {cat.timestamp}  model: {cat.model or '?'}", file=file)
+        print(f"  URL: {cat.url}", file=file)
+        if cat.idea:
+            print(f"  Idea: {cat.idea}", file=file)
+        if cat.prompt:
+            print(f"  Prompt: {cat.prompt}", file=file)
+        if cat.story:
+            print(f"  Story: {cat.story}", file=file)
 
 
-def filter_by_query(cats: list[dict], query: str) -> list[dict]:
-    """Filter cats by time query: date, date+hour, today, yesterday."""
-    now = datetime.now(timezone.utc)
+def iter_catlist(path: Path):
+    """Yield (position, cat) from a catlist file, parsing it incrementally."""
+    from catime.utils.jsonstream import iter_json_array
 
-    if query == "today":
-        target_date = now.strftime("%Y-%m-%d")
-        return [c for c in cats if c["timestamp"].startswith(target_date)]
+    with path.open(encoding="utf-8") as fp:
+        yield from enumerate(iter_json_array(fp), 1)
 
-    if query == "yesterday":
-        target_date = (now - timedelta(days=1)).strftime("%Y-%m-%d")
-        return [c for c in cats if c["timestamp"].startswith(target_date)]
 
-    # date+hour: 2026-01-30T05 or 2026-01-30 05
-    m = re.match(r"^(\d{4}-\d{2}-\d{2})[T ](\d{1,2})$", query)
-    if m:
-        date_str, hour_str = m.group(1), m.group(2).zfill(2)
-        prefix = f"{date_str} {hour_str}:"
-        return [c for c in cats if c["timestamp"].startswith(prefix)]
+def page_entries(entries, *, offset: int = 0, limit: int | None = None, reverse: bool = False):
+    """Apply --offset/--limit/--reverse to a stream of entries.
 
-    # date only: 2026-01-30
-    if re.match(r"^\d{4}-\d{2}-\d{2}$", query):
-        return [c for c in cats if c["timestamp"].startswith(query)]
+    Forward pages stop consuming the stream once full; reverse pages keep only
+    offset + limit entries in memory while reading to the end.
+    """
+    from itertools import islice
 
-    return []
+    if not reverse:
+        return islice(entries, offset, None if limit is None else offset + limit)
+    from collections import deque
+
+    tail = deque(entries, maxlen=None if limit is None else offset + limit)
+    tail.reverse()
+    return islice(tail, offset, None)
+
+
+def page_positions(cats, *, offset: int = 0, limit: int | None = None, reverse: bool = False) -> list[tuple[int, dict]]:
+    """page_entries for a sized catlist: slices by position, so a ShardedCatlist loads only the page's shards."""
+    total = len(cats)
+    count = max(0, total - offset) if limit is None else max(0, min(limit, total - offset))
+    start = total - offset - count if reverse else offset
+    page = list(enumerate(cats[start:start + count], start + 1))
+    return page[::-1] if reverse else page
+
+
+def with_journal(entries, records: list[dict]):
+    """Yield (position, cat) from `entries`, then the journal's pending entries after them."""
+    from catime.journal import index_entries
+
+    position = 0
+    for position, cat in entries:
+        yield position, cat
+    yield from enumerate(index_entries(records), position + 1)
+
+
+class _BufferedWriter:
+    """Collects print() output and hands it to stdout in large blocks."""
+
+    def __init__(self, stream, size: int = 1 << 16):
+        self._stream = stream
+        self._size = size
+        self._parts: list[str] = []
+        self._pending = 0
+
+    def write(self, text: str) -> int:
+        self._parts.append(text)
+        self._pending += len(text)
+        if self._pending >= self._size:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if self._parts:
+            self._stream.write("".join(self._parts))
+            self._parts.clear()
+            self._pending = 0
+        self._stream.flush()
+
+
+def cmd_list(args):
+    """Print one page of the catlist, from its shards or by streaming catlist.json."""
+    try:
+        manifest = None if args.local else fetch_manifest(args.repo)
+        if manifest is not None:
+            page = page_positions(
+                sharded_catlist(args.repo, manifest), offset=args.offset, limit=args.limit, reverse=args.reverse,
+            )
+        else:
+            path = _local_root() / "catlist.json" if args.local else fetch_catlist_file(args.repo)
+            entries = with_journal(
+                iter_catlist(path) if path.exists() else iter(()),
+                local_journal() if args.local else fetch_journal(args.repo),
+            )
+            page = page_entries(entries, offset=args.offset, limit=args.limit, reverse=args.reverse)
+        printed = 0
+        out = _BufferedWriter(sys.stdout)
+        for position, cat in page:
+            print_cat(Cat.from_dict(cat), position, file=out)
+            printed += 1
+        out.flush()
+    except BrokenPipeError:
+        # Reader went away (e.g. `catime --list | head`): stop quietly.
+        import os
+
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except fetch_errors() as e:
+        print(f"Error loading cat list: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not printed and not args.offset:
+        print("No cats yet! Check back in an hour.")
+
+
+def parse_number_range(query: str) -> tuple[int, int] | None:
+    """Parse a cat number range like '100-250' into (start, end)."""
+    import re
+
+    m = re.match(r"^(\d+)-(\d+)$", query)
+    if not m or re.match(r"^\d{4}-\d{2}$", query):
+        return None
+    start, end = int(m.group(1)), int(m.group(2))
+    if start < 1 or end < start:
+        return None
+    return start, end
 
 
 def cmd_view(args):
     """Serve the cat gallery locally in a browser."""
-    import http.server
-    import functools
     import threading
     import webbrowser
 
+    from catime.server import make_server
+
     docs_dir = Path(__file__).resolve().parent / "docs"
     if not docs_dir.exists():
         # Fallback: project root docs/
@@ -142,8 +500,7 @@ def cmd_view(args):
         sys.exit(1)
 
     port = args.port
-    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(docs_dir))
-    server = http.server.HTTPServer(("127.0.0.1", port), handler)
+    server = make_server(docs_dir, port=port)
     url = f"http://127.0.0.1:{port}"
     print(f"Serving cat gallery at {url}")
     threading.Timer(0.5, lambda: webbrowser.open(url)).start()
@@ -151,32 +508,305 @@ def cmd_view(args):
         server.serve_forever()
     except KeyboardInterrupt:
         print("\nStopped.")
+    finally:
+        server.server_close()
+
+
+def cmd_search(args):
+    """Full-text search over titles, ideas, stories and prompts."""
+    from catime.search import SearchIndex
+
+    archive = local_archive() if args.local else None
+    index = archive or SearchIndex.for_source(args.repo, local=args.local)
+    if archive is None and (args.refresh or index.is_stale()):
+        try:
+            cats = load_local_catlist() if args.local else fetch_catlist(args.repo)
+        except fetch_errors() as e:
+            print(f"Error loading cat list: {e}", file=sys.stderr)
+            sys.exit(1)
+        detail_opts = {"repo": args.repo, "local": args.local}
+        prefetch_details(index.pending_months(cats), **detail_opts)
+        index.update(cats, lambda month: fetch_detail(month, **detail_opts))
+
+    results = index.search(args.terms, limit=args.limit)
+    if not results:
+        print(f"No cats found for '{args.terms}'.", file=sys.stderr)
+        sys.exit(1)
+    print(f"Found {len(results)} cat(s) for '{args.terms}':\n")
+    for result in results:
+        cat = Cat.from_dict(result)
+        print_cat(cat)
+        if cat.title:
+            print(f"  Title: {cat.title}")
+        print()
+
+
+def cmd_sync(args):
+    """Mirror the data files locally for offline --local queries."""
+    from catime.archive import Archive
+    from catime.sync import Mirror
+    from catime.utils.paths import mirror_dir
+
+    root = Path(args.dir).expanduser() if args.dir else mirror_dir()
+    report = Mirror(root, args.repo).sync(max_workers=args.workers)
+    archive = Archive.open_existing(root)
+    if archive is not None:
+        archive.refresh(root)
+    print(f"Synced {args.repo} to {root}")
+    print(f"  updated: {len(report.updated)}  unchanged: {len(report.unchanged)}  "
+          f"closed months skipped: {len(report.skipped)}  missing: {len(report.missing)}")
+    for relpath in report.updated:
+        print(f"  + {relpath}")
+    if root != mirror_dir():
+        print(f"Set CATIME_MIRROR_DIR={root} to use this mirror with --local.")
+    if report.failed:
+        print(f"Failed: {', '.join(sorted(report.failed))}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _date_arg(value: str) -> str:
+    import argparse
+    from datetime import date
+
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+    return value
+
+
+def cmd_export(args):
+    """Download the images (and a metadata sidecar) for a date range."""
+    import time
+
+    import httpx
+
+    from catime.export import SIDECAR_NAME, Exporter
+    from catime.shards import query_scope
+    from catime.utils.http import Session
+
+    query = f"{args.from_date or '0000-01-01'}..{args.to_date or '9999-12-31'}"
+    try:
+        cats = load_local_catlist() if args.local else load_catlist(args.repo)
+    except fetch_errors() as e:
+        print(f"Error loading cat list: {e}", file=sys.stderr)
+        sys.exit(1)
+    detail_opts = {"repo": args.repo, "local": args.local}
+    matched = load_cats(filter_by_query(query_scope(cats, query), query), **detail_opts)
+    if not any(cat.url and not cat.failed for cat in matched):
+        print(f"No cats found for {query}.", file=sys.stderr)
+        sys.exit(1)
+    prefetch_details({cat.month for cat in matched}, **detail_opts)
+
+    out_dir = Path(args.dir).expanduser()
+    limits = httpx.Limits(max_connections=args.workers, max_keepalive_connections=args.workers, keepalive_expiry=30.0)
+    started = time.monotonic()
+    with Session(limits=limits) as session:
+        report = Exporter(out_dir, session=session, workers=args.workers).export(matched)
+    elapsed = max(time.monotonic() - started, 1e-6)
+    print(f"Exported to {out_dir} (metadata: {SIDECAR_NAME})")
+    print(f"  downloaded: {len(report.downloaded)} ({report.bytes / 1e6:.1f} MB, "
+          f"{report.bytes / 1e6 / elapsed:.1f} MB/s)  already present: {len(report.skipped)}  "
+          f"failed: {len(report.failed)}")
+    if report.failed:
+        print(f"Failed: {', '.join(sorted(report.failed))}", file=sys.stderr)
+        sys.exit(1)
+
+
+def cmd_index(args):
+    """Build or update the SQLite archive used by --local queries."""
+    import time
+
+    from catime.archive import ARCHIVE_NAME, Archive
+
+    root = _local_root()
+    if not (root / "catlist.json").exists():
+        print(f"No catlist.json under {root}; run `catime sync` first.", file=sys.stderr)
+        sys.exit(1)
+    started = time.monotonic()
+    archive = Archive(root / ARCHIVE_NAME)
+    if args.rebuild:
+        archive.clear()
+    changed = archive.refresh(root)
+    count = len(archive.catlist())
+    archive.close()
+    state = f"indexed in {time.monotonic() - started:.1f}s" if changed else "already up to date"
+    print(f"{root / ARCHIVE_NAME}: {count} cats, {state}")
+
+
+def _print_counter(title: str, counter: dict, total: int, top: int) -> None:
+    if not counter:
+        return
+    print(f"{title}:")
+    for name, n in sorted(counter.items(), key=lambda item: (-item[1], item[0]))[:top]:
+        print(f"  {n:6d}  {n / total * 100 if total else 0:5.1f}%  {name}")
+    print()
+
+
+def cmd_stats(args):
+    """Success/failure rates and model, fallback, character and season breakdowns."""
+    from catime.stats import summarize
+
+    try:
+        rollup = load_rollup(args.repo, local=args.local)
+    except fetch_errors() as e:
+        print(f"Error loading stats: {e}", file=sys.stderr)
+        sys.exit(1)
+    summary = summarize(rollup, args.from_date, args.to_date, by=args.by)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+    totals, periods = summary["totals"], summary["periods"]
+    if not totals["total"]:
+        print("No cats in that range.")
+        return
+
+    def rate(n: int, total: int) -> str:
+        return f"{n / total * 100:5.1f}%" if total else "    -"
+
+    span = f"{min(periods)} .. {max(periods)}"
+    print(f"{span}: {totals['total']} runs, {totals['success']} cats, {totals['failed']} failed "
+          f"({rate(totals['failed'], totals['total']).strip()}), "
+          f"{totals['fallbacks']} via fallback ({rate(totals['fallbacks'], totals['success']).strip()})")
+    print()
+    print(f"  {args.by:<10}  {'runs':>5}  {'failed':>6}  {'rate':>6}  {'fallback':>8}")
+    for period, bucket in periods.items():
+        print(f"  {period:<10}  {bucket['total']:5d}  {bucket['failed']:6d}  {rate(bucket['failed'], bucket['total'])}"
+              f"  {bucket['fallbacks']:8d}")
+    print()
+    _print_counter("Models", totals["models"], totals["success"], args.top)
+    _print_counter("Fell back from", totals["fallback_from"], totals["success"], args.top)
+    _print_counter("Fallback reasons", totals["reasons"], totals["success"], args.top)
+    _print_counter("Failure errors", totals["errors"], totals["failed"], args.top)
+    _print_counter("Characters", totals["characters"], totals["success"], args.top)
+    _print_counter("Seasons", totals["seasons"], totals["success"], args.top)
+
+
+def _pop_timings_flag(argv: list[str]) -> str | None:
+    """Remove --timings, --timings=json or --timings json from argv (any subcommand); returns the report format."""
+    from catime.utils import timings
+
+    fmt = timings.from_env()
+    i = 1
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--timings":
+            del argv[i]
+            # A following table/json is the flag's value, not the query.
+            fmt = argv.pop(i) if i < len(argv) and argv[i] in timings.FORMATS else "table"
+        elif arg.startswith("--timings="):
+            del argv[i]
+            fmt = arg.partition("=")[2]
+        else:
+            i += 1
+    if fmt is not None and fmt not in timings.FORMATS:
+        print(f"catime: --timings takes {' or '.join(timings.FORMATS)}, got {fmt!r}", file=sys.stderr)
+        sys.exit(2)
+    return fmt
 
 
 def main():
-    # Handle 'view' subcommand separately to avoid argparse conflicts
+    timings_format = _pop_timings_flag(sys.argv)
+    if timings_format is None:
+        _main()
+        return
+    from catime.utils import timings
+
+    timings.enable()
+    try:
+        _main()
+    finally:
+        timings.report(timings_format)
+        timings.disable()
+
+
+def _main():
+    import argparse
+
+    # Handle subcommands separately to avoid argparse conflicts with the query
     if len(sys.argv) >= 2 and sys.argv[1] == "view":
         view_parser = argparse.ArgumentParser(prog="catime view")
         view_parser.add_argument("--port", type=int, default=8000, help="Port (default: 8000)")
         cmd_view(view_parser.parse_args(sys.argv[2:]))
         return
 
+    if len(sys.argv) >= 2 and sys.argv[1] == "search":
+        search_parser = argparse.ArgumentParser(prog="catime search")
+        search_parser.add_argument("terms", help="Words or a Chinese phrase, e.g. 'bubble tea' or 珍珠奶茶")
+        search_parser.add_argument("--limit", type=int, default=10, help="Maximum results (default: 10)")
+        search_parser.add_argument("--repo", default=DEFAULT_REPO, help="GitHub repo owner/name")
+        search_parser.add_argument("--local", action="store_true", help="Index the local data files")
+        search_parser.add_argument("--refresh", action="store_true", help="Update the index before searching")
+        cmd_search(search_parser.parse_args(sys.argv[2:]))
+        return
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "sync":
+        sync_parser = argparse.ArgumentParser(prog="catime sync")
+        sync_parser.add_argument("--dir", help="Mirror directory (default: $CATIME_MIRROR_DIR or ~/.local/share/catime/mirror)")
+        sync_parser.add_argument("--repo", default=DEFAULT_REPO, help="GitHub repo owner/name")
+        sync_parser.add_argument("--workers", type=int, default=4, help="Concurrent downloads (default: 4)")
+        cmd_sync(sync_parser.parse_args(sys.argv[2:]))
+        return
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "export":
+        export_parser = argparse.ArgumentParser(prog="catime export")
+        export_parser.add_argument("--from", dest="from_date", type=_date_arg, help="First date, YYYY-MM-DD (default: the first cat)")
+        export_parser.add_argument("--to", dest="to_date", type=_date_arg, help="Last date, inclusive (default: the latest cat)")
+        export_parser.add_argument("--dir", required=True, help="Output directory; re-running resumes")
+        export_parser.add_argument("--workers", type=int, default=8, help="Concurrent downloads (default: 8)")
+        export_parser.add_argument("--repo", default=DEFAULT_REPO, help="GitHub repo owner/name")
+        export_parser.add_argument("--local", action="store_true", help="Read the catlist from local data")
+        cmd_export(export_parser.parse_args(sys.argv[2:]))
+        return
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "index":
+        index_parser = argparse.ArgumentParser(prog="catime index")
+        index_parser.add_argument("action", choices=("build",), help="Create or update the archive")
+        index_parser.add_argument("--rebuild", action="store_true", help="Start from an empty database")
+        cmd_index(index_parser.parse_args(sys.argv[2:]))
+        return
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "stats":
+        stats_parser = argparse.ArgumentParser(prog="catime stats")
+        stats_parser.add_argument("--from", dest="from_date", type=_date_arg, help="First date, YYYY-MM-DD")
+        stats_parser.add_argument("--to", dest="to_date", type=_date_arg, help="Last date, inclusive")
+        stats_parser.add_argument("--by", choices=("month", "day"), default="month", help="Row per month (default) or day")
+        stats_parser.add_argument("--top", type=int, default=10, help="Rows per breakdown (default: 10)")
+        stats_parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+        stats_parser.add_argument("--repo", default=DEFAULT_REPO, help="GitHub repo owner/name")
+        stats_parser.add_argument("--local", action="store_true", help="Read stats from local data")
+        cmd_stats(stats_parser.parse_args(sys.argv[2:]))
+        return
+
     parser = argparse.ArgumentParser(
         prog="catime",
         description="View AI-generated hourly cat images",
     )
     parser.add_argument(
         "query", nargs="?",
-        help="Cat number (e.g. 42), date (2026-01-30), date+hour (2026-01-30T05), 'today', 'yesterday', or 'view'.",
+        help="Cat number (e.g. 42), number range (100-250), date (2026-01-30), date+hour (2026-01-30T05), "
+             "month (2026-03), date range (2026-03-01..2026-03-20), 'today', 'yesterday', or 'view'.",
     )
     parser.add_argument("--repo", default=DEFAULT_REPO, help="GitHub repo owner/name")
-    parser.add_argument("--local", action="store_true", help="Use local catlist.json")
+    parser.add_argument("--local", action="store_true", help="Use local data (a `catime sync` mirror, else the source tree)")
     parser.add_argument("--list", action="store_true", help="List all cats")
+    parser.add_argument("--limit", type=int, help="With --list: show at most N cats")
+    parser.add_argument("--offset", type=int, default=0, help="With --list: skip the first N cats")
+    parser.add_argument("--reverse", action="store_true", help="With --list: newest first")
+    parser.add_argument("--timings", metavar="json", help="Report per-phase timings and bytes to stderr "
+                        "(any command; also $CATIME_TIMINGS=1 or json)")
     args = parser.parse_args()
 
+    if args.list:
+        cmd_list(args)
+        return
+
+    from catime.utils import timings
+
     try:
-        cats = load_local_catlist() if args.local else fetch_catlist(args.repo)
-    except Exception as e:
+        with timings.phase("phase", "load catlist"):
+            cats = load_local_catlist() if args.local else load_catlist(args.repo)
+    except fetch_errors() as e:
         print(f"Error loading cat list: {e}", file=sys.stderr)
         sys.exit(1)
 
@@ -184,11 +814,6 @@ def main():
         print("No cats yet! Check back in an hour.")
         return
 
-    if args.list:
-        for i, cat in enumerate(cats, 1):
-            print_cat(cat, i)
-        return
-
     if args.query is None:
         print(f"Total cats: {len(cats)}")
         print(f"Latest: #{len(cats):04d}  {cats[-1]['timestamp']}")
@@ -199,8 +824,17 @@ def main():
         print("  catime yesterday       List yesterday's cats")
         print("  catime 2026-01-30      List all cats from a date")
         print("  catime 2026-01-30T05   View the cat from a specific hour")
+        print("  catime 2026-03         List all cats from a month")
+        print("  catime 100-250         List cats #100 to #250")
+        print("  catime 2026-03-01..2026-03-20  List cats in a date range")
         print("  catime latest          View the latest cat")
         print("  catime --list          List all cats")
+        print("  catime --list --reverse --limit 20   List the 20 newest cats")
+        print("  catime search 'bubble tea'   Search titles, ideas, stories and prompts")
+        print("  catime sync            Mirror the data files for offline --local use")
+        print("  catime export --from 2026-03-01 --to 2026-03-31 --dir out/   Download images + metadata")
+        print("  catime index build     Index local data in SQLite for fast --local queries")
+        print("  catime stats --by day --from 2026-03-01   Failure rates, models, fallbacks")
         print("  catime view            Open cat gallery in browser")
         return
 
@@ -208,7 +842,10 @@ def main():
 
     # latest
     if args.query == "latest":
-        print_cat(enrich_cat(cats[-1], **detail_opts), len(cats))
+        with timings.phase("phase", "enrich"):
+            cat = enrich_cat(cats[-1], **detail_opts)
+            _ = cat.detail  # load the month file inside the phase
+        print_cat(cat, len(cats))
         return
 
     # Try as number first
@@ -217,16 +854,33 @@ def main():
         if idx < 0 or idx >= len(cats):
             print(f"Cat #{args.query} not found. Available: 1-{len(cats)}", file=sys.stderr)
             sys.exit(1)
-        print_cat(enrich_cat(cats[idx], **detail_opts), int(args.query))
+        with timings.phase("phase", "enrich"):
+            cat = enrich_cat(cats[idx], **detail_opts)
+            _ = cat.detail  # load the month file inside the phase
+        print_cat(cat, int(args.query))
         return
 
-    # Try as time query
-    matched = filter_by_query(cats, args.query)
+    # Number range, then time query
+    number_range = parse_number_range(args.query)
+    if number_range:
+        start, end = number_range
+        if start > len(cats):
+            print(f"Cat #{start} not found. Available: 1-{len(cats)}", file=sys.stderr)
+            sys.exit(1)
+        matched = cats[start - 1:end]
+    else:
+        from catime.shards import query_scope
+
+        with timings.phase("phase", "query"):
+            matched = filter_by_query(query_scope(cats, args.query), args.query)
     if not matched:
         print(f"No cats found for '{args.query}'.", file=sys.stderr)
         sys.exit(1)
 
+    with timings.phase("phase", "enrich"):
+        matched = load_cats(matched, **detail_opts)
+        prefetch_details({cat.month for cat in matched}, **detail_opts)
     print(f"Found {len(matched)} cat(s) for '{args.query}':\n")
     for cat in matched:
-        print_cat(enrich_cat(cat, **detail_opts))
+        print_cat(cat)
         print()
@@ -0,0 +1,486 @@
+"""Programmatic access to a catime repo's cats.
+
+    from catime import Client
+
+    client = Client()                       # yazelin/catime, on-disk cache
+    cat = client.latest()
+    cats = client.get_many([42, 1000, 2500])
+    print(cat.number, cat.url, cat.story)
+
+Index data comes from the shard manifest when the repo publishes one (the
+compact catlist or catlist.json otherwise), the open month's newest
+details come from the journal until compaction, and every file goes
+through the revalidating HTTP cache. Detail files are kept per Client: closed months
+for the Client's lifetime, the open month for `ttl` seconds. Batch calls
+group cats by month and fetch each month once, concurrently.
+
+AsyncClient has the same methods as coroutines and fetches over an
+AsyncSession, sharing the on-disk cache with Client.
+"""
+
+import threading
+import time
+from pathlib import Path
+
+from catime.records import Cat
+from catime.sources import fetch_errors, source_urls
+from catime.timeline import filter_by_query, month_closed_since, query_months
+
+DEFAULT_REPO = "yazelin/catime"
+
+
+def _entries_at(cats, numbers) -> list[dict | None]:
+    """Index entries for cat numbers (catlist positions); None where out of range."""
+    from catime.shards import ShardedCatlist
+
+    numbers = list(numbers)
+    positions = sorted({n - 1 for n in numbers if 1 <= n <= len(cats)})
+    if isinstance(cats, ShardedCatlist):
+        found = dict(zip(positions, cats.at(positions)))
+    else:
+        found = {p: cats[p] for p in positions}
+    return [found.get(n - 1) if 1 <= n <= len(cats) else None for n in numbers]
+
+
+def _positions(cats, numbers) -> list[int]:
+    return [n - 1 for n in numbers if 1 <= n <= len(cats)]
+
+
+def _valid_manifest(manifest) -> dict | None:
+    from catime.shards import MANIFEST_VERSION
+
+    return manifest if isinstance(manifest, dict) and manifest.get("version") == MANIFEST_VERSION else None
+
+
+def _detail_failed(error: Exception) -> bool:
+    """Whether a detail fetch error is a failure; a 404 is an empty month (e.g. only failed cats)."""
+    return getattr(getattr(error, "response", None), "status_code", None) != 404
+
+
+def _index_details(details: list, month: str, journal: list[dict] | None) -> dict[int, dict]:
+    """Number -> detail for a month file, plus the journal's details when it is given (open month)."""
+    if journal is not None:
+        # New cats of the open month sit in the journal until compaction.
+        from catime.journal import month_details
+
+        details = details + month_details(journal, month, (d.get("number") for d in details if isinstance(d, dict)))
+    index: dict[int, dict] = {}
+    for d in details:
+        if isinstance(d, dict) and d.get("number") is not None:
+            index.setdefault(d["number"], d)
+    return index
+
+
+class Client:
+    """Read cats from a catime repo.
+
+    `cache` is a directory for the HTTP cache, None for the default
+    (~/.cache/catime or $CATIME_CACHE_DIR), or False to keep nothing on disk.
+    `session` is a catime.utils.http.Session to share connections with.
+    """
+
+    def __init__(self, repo: str = DEFAULT_REPO, cache: str | Path | bool | None = None,
+                 session=None, max_workers: int = 4, ttl: float = 60.0):
+        self.repo = repo
+        self.cache = Path(cache).expanduser() if isinstance(cache, (str, Path)) else cache
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self._session = session
+        self._lock = threading.Lock()
+        self._manifest: tuple[float, dict | None] | None = None
+        self._shards: dict[str, list[dict]] = {}
+        self._details: dict[str, tuple[float, dict[int, dict]]] = {}
+        self._journal: tuple[float, list[dict]] | None = None
+
+    # -- fetching ---------------------------------------------------------
+
+    def _fetch(self, url: str, max_retries: int, immutable_after: float | None, expected_sha256: str | None):
+        from catime.utils.http import cached_get_json, safe_get_json
+
+        if self.cache is False:
+            return safe_get_json(url, max_retries=max_retries, session=self._session, follow_redirects=True)
+        return cached_get_json(
+            url, max_retries=max_retries, immutable_after=immutable_after, session=self._session,
+            expected_sha256=expected_sha256, cache_root=self.cache or None, follow_redirects=True,
+        )
+
+    def _get_json(self, relpath: str, immutable_after: float | None = None, expected_sha256: str | None = None):
+        """A data file from GitHub Pages, falling back to raw.githubusercontent.com."""
+        pages_url, raw_url = source_urls(self.repo, relpath)
+        try:
+            result = self._fetch(pages_url, 1, immutable_after, expected_sha256)
+            if result is not None:
+                return result
+        except fetch_errors():
+            pass
+        return self._fetch(raw_url, 3, immutable_after, expected_sha256)
+
+    def _get_journal(self) -> list[dict]:
+        """Journal records not yet compacted into catlist.json, kept for `ttl` seconds."""
+        from catime.journal import JOURNAL_NAME, parse_records, read_records
+        from catime.utils.http import cached_get_file, default_session
+
+        with self._lock:
+            if self._journal and time.time() - self._journal[0] < self.ttl:
+                return self._journal[1]
+        records: list[dict] = []
+        for url, max_retries in zip(source_urls(self.repo, JOURNAL_NAME), (1, 3)):
+            try:
+                if self.cache is False:
+                    session = self._session or default_session()
+                    text = session.get(url, max_retries=max_retries, follow_redirects=True).text
+                    records = parse_records(text.splitlines())
+                else:
+                    records = read_records(cached_get_file(
+                        url, max_retries=max_retries, session=self._session,
+                        cache_root=self.cache or None, follow_redirects=True,
+                    ))
+                break
+            except fetch_errors():
+                continue
+        with self._lock:
+            self._journal = (time.time(), records)
+        return records
+
+    def _map(self, fn, items) -> list:
+        items = list(items)
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return list(pool.map(fn, items))
+
+    # -- index ------------------------------------------------------------
+
+    def _load_manifest(self) -> dict | None:
+        from catime.shards import MANIFEST_NAME, SHARD_DIR
+
+        with self._lock:
+            if self._manifest and time.time() - self._manifest[0] < self.ttl:
+                return self._manifest[1]
+        try:
+            manifest = _valid_manifest(self._get_json(f"{SHARD_DIR}/{MANIFEST_NAME}"))
+        except fetch_errors():
+            manifest = None
+        with self._lock:
+            self._manifest = (time.time(), manifest)
+        return manifest
+
+    def _load_shards(self, months, manifest: dict) -> dict[str, list[dict]]:
+        from catime.shards import SHARD_DIR
+
+        def load(month: str) -> list[dict]:
+            meta = manifest["months"][month]
+            with self._lock:
+                cached = self._shards.get(meta["sha256"])
+            if cached is not None:
+                return cached
+            try:
+                entries = self._get_json(f"{SHARD_DIR}/{month}.json", expected_sha256=meta["sha256"])
+            except fetch_errors():
+                entries = None
+            if not isinstance(entries, list) or len(entries) != meta["count"]:
+                entries = list(self._full_catlist()[meta["offset"]:meta["offset"] + meta["count"]])
+            with self._lock:
+                self._shards[meta["sha256"]] = entries
+            return entries
+
+        months = list(months)
+        return dict(zip(months, self._map(load, months)))
+
+    def _full_catlist(self):
+        from catime.compact import COMPACT_NAME, CompactCatlist
+        from catime.journal import index_entries
+
+        try:
+            cats = CompactCatlist(self._get_json(COMPACT_NAME))
+        except fetch_errors():
+            cats = self._get_json("catlist.json") or []
+        pending = index_entries(self._get_journal())
+        return list(cats) + pending if pending else cats
+
+    def catlist(self):
+        """The catlist as a sequence of index dicts, loading only what is read."""
+        manifest = self._load_manifest()
+        if manifest is None:
+            return self._full_catlist()
+        from catime.journal import index_entries
+        from catime.shards import ShardedCatlist
+
+        return ShardedCatlist(
+            manifest, lambda months: self._load_shards(months, manifest), pending=index_entries(self._get_journal()),
+        )
+
+    # -- details ----------------------------------------------------------
+
+    def _detail_index(self, month: str) -> dict[int, dict]:
+        with self._lock:
+            cached = self._details.get(month)
+        closed = month_closed_since(month)
+        if cached and (closed is not None or time.time() - cached[0] < self.ttl):
+            return cached[1]
+        try:
+            details = self._get_json(f"cats/{month}.json", immutable_after=closed)
+        except fetch_errors() as e:
+            details = None if _detail_failed(e) else []
+        if not isinstance(details, list):
+            # Not cached, so the next call tries again; a stale copy beats nothing.
+            return cached[1] if cached else {}
+        index = _index_details(details, month, self._get_journal() if closed is None else None)
+        with self._lock:
+            self._details[month] = (time.time(), index)
+        return index
+
+    def _detail(self, month: str, number: int) -> dict | None:
+        return self._detail_index(month).get(number)
+
+    def _cats(self, entries) -> list[Cat | None]:
+        """Cats for index entries (None stays None), with each month's details fetched once."""
+        months = {e["timestamp"][:7] for e in entries if e and e.get("number") is not None}
+        self._map(self._detail_index, sorted(months))
+        return [Cat.from_dict(e, self._detail) if e else None for e in entries]
+
+    # -- queries ----------------------------------------------------------
+
+    def count(self) -> int:
+        return len(self.catlist())
+
+    def latest(self) -> Cat | None:
+        cats = self.catlist()
+        return self._cats([cats[-1]])[0] if len(cats) else None
+
+    def get(self, number: int) -> Cat | None:
+        """Cat #number (catlist position, as `catime 42` uses), or None."""
+        return self.get_many([number])[0]
+
+    def get_many(self, numbers) -> list[Cat | None]:
+        """Cats for several numbers, in the given order; unknown numbers give None.
+
+        Shards and detail files are fetched once per month, concurrently.
+        """
+        return self._cats(_entries_at(self.catlist(), numbers))
+
+    def range(self, start: int, end: int) -> list[Cat]:
+        """Cats #start..#end inclusive."""
+        cats = self.catlist()
+        return self._cats(cats[max(start, 1) - 1:end])
+
+    def query(self, query: str) -> list[Cat]:
+        """Cats for a time query: 'today', 'yesterday', a date, date+hour, month or date range."""
+        from catime.shards import query_scope
+
+        cats = self.catlist()
+        return self._cats(filter_by_query(query_scope(cats, query), query))
+
+
+class AsyncClient:
+    """asyncio twin of Client: the same queries as coroutines, fetched over an AsyncSession.
+
+    `cache` works as for Client and shares its files. `session` is a
+    catime.utils.http.AsyncSession to share connections with; without one the
+    client opens its own, closed by `aclose()` or `async with`. Shards and
+    detail files for different months are fetched concurrently.
+    """
+
+    def __init__(self, repo: str = DEFAULT_REPO, cache: str | Path | bool | None = None,
+                 session=None, ttl: float = 60.0):
+        from catime.utils.http import AsyncSession
+
+        self.repo = repo
+        self.cache = Path(cache).expanduser() if isinstance(cache, (str, Path)) else cache
+        self.ttl = ttl
+        self._owns_session = session is None
+        self._session = session or AsyncSession()
+        self._manifest: tuple[float, dict | None] | None = None
+        self._shards: dict[str, list[dict]] = {}
+        self._details: dict[str, tuple[float, dict[int, dict]]] = {}
+        self._journal: tuple[float, list[dict]] | None = None
+
+    async def aclose(self) -> None:
+        if self._owns_session:
+            await self._session.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    # -- fetching ---------------------------------------------------------
+
+    async def _fetch(self, url: str, max_retries: int, immutable_after: float | None, expected_sha256: str | None):
+        from catime.utils.http import async_cached_get_json
+
+        if self.cache is False:
+            return await self._session.get_json(url, max_retries=max_retries, follow_redirects=True)
+        return await async_cached_get_json(
+            url, self._session, max_retries=max_retries, immutable_after=immutable_after,
+            expected_sha256=expected_sha256, cache_root=self.cache or None, follow_redirects=True,
+        )
+
+    async def _get_json(self, relpath: str, immutable_after: float | None = None, expected_sha256: str | None = None):
+        """A data file from GitHub Pages, falling back to raw.githubusercontent.com."""
+        pages_url, raw_url = source_urls(self.repo, relpath)
+        try:
+            result = await self._fetch(pages_url, 1, immutable_after, expected_sha256)
+            if result is not None:
+                return result
+        except fetch_errors():
+            pass
+        return await self._fetch(raw_url, 3, immutable_after, expected_sha256)
+
+    async def _get_journal(self) -> list[dict]:
+        """Journal records not yet compacted into catlist.json, kept for `ttl` seconds."""
+        from catime.journal import JOURNAL_NAME, parse_records, read_records
+        from catime.utils.http import async_cached_get_file
+
+        if self._journal and time.time() - self._journal[0] < self.ttl:
+            return self._journal[1]
+        records: list[dict] = []
+        for url, max_retries in zip(source_urls(self.repo, JOURNAL_NAME), (1, 3)):
+            try:
+                if self.cache is False:
+                    response = await self._session.get(url, max_retries=max_retries, follow_redirects=True)
+                    records = parse_records(response.text.splitlines())
+                else:
+                    records = read_records(await async_cached_get_file(
+                        url, self._session, max_retries=max_retries,
+                        cache_root=self.cache or None, follow_redirects=True,
+                    ))
+                break
+            except fetch_errors():
+                continue
+        self._journal = (time.time(), records)
+        return records
+
+    # -- index ------------------------------------------------------------
+
+    async def _load_manifest(self) -> dict | None:
+        from catime.shards import MANIFEST_NAME, SHARD_DIR
+
+        if self._manifest and time.time() - self._manifest[0] < self.ttl:
+            return self._manifest[1]
+        try:
+            manifest = _valid_manifest(await self._get_json(f"{SHARD_DIR}/{MANIFEST_NAME}"))
+        except fetch_errors():
+            manifest = None
+        self._manifest = (time.time(), manifest)
+        return manifest
+
+    async def _load_shards(self, months, manifest: dict) -> None:
+        """Fetch the shards for `months` that are not held yet, concurrently."""
+        import asyncio
+
+        from catime.shards import SHARD_DIR
+
+        async def load(month: str) -> None:
+            meta = manifest["months"][month]
+            if meta["sha256"] in self._shards:
+                return
+            try:
+                entries = await self._get_json(f"{SHARD_DIR}/{month}.json", expected_sha256=meta["sha256"])
+            except fetch_errors():
+                entries = None
+            if not isinstance(entries, list) or len(entries) != meta["count"]:
+                entries = list((await self._full_catlist())[meta["offset"]:meta["offset"] + meta["count"]])
+            self._shards[meta["sha256"]] = entries
+
+        await asyncio.gather(*(load(month) for month in sorted(months)))
+
+    async def _full_catlist(self):
+        from catime.compact import COMPACT_NAME, CompactCatlist
+        from catime.journal import index_entries
+
+        try:
+            cats = CompactCatlist(await self._get_json(COMPACT_NAME))
+        except fetch_errors():
+            cats = await self._get_json("catlist.json") or []
+        pending = index_entries(await self._get_journal())
+        return list(cats) + pending if pending else cats
+
+    async def catlist(self):
+        """The catlist as a sequence of index dicts.
+
+        When the repo is sharded, only shards already fetched by earlier calls
+        can be read; use the query methods, which fetch what they need first.
+        """
+        manifest = await self._load_manifest()
+        if manifest is None:
+            return await self._full_catlist()
+        from catime.journal import index_entries
+        from catime.shards import ShardedCatlist
+
+        def held(months) -> dict[str, list[dict]]:
+            return {month: self._shards[manifest["months"][month]["sha256"]] for month in months}
+
+        return ShardedCatlist(manifest, held, pending=index_entries(await self._get_journal()))
+
+    async def _ensure(self, cats, positions) -> None:
+        from catime.shards import ShardedCatlist
+
+        if isinstance(cats, ShardedCatlist):
+            await self._load_shards(cats.shard_months(positions), cats.manifest)
+
+    # -- details ----------------------------------------------------------
+
+    async def _detail_index(self, month: str) -> dict[int, dict]:
+        cached = self._details.get(month)
+        closed = month_closed_since(month)
+        if cached and (closed is not None or time.time() - cached[0] < self.ttl):
+            return cached[1]
+        try:
+            details = await self._get_json(f"cats/{month}.json", immutable_after=closed)
+        except fetch_errors() as e:
+            details = None if _detail_failed(e) else []
+        if not isinstance(details, list):
+            # Not cached, so the next call tries again; a stale copy beats nothing.
+            return cached[1] if cached else {}
+        index = _index_details(details, month, await self._get_journal() if closed is None else None)
+        self._details[month] = (time.time(), index)
+        return index
+
+    async def _cats(self, entries) -> list[Cat | None]:
+        """Cats for index entries (None stays None), with each month's details fetched once, concurrently."""
+        import asyncio
+
+        months = sorted({e["timestamp"][:7] for e in entries if e and e.get("number") is not None})
+        indexes = dict(zip(months, await asyncio.gather(*(self._detail_index(m) for m in months))))
+        return [Cat.from_dict(e, lambda month, number: indexes[month].get(number)) if e else None for e in entries]
+
+    # -- queries ----------------------------------------------------------
+
+    async def count(self) -> int:
+        return len(await self.catlist())
+
+    async def latest(self) -> Cat | None:
+        cats = await self.catlist()
+        return (await self._cats([cats[-1]]))[0] if len(cats) else None
+
+    async def get(self, number: int) -> Cat | None:
+        """Cat #number (catlist position, as `catime 42` uses), or None."""
+        return (await self.get_many([number]))[0]
+
+    async def get_many(self, numbers) -> list[Cat | None]:
+        """Cats for several numbers, in the given order; unknown numbers give None."""
+        numbers = list(numbers)
+        cats = await self.catlist()
+        await self._ensure(cats, _positions(cats, numbers))
+        return await self._cats(_entries_at(cats, numbers))
+
+    async def range(self, start: int, end: int) -> list[Cat]:
+        """Cats #start..#end inclusive."""
+        cats = await self.catlist()
+        positions = range(max(start, 1) - 1, min(end, len(cats)))
+        await self._ensure(cats, positions)
+        return await self._cats(cats[positions.start:positions.stop])
+
+    async def query(self, query: str) -> list[Cat]:
+        """Cats for a time query: 'today', 'yesterday', a date, date+hour, month or date range."""
+        from catime.shards import ShardedCatlist, query_scope
+
+        cats = await self.catlist()
+        span = query_months(query)
+        if isinstance(cats, ShardedCatlist) and span:
+            await self._load_shards([m for m in cats.manifest["months"] if span[0] <= m <= span[1]], cats.manifest)
+        return await self._cats(filter_by_query(query_scope(cats, query), query))
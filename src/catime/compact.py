@@ -0,0 +1,172 @@
+"""Compact columnar encoding of catlist.json (catlist.compact.json).
+
+Most of catlist.json is repetition: every entry spells out its keys, the
+same few dozen model strings, and a release URL derivable from its own
+timestamp. The compact form stores one array per key instead:
+
+- shapes/shape: each distinct key set once, then a shape id per row, so
+  absent keys and null values round-trip (keys come back in column order);
+- timestamp: minutes since the previous row (a string for any timestamp
+  not in "YYYY-MM-DD HH:MM UTC" form);
+- number: offset from position + 1, which is 0 for every successful cat;
+- url: index into url_templates, filled with {date}, {hm} and {month};
+- DICT_FIELDS: index into a per-field value dictionary;
+- anything else: the raw values.
+
+CompactCatlist decodes rows on access, so reading one entry never builds
+the other thousands.
+"""
+
+import calendar
+import json
+import re
+import time
+from collections.abc import Sequence
+from itertools import accumulate
+from pathlib import Path
+
+COMPACT_VERSION = 1
+COMPACT_NAME = "catlist.compact.json"
+DICT_FIELDS = ("model", "status", "error", "inspiration", "character", "character_name", "season")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M UTC"
+
+_TIMESTAMP_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2}) (\d{2}):(\d{2}) UTC$")
+
+
+def _minutes(timestamp) -> int | None:
+    m = _TIMESTAMP_RE.match(timestamp) if isinstance(timestamp, str) else None
+    if not m:
+        return None
+    return calendar.timegm(tuple(int(g) for g in m.groups()) + (0,)) // 60
+
+
+def _url_parts(timestamp: str) -> dict[str, str]:
+    return {"date": timestamp[:10], "hm": timestamp[11:16].replace(":", ""), "month": timestamp[:7]}
+
+
+def _url_template(url: str, timestamp: str) -> str:
+    parts = _url_parts(timestamp)
+    template = url.replace("{", "{{").replace("}", "}}")
+    template = template.replace(f"cat_{parts['date']}_{parts['hm']}_UTC", "cat_{date}_{hm}_UTC")
+    template = template.replace(f"cats-{parts['month']}/", "cats-{month}/")
+    if template.format(**parts) != url:
+        # Not derivable from this timestamp: keep the URL literally.
+        return url.replace("{", "{{").replace("}", "}}")
+    return template
+
+
+class _Dictionary:
+    def __init__(self):
+        self.values: list = []
+        self._ids: dict = {}
+
+    def id(self, value) -> int:
+        key = json.dumps(value, sort_keys=True)
+        if key not in self._ids:
+            self._ids[key] = len(self.values)
+            self.values.append(value)
+        return self._ids[key]
+
+
+def encode_catlist(cats: list[dict]) -> dict:
+    """Columnar form of a catlist; list(CompactCatlist(encode_catlist(cats))) == cats."""
+    shapes, row_shapes = _Dictionary(), []
+    dicts = {field: _Dictionary() for field in DICT_FIELDS}
+    templates = _Dictionary()
+    columns: dict[str, list] = {}
+    clock = None
+
+    for position, cat in enumerate(cats):
+        for key in cat:
+            columns.setdefault(key, [None] * position)
+        row_shapes.append(shapes.id([key for key in columns if key in cat]))
+        for key, column in columns.items():
+            if key not in cat:
+                column.append(None)
+                continue
+            value = cat[key]
+            if key == "timestamp":
+                minutes = _minutes(value)
+                if minutes is None:
+                    column.append(value)
+                else:
+                    column.append(minutes - (clock or 0))
+                    clock = minutes
+            elif key == "number" and isinstance(value, int):
+                column.append(value - position - 1)
+            elif key == "url" and isinstance(value, str) and isinstance(cat.get("timestamp"), str):
+                column.append(templates.id(_url_template(value, cat["timestamp"])))
+            elif key in dicts:
+                column.append(dicts[key].id(value))
+            else:
+                column.append(value)
+
+    return {
+        "version": COMPACT_VERSION,
+        "count": len(cats),
+        "shapes": shapes.values,
+        "shape": row_shapes,
+        "dicts": {field: d.values for field, d in dicts.items() if d.values},
+        "url_templates": templates.values,
+        "columns": columns,
+    }
+
+
+def write_compact(cats: list[dict], path: Path) -> None:
+    data = json.dumps(encode_catlist(cats), ensure_ascii=False, separators=(",", ":")) + "\n"
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(data, encoding="utf-8")
+    tmp.replace(path)
+
+
+class CompactCatlist(Sequence):
+    """Read-only catlist over decoded compact JSON; rows are built on access."""
+
+    def __init__(self, data: dict):
+        if not isinstance(data, dict) or data.get("version") != COMPACT_VERSION:
+            raise ValueError("not a compact catlist")
+        self._count = data["count"]
+        self._shapes = data["shapes"]
+        self._shape = data["shape"]
+        self._dicts = data["dicts"]
+        self._templates = data["url_templates"]
+        self._columns = data["columns"]
+        # Running clock: absolute minutes per row (string timestamps do not advance it).
+        deltas = self._columns.get("timestamp", [])
+        self._clock = list(accumulate(d if isinstance(d, int) else 0 for d in deltas))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._row(i) for i in range(*key.indices(self._count))]
+        position = key + self._count if key < 0 else key
+        if not 0 <= position < self._count:
+            raise IndexError("catlist index out of range")
+        return self._row(position)
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self._row(position)
+
+    def _timestamp(self, position: int):
+        value = self._columns["timestamp"][position]
+        if isinstance(value, str):
+            return value
+        return time.strftime(TIMESTAMP_FORMAT, time.gmtime(self._clock[position] * 60))
+
+    def _row(self, position: int) -> dict:
+        cat = {}
+        for key in self._shapes[self._shape[position]]:
+            value = self._columns[key][position]
+            if key == "timestamp":
+                value = self._timestamp(position)
+            elif key == "number" and isinstance(value, int):
+                value = value + position + 1
+            elif key == "url" and isinstance(value, int):
+                value = self._templates[value].format(**_url_parts(self._timestamp(position)))
+            elif key in self._dicts and value is not None:
+                value = self._dicts[key][value]
+            cat[key] = value
+        return cat
@@ -0,0 +1,198 @@
+"""Bulk image export: download release assets for a range of cats.
+
+Downloads run on a bounded worker pool over one keep-alive session, so
+each host (github.com and the release-asset CDN it redirects to) costs
+one TLS handshake per connection rather than one per image. A release URL
+is followed through at most one redirect, and the asset location it
+resolves to is remembered, so retries go straight to the CDN host. Runs
+are resumable: a file whose size matches the sidecar record, or the
+Content-Length of the response, is not downloaded again. The JSONL sidecar
+holds each exported cat's enriched metadata plus its file name and size;
+records are appended as downloads finish, so an interrupted run keeps
+them, and the file is rewritten in catlist order at the end.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlsplit
+
+SIDECAR_NAME = "catime-export.jsonl"
+CHUNK_SIZE = 1 << 16
+
+
+@dataclass
+class ExportReport:
+    downloaded: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    bytes: int = 0
+
+
+class _Retry(Exception):
+    def __init__(self, response=None):
+        self.response = response
+
+
+def file_name(url: str) -> str:
+    return Path(urlsplit(url).path).name
+
+
+class Exporter:
+    """Downloads cat images into `out_dir`; `session` is a catime.utils.http.Session."""
+
+    def __init__(self, out_dir: Path, session=None, workers: int = 8, max_retries: int = 3,
+                 timeout: float = 60.0):
+        self.out_dir = out_dir
+        self.workers = workers
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._session = session
+        self._sidecar_path = out_dir / SIDECAR_NAME
+        self._records = self._read_sidecar()
+        self._locations: dict[str, str] = {}
+
+    def _read_sidecar(self) -> dict[str, dict]:
+        records = {}
+        try:
+            with self._sidecar_path.open(encoding="utf-8") as fp:
+                for line in fp:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict) and record.get("file"):
+                        records[record["file"]] = record
+        except OSError:
+            pass
+        return records
+
+    def _open(self, session, url: str):
+        """Streamed response for `url`, following one redirect at most.
+
+        The redirect's target is remembered per URL; a remembered target that
+        no longer answers (signed asset URLs expire) is resolved again.
+        """
+        target = self._locations.get(url, url)
+        response = session.stream(target, timeout=self.timeout, follow_redirects=False)
+        first = response.__enter__()
+        if target != url and first.status_code in (401, 403, 404, 410):
+            response.__exit__(None, None, None)
+            self._locations.pop(url, None)
+            return self._open(session, url)
+        if not first.is_redirect:
+            return response, first
+        location = first.headers.get("location")
+        response.__exit__(None, None, None)
+        if not location:
+            raise _Retry(first)
+        target = self._locations[url] = str(first.url.join(location))
+        response = session.stream(target, timeout=self.timeout, follow_redirects=False)
+        return response, response.__enter__()
+
+    def _append_record(self, record: dict) -> None:
+        """Checkpoint one record to the sidecar; the last line for a file wins on read."""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._sidecar_path.open("a", encoding="utf-8") as fp:
+            fp.write(line)
+
+    def _fetch(self, session, url: str, path: Path) -> int | None:
+        """Download `url` to `path`; returns bytes written, or None if already complete."""
+        context, response = self._open(session, url)
+        try:
+            if response.status_code != 200:
+                from catime.utils.http import _should_retry
+
+                if _should_retry(response):
+                    raise _Retry(response)
+                response.raise_for_status()
+                raise _Retry(response)
+            length = response.headers.get("content-length")
+            expected = int(length) if length and length.isdigit() else None
+            if expected is not None and path.exists() and path.stat().st_size == expected:
+                return None
+            part = path.with_name(path.name + ".part")
+            written = 0
+            with part.open("wb") as fp:
+                for chunk in response.iter_bytes(CHUNK_SIZE):
+                    fp.write(chunk)
+                    written += len(chunk)
+            if expected is not None and written != expected:
+                part.unlink(missing_ok=True)
+                raise _Retry()
+            part.replace(path)
+            return written
+        finally:
+            context.__exit__(None, None, None)
+
+    def export_one(self, cat) -> tuple[str, dict | None, int]:
+        """Export one cat; returns (outcome, sidecar record, bytes downloaded).
+
+        The outcome is "downloaded", "skipped" or "failed" (with no record).
+        """
+        import httpx
+
+        from catime.utils.http import _backoff_delay, default_session
+
+        name = file_name(cat.url)
+        path = self.out_dir / name
+        record = {**cat.to_dict(), **cat.detail, "file": name}
+        known = self._records.get(name)
+        if known and path.exists() and path.stat().st_size == known.get("bytes"):
+            return "skipped", {**record, "bytes": known["bytes"]}, 0
+
+        session = self._session or default_session()
+        for attempt in range(self.max_retries):
+            response = None
+            try:
+                written = self._fetch(session, cat.url, path)
+            except _Retry as e:
+                response = e.response
+            except httpx.HTTPStatusError:
+                break
+            except (httpx.TimeoutException, httpx.TransportError):
+                pass
+            else:
+                record["bytes"] = path.stat().st_size
+                if written is None:
+                    return "skipped", record, 0
+                return "downloaded", record, written
+            delay = _backoff_delay(attempt, response)
+            if delay is None or attempt == self.max_retries - 1:
+                break
+            time.sleep(delay)
+        return "failed", None, 0
+
+    def export(self, cats) -> ExportReport:
+        """Download every cat with a URL and rewrite the sidecar in catlist order.
+
+        Records are appended to the sidecar as each download finishes.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        report = ExportReport()
+        cats = [c for c in cats if c.url and not c.failed]
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.export_one, cat): i for i, cat in enumerate(cats)}
+            for future in as_completed(futures):
+                outcome, record, written = results[futures[future]] = future.result()
+                if outcome == "downloaded":
+                    self._append_record(record)
+
+        for i, cat in enumerate(cats):
+            outcome, record, written = results[i]
+            getattr(report, outcome).append(file_name(cat.url))
+            report.bytes += written
+            if record is not None:
+                self._records[record["file"]] = record
+        order = {file_name(c.url): i for i, c in enumerate(cats)}
+        records = sorted(self._records.values(), key=lambda r: (r["file"] not in order, order.get(r["file"], 0), r["file"]))
+        tmp = self._sidecar_path.with_name(self._sidecar_path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fp:
+            for record in records:
+                fp.write(json.dumps(record, ensure_ascii=False) + "\n")
+        tmp.replace(self._sidecar_path)
+        return report
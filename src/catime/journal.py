@@ -0,0 +1,72 @@
+"""Append-only journal of new cats (journal.jsonl) ahead of catlist.json.
+
+The hourly generator appends one line per cat here instead of rewriting
+catlist.json and the month's detail file; compaction
+(`generate_cat.py --compact`, also run every CATLIST_COMPACT_EVERY entries
+and when a new month starts) folds the journal into those published views
+and empties it. Each line is
+
+    {"index": {...catlist.json entry...}, "detail": {...cats/YYYY-MM.json entry...}}
+
+with "detail" absent for cats that have none. The journal is mirrored to
+docs/ on every run, and every reader of catlist.json or a detail file (the
+CLI, Client, sync, the archive, the gallery, Telegram, RSS) appends the
+journal's entries to what it read.
+"""
+
+import json
+import os
+from pathlib import Path
+
+JOURNAL_NAME = "journal.jsonl"
+
+
+def append_record(path: Path, index_entry: dict, detail: dict | None = None) -> None:
+    """Append one cat as a single line, flushed to disk before returning."""
+    record = {"index": index_entry}
+    if detail:
+        record["detail"] = detail
+    line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+    with path.open("a+b") as handle:
+        # A torn final line (killed mid-write) must not swallow this record.
+        if handle.seek(0, os.SEEK_END):
+            handle.seek(-1, os.SEEK_END)
+            if handle.read(1) != b"\n":
+                line = "\n" + line
+        handle.write(line.encode("utf-8"))
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def parse_records(lines) -> list[dict]:
+    """Journal records from an iterable of lines; unparseable (torn) lines are skipped."""
+    records = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and isinstance(record.get("index"), dict):
+            records.append(record)
+    return records
+
+
+def read_records(path: Path) -> list[dict]:
+    """Journal records in append order, or [] when there is no journal."""
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as handle:
+        return parse_records(handle)
+
+
+def index_entries(records: list[dict]) -> list[dict]:
+    return [r["index"] for r in records]
+
+
+def month_details(records: list[dict], month: str, known=()) -> list[dict]:
+    """Detail entries for cats in `month` ("YYYY-MM"), skipping numbers in `known`."""
+    known = set(known)
+    return [
+        r["detail"] for r in records
+        if r.get("detail") and r["index"].get("timestamp", "")[:7] == month and r["detail"].get("number") not in known
+    ]
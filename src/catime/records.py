@@ -0,0 +1,97 @@
+"""Cat records: a slotted, memory-lean view of one catlist entry.
+
+A parsed catlist entry is a dict of up to a dozen keys, and json.loads
+gives every row its own copy of strings like the model name. Cat keeps the
+index fields in __slots__, interns the low-cardinality strings, and loads
+the detail fields (prompt, story, idea, ...) from the month file only when
+one of them is first read.
+"""
+
+import sys
+
+INDEX_FIELDS = (
+    "number", "timestamp", "url", "model", "status", "error", "title",
+    "inspiration", "character", "character_name", "is_seasonal", "season",
+)
+DETAIL_FIELDS = (
+    "prompt", "story", "idea", "news_inspiration", "avoid_list", "style_picks", "comment_id",
+)
+# Values that repeat across thousands of entries; interning stores each once.
+_INTERNED = frozenset({"model", "status", "error", "inspiration", "character", "character_name", "season"})
+
+
+class Cat:
+    """One cat. Index fields are attributes; detail fields load on first access.
+
+    `loader(month, number)` returns the cat's detail dict (or None). A Cat
+    without a loader reports its detail fields as None.
+    """
+
+    __slots__ = INDEX_FIELDS + ("_detail", "_loader")
+
+    def __init__(self, number=None, timestamp="", url=None, model=None, status="success",
+                 error=None, title=None, inspiration=None, character=None, character_name=None,
+                 is_seasonal=None, season=None, *, detail=None, loader=None):
+        self.number = number
+        self.timestamp = timestamp
+        self.url = url
+        self.model = model
+        self.status = status
+        self.error = error
+        self.title = title
+        self.inspiration = inspiration
+        self.character = character
+        self.character_name = character_name
+        self.is_seasonal = is_seasonal
+        self.season = season
+        self._detail = detail
+        self._loader = loader
+
+    @classmethod
+    def from_dict(cls, data: dict, loader=None) -> "Cat":
+        """Build a Cat from a catlist (or already merged) entry."""
+        cat = cls.__new__(cls)
+        for field in INDEX_FIELDS:
+            value = data.get(field)
+            if field in _INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(cat, field, value)
+        if cat.status is None:
+            cat.status = "success"
+        cat._detail = {k: data[k] for k in DETAIL_FIELDS if k in data} or None
+        cat._loader = loader
+        return cat
+
+    @property
+    def month(self) -> str:
+        return self.timestamp[:7]
+
+    @property
+    def failed(self) -> bool:
+        return self.status == "failed"
+
+    @property
+    def detail(self) -> dict:
+        """The cat's entry from its month file, loaded on first access."""
+        if self._detail is None:
+            loaded = None
+            if self._loader is not None and self.number is not None:
+                loaded = self._loader(self.month, self.number)
+            self._detail = loaded or {}
+        return self._detail
+
+    def __getattr__(self, name):
+        # Only reached for names that are not slots: the detail fields.
+        if name in DETAIL_FIELDS:
+            return self.detail.get(name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def to_dict(self) -> dict:
+        """Index fields that are set, plus any detail fields already loaded."""
+        data = {f: getattr(self, f) for f in INDEX_FIELDS if getattr(self, f) is not None}
+        if self._detail:
+            data.update((k, v) for k, v in self._detail.items() if k in DETAIL_FIELDS)
+        return data
+
+    def __repr__(self) -> str:
+        return f"Cat(number={self.number!r}, timestamp={self.timestamp!r}, status={self.status!r})"
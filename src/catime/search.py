@@ -0,0 +1,225 @@
+"""Full-text search over cat titles, ideas, stories and prompts.
+
+The inverted index lives under the cache directory, one directory per
+month, with postings split into hash buckets so a query only reads the
+buckets its terms fall into. New cats only rewrite their own month and
+closed months are never re-read. Latin text is split into lowercase words;
+CJK text into overlapping character bigrams, which needs no dictionary and
+matches Traditional Chinese phrases of any length.
+"""
+
+import hashlib
+import json
+import math
+import re
+import shutil
+import time
+import zlib
+from pathlib import Path
+
+from catime.timeline import month_closed_since
+from catime.utils.paths import cache_dir
+
+INDEX_VERSION = 1
+# New cats arrive hourly; a younger index is searched without refreshing.
+REFRESH_SECONDS = 3600
+FIELDS = ("title", "idea", "story", "prompt")
+# Title tokens count this many times, so a title hit outranks a prompt hit.
+TITLE_WEIGHT = 3
+POSTING_BUCKETS = 64
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase words for Latin script, character bigrams for CJK runs."""
+    tokens = []
+    for run in _TOKEN_RE.findall(text.lower()):
+        if run.isascii() or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _document_tokens(detail: dict, title: str) -> list[str]:
+    tokens = tokenize(title) * TITLE_WEIGHT
+    for field in FIELDS[1:]:
+        value = detail.get(field)
+        if isinstance(value, str):
+            tokens.extend(tokenize(value))
+    return tokens
+
+
+def _bucket(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8")) % POSTING_BUCKETS
+
+
+def _write_json(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(path)
+
+
+class SearchIndex:
+    """Per-month inverted index over one data source (a repo or the local tree)."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._meta_path = root / "meta.json"
+        self.meta = self._load_meta()
+        self._buckets: dict[tuple[str, str], dict] = {}
+
+    @classmethod
+    def for_source(cls, repo: str, local: bool = False) -> "SearchIndex":
+        name = "local" if local else repo.replace("/", "__")
+        return cls(cache_dir() / "search" / name)
+
+    def _load_meta(self) -> dict:
+        try:
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            if meta.get("version") == INDEX_VERSION:
+                return meta
+        except (OSError, ValueError):
+            pass
+        return {"version": INDEX_VERSION, "updated_at": 0, "months": {}}
+
+    def is_stale(self) -> bool:
+        return time.time() - self.meta["updated_at"] > REFRESH_SECONDS
+
+    def pending_months(self, cats: list[dict]) -> list[str]:
+        """Months whose detail files must be read to bring the index up to date.
+
+        A month indexed after it closed is final and is skipped.
+        """
+        pending = []
+        for month in sorted({c["timestamp"][:7] for c in cats if c.get("number") is not None}):
+            known = self.meta["months"].get(month)
+            closed = month_closed_since(month)
+            if known and closed is not None and known["indexed_at"] >= closed:
+                continue
+            pending.append(month)
+        return pending
+
+    def update(self, cats: list[dict], fetch_detail) -> list[str]:
+        """Re-index changed months; `fetch_detail(month)` returns a detail list.
+
+        A month whose fetch returns None failed and is left pending, so the
+        next update tries it again. Returns the months that were rewritten.
+        """
+        by_month: dict[str, dict[int, dict]] = {}
+        for cat in cats:
+            if cat.get("number") is not None:
+                by_month.setdefault(cat["timestamp"][:7], {})[cat["number"]] = cat
+
+        now = time.time()
+        rewritten, failed = [], False
+        for month in self.pending_months(cats):
+            details = fetch_detail(month)
+            if details is None:
+                failed = True
+                continue
+            digest = hashlib.sha256(
+                json.dumps(details, sort_keys=True, ensure_ascii=False).encode("utf-8")
+            ).hexdigest()
+            known = self.meta["months"].get(month)
+            if not known or known["hash"] != digest:
+                known = self._write_month(month, details, by_month.get(month, {}))
+                known["hash"] = digest
+                rewritten.append(month)
+            known["indexed_at"] = now
+            self.meta["months"][month] = known
+
+        for month in set(self.meta["months"]) - set(by_month):
+            del self.meta["months"][month]
+            shutil.rmtree(self.root / month, ignore_errors=True)
+
+        if not failed:
+            self.meta["updated_at"] = now
+        _write_json(self._meta_path, self.meta)
+        self._buckets.clear()
+        return rewritten
+
+    def _write_month(self, month: str, details: list[dict], cats: dict[int, dict]) -> dict:
+        """Write a month's docs and posting buckets; returns its meta entry."""
+        docs: dict[str, dict] = {}
+        postings: dict[str, dict[str, int]] = {}
+        for detail in details:
+            number = detail.get("number") if isinstance(detail, dict) else None
+            if number is None or str(number) in docs:
+                continue
+            cat = cats.get(number, {})
+            title = detail.get("title") or cat.get("title") or ""
+            tokens = _document_tokens(detail, title)
+            key = str(number)
+            docs[key] = {
+                "timestamp": cat.get("timestamp", ""),
+                "url": cat.get("url"),
+                "model": cat.get("model"),
+                "title": title,
+                "len": len(tokens),
+            }
+            for token in tokens:
+                tf = postings.setdefault(token, {})
+                tf[key] = tf.get(key, 0) + 1
+
+        buckets: dict[int, dict] = {}
+        for token, tf in postings.items():
+            buckets.setdefault(_bucket(token), {})[token] = tf
+        month_dir = self.root / month
+        shutil.rmtree(month_dir, ignore_errors=True)
+        _write_json(month_dir / "docs.json", docs)
+        for bucket, data in buckets.items():
+            _write_json(month_dir / f"p{bucket:02x}.json", data)
+        return {"docs": len(docs), "length": sum(d["len"] for d in docs.values())}
+
+    def _read(self, month: str, name: str) -> dict:
+        key = (month, name)
+        if key not in self._buckets:
+            try:
+                self._buckets[key] = json.loads((self.root / month / name).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._buckets[key] = {}
+        return self._buckets[key]
+
+    def _postings(self, month: str, term: str) -> dict[str, int]:
+        return self._read(month, f"p{_bucket(term):02x}.json").get(term, {})
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """Rank cats by BM25, preferring cats that match more query terms.
+
+        Returns result dicts with number, score and the stored index fields.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        months = self.meta["months"]
+        if not terms or not months:
+            return []
+
+        total_docs = sum(m["docs"] for m in months.values())
+        avg_len = sum(m["length"] for m in months.values()) / max(total_docs, 1)
+        scores: dict[tuple[str, str], list] = {}
+        for term in terms:
+            postings = {month: self._postings(month, term) for month in months}
+            df = sum(len(p) for p in postings.values())
+            if not df:
+                continue
+            idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+            for month, term_postings in postings.items():
+                if not term_postings:
+                    continue
+                docs = self._read(month, "docs.json")
+                for key, tf in term_postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * docs[key]["len"] / max(avg_len, 1))
+                    entry = scores.setdefault((month, key), [0, 0.0])
+                    entry[0] += 1
+                    entry[1] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1][0], -item[1][1], int(item[0][1])))
+        results = []
+        for (month, key), (_matched, score) in ranked[:limit]:
+            doc = self._read(month, "docs.json")[key]
+            results.append({"number": int(key), "score": round(score, 3), **doc})
+        return results
@@ -0,0 +1,224 @@
+"""Static file server behind `catime view`.
+
+Threaded HTTP/1.1 with keep-alive, gzip/brotli variants for text assets
+(a .gz/.br file on disk is used when present, otherwise the file is
+compressed once and kept in memory), ETag/Cache-Control headers with
+closed months marked immutable, single Range requests, and an in-memory
+LRU of hot files so repeat loads never touch the disk.
+"""
+
+import gzip
+import http.server
+import os
+import re
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+from pathlib import Path
+
+from catime.timeline import month_closed_since
+
+COMPRESSIBLE_SUFFIXES = {".json", ".js", ".css", ".html", ".xml", ".svg", ".txt", ".webmanifest"}
+# Anything smaller is sent as-is; compression would not pay for its headers.
+MIN_COMPRESS_SIZE = 1024
+LRU_MAX_BYTES = 64 * 1024 * 1024
+IMMUTABLE = "public, max-age=31536000, immutable"
+STATIC_ASSET = "public, max-age=86400"
+REVALIDATE = "no-cache"
+
+_MONTH_FILE = re.compile(r"^cats/(\d{4}-\d{2})\.json$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _encoders() -> dict:
+    encoders = {"gzip": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoders["br"] = lambda data: brotli.compress(data, quality=11)
+    return encoders
+
+
+def cache_control(relpath: str) -> str:
+    """Cache-Control for a path relative to the docs root."""
+    m = _MONTH_FILE.match(relpath)
+    if m and month_closed_since(m.group(1)) is not None:
+        return IMMUTABLE
+    if Path(relpath).suffix in COMPRESSIBLE_SUFFIXES:
+        return REVALIDATE
+    return STATIC_ASSET
+
+
+class FileCache:
+    """Thread-safe LRU of file bodies (and compressed variants) bounded by total size."""
+
+    def __init__(self, max_bytes: int = LRU_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str], tuple[tuple[int, int], bytes]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, encoding: str, stamp: tuple[int, int], load) -> bytes:
+        """Body of `path` in `encoding`, reloaded when the file's (size, mtime) stamp changes."""
+        key = (str(path), encoding)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit and hit[0] == stamp:
+                self._entries.move_to_end(key)
+                return hit[1]
+        body = load()
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._size -= len(old[1])
+            if len(body) <= self.max_bytes:
+                self._entries[key] = (stamp, body)
+                self._size += len(body)
+                while self._size > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return body
+
+
+class GalleryHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves the docs/ directory; `directory` and `cache` are bound per server."""
+
+    protocol_version = "HTTP/1.1"
+    cache: FileCache
+    encoders = _encoders()
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _resolve(self) -> Path | None:
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            if not self.path.split("?", 1)[0].endswith("/"):
+                self.send_response(301)
+                self.send_header("Location", self.path.split("?", 1)[0] + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+            path = path / "index.html"
+        if not path.is_file():
+            self.send_error(404, "File not found")
+            return None
+        return path
+
+    def _pick_encoding(self, path: Path, size: int) -> str:
+        if path.suffix not in COMPRESSIBLE_SUFFIXES or size < MIN_COMPRESS_SIZE:
+            return "identity"
+        accepted = {
+            part.split(";", 1)[0].strip().lower()
+            for part in self.headers.get("Accept-Encoding", "").split(",")
+        }
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in self.encoders:
+                return encoding
+        return "identity"
+
+    def _load(self, path: Path, encoding: str):
+        def load() -> bytes:
+            if encoding == "identity":
+                return path.read_bytes()
+            suffix = ".br" if encoding == "br" else ".gz"
+            precompressed = path.with_name(path.name + suffix)
+            if precompressed.is_file() and precompressed.stat().st_mtime >= path.stat().st_mtime:
+                return precompressed.read_bytes()
+            return self.encoders[encoding](path.read_bytes())
+        return load
+
+    def _serve(self, send_body: bool):
+        path = self._resolve()
+        if path is None:
+            return
+        st = path.stat()
+        stamp = (st.st_size, st.st_mtime_ns)
+        encoding = self._pick_encoding(path, st.st_size)
+        etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}-{encoding}"'
+        relpath = path.relative_to(self.directory).as_posix()
+
+        common = [
+            ("ETag", etag),
+            ("Last-Modified", formatdate(st.st_mtime, usegmt=True)),
+            ("Cache-Control", cache_control(relpath)),
+            ("Vary", "Accept-Encoding"),
+        ]
+        if etag in {t.strip() for t in self.headers.get("If-None-Match", "").split(",")}:
+            self.send_response(304)
+            for name, value in common:
+                self.send_header(name, value)
+            self.end_headers()
+            return
+
+        body = self.cache.get(path, encoding, stamp, self._load(path, encoding))
+        status, start, end = 200, 0, len(body)
+        range_header = self.headers.get("Range")
+        if range_header and encoding == "identity" and self.headers.get("If-Range", etag) == etag:
+            parsed = self._parse_range(range_header, len(body))
+            if parsed is None:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if parsed != (0, len(body)):
+                status, (start, end) = 206, parsed
+
+        self.send_response(status)
+        self.send_header("Content-Type", self.guess_type(str(path)))
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("Accept-Ranges", "bytes")
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(body)}")
+        for name, value in common:
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(memoryview(body)[start:end])
+
+    @staticmethod
+    def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+        """Half-open (start, end) for a single byte range; None if unsatisfiable.
+
+        Multi-range and malformed requests (last byte before first) are
+        answered with the whole body.
+        """
+        m = _RANGE.match(header.strip())
+        if not m or not (m.group(1) or m.group(2)):
+            return (0, size)
+        if not m.group(1):
+            suffix = int(m.group(2))
+            # A zero-length suffix ("bytes=-0") selects nothing.
+            return (max(0, size - suffix), size) if size and suffix else None
+        start = int(m.group(1))
+        if m.group(2) and int(m.group(2)) < start:
+            return (0, size)
+        if start >= size:
+            return None
+        return (start, min(size, int(m.group(2)) + 1) if m.group(2) else size)
+
+
+class GalleryServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def make_server(docs_dir: Path, host: str = "127.0.0.1", port: int = 8000,
+                cache: FileCache | None = None) -> GalleryServer:
+    """Build (but do not start) a gallery server for `docs_dir`."""
+    handler = type("BoundGalleryHandler", (GalleryHandler,), {
+        "cache": cache or FileCache(),
+    })
+
+    def factory(*args, **kwargs):
+        return handler(*args, directory=os.fspath(docs_dir), **kwargs)
+
+    return GalleryServer((host, port), factory)
@@ -0,0 +1,188 @@
+"""Per-month catlist shards and the manifest that describes them.
+
+catlist.json holds the whole history, but most queries touch one month.
+Alongside it the generator writes catlist/YYYY-MM.json (that month's index
+entries, in catlist order) and catlist/manifest.json:
+
+    {"version": 1, "total": 5012, "latest": {...last catlist entry...},
+     "months": {"2026-03": {"offset": 1020, "count": 744, "first": 1021,
+                            "last": 1764, "sha256": "..."}}}
+
+`offset` is the month's first position in catlist.json, so position-based
+lookups (`catime 42`, `catime 100-250`) map straight to a shard, and
+`latest` is answered by the manifest alone. Shards are rewritten only when
+the journal is compacted; readers append the journal's pending entries.
+"""
+
+import hashlib
+import json
+from bisect import bisect_right
+from collections.abc import Sequence
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+SHARD_DIR = "catlist"
+MANIFEST_NAME = "manifest.json"
+
+
+def encode_shard(entries: list[dict]) -> bytes:
+    return (json.dumps(entries, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def build_shards(cats: list[dict]) -> tuple[dict[str, bytes], dict]:
+    """Split a catlist into encoded month shards and their manifest."""
+    grouped: dict[str, list[dict]] = {}
+    offsets: dict[str, int] = {}
+    for position, cat in enumerate(cats):
+        month = cat["timestamp"][:7]
+        offsets.setdefault(month, position)
+        grouped.setdefault(month, []).append(cat)
+
+    shards: dict[str, bytes] = {}
+    months: dict[str, dict] = {}
+    for month in sorted(grouped):
+        entries = grouped[month]
+        numbers = [c["number"] for c in entries if c.get("number") is not None]
+        shards[month] = encode_shard(entries)
+        months[month] = {
+            "offset": offsets[month],
+            "count": len(entries),
+            "first": numbers[0] if numbers else None,
+            "last": numbers[-1] if numbers else None,
+            "sha256": hashlib.sha256(shards[month]).hexdigest(),
+        }
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "total": len(cats),
+        "latest": cats[-1] if cats else None,
+        "months": months,
+    }
+    return shards, manifest
+
+
+def write_shards(cats: list[dict], root: Path) -> list[Path]:
+    """Write changed shards and the manifest under `root`; returns the paths written."""
+    shards, manifest = build_shards(cats)
+    try:
+        previous = json.loads((root / MANIFEST_NAME).read_text(encoding="utf-8"))["months"]
+    except (OSError, ValueError, KeyError):
+        previous = {}
+
+    written = []
+    root.mkdir(parents=True, exist_ok=True)
+    for month, data in shards.items():
+        path = root / f"{month}.json"
+        if previous.get(month, {}).get("sha256") == manifest["months"][month]["sha256"] and path.exists():
+            continue
+        _atomic_write(path, data)
+        written.append(path)
+    for month in set(previous) - set(shards):
+        (root / f"{month}.json").unlink(missing_ok=True)
+
+    manifest_path = root / MANIFEST_NAME
+    _atomic_write(manifest_path, (json.dumps(manifest, ensure_ascii=False, indent=2) + "\n").encode("utf-8"))
+    written.append(manifest_path)
+    return written
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+class ShardedCatlist(Sequence):
+    """Read-only catlist that loads month shards on first access.
+
+    Indexing and slicing use catlist positions, like the full list, so code
+    written against `list[dict]` works unchanged. `load_shards(months)`
+    returns {month: entries} for the requested months. `pending` entries
+    (the journal's, not yet compacted into shards) follow the sharded ones;
+    any the manifest already covers are dropped.
+    """
+
+    def __init__(self, manifest: dict, load_shards, pending=()):
+        self.manifest = manifest
+        self._months = sorted(manifest["months"])
+        self._offsets = [manifest["months"][m]["offset"] for m in self._months]
+        self._load_shards = load_shards
+        self._shards: dict[str, list[dict]] = {}
+        latest = (manifest.get("latest") or {}).get("timestamp", "")
+        self._pending = [cat for cat in pending if cat.get("timestamp", "") > latest]
+        self._total = manifest["total"]
+
+    def __len__(self) -> int:
+        return self._total + len(self._pending)
+
+    def _ensure(self, months) -> None:
+        missing = [m for m in months if m not in self._shards]
+        if missing:
+            self._shards.update(self._load_shards(missing))
+
+    def _month_at(self, position: int) -> int:
+        return bisect_right(self._offsets, position) - 1
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            out: list[dict] = []
+            sharded_stop = min(stop, self._total)
+            if start < sharded_stop:
+                spans = self._months[self._month_at(start):self._month_at(sharded_stop - 1) + 1]
+                self._ensure(spans)
+                for month in spans:
+                    offset = self.manifest["months"][month]["offset"]
+                    out.extend(self._shards[month][max(start - offset, 0):sharded_stop - offset])
+            out.extend(self._pending[max(start - self._total, 0):max(stop - self._total, 0)])
+            return out
+
+        position = key + len(self) if key < 0 else key
+        if not 0 <= position < len(self):
+            raise IndexError("catlist index out of range")
+        if position >= self._total:
+            return self._pending[position - self._total]
+        if position == self._total - 1 and self.manifest.get("latest") is not None:
+            return self.manifest["latest"]
+        month = self._months[self._month_at(position)]
+        self._ensure([month])
+        return self._shards[month][position - self.manifest["months"][month]["offset"]]
+
+    def __iter__(self):
+        for start in range(0, len(self._months), 4):
+            batch = self._months[start:start + 4]
+            self._ensure(batch)
+            for month in batch:
+                yield from self._shards[month]
+        yield from self._pending
+
+    def shard_months(self, positions) -> set[str]:
+        """Months whose shards hold the given positions (pending entries need none)."""
+        return {self._months[self._month_at(p)] for p in positions if 0 <= p < self._total}
+
+    def at(self, positions) -> list[dict]:
+        """Entries at several positions, loading every shard involved in one batch."""
+        positions = list(positions)
+        self._ensure(self.shard_months(positions))
+        return [self[p] for p in positions]
+
+    def months(self, first: str, last: str) -> list[dict]:
+        """Entries from months first..last (inclusive, "YYYY-MM"), in catlist order."""
+        spans = [m for m in self._months if first <= m <= last]
+        self._ensure(spans)
+        return [cat for month in spans for cat in self._shards[month]] + [
+            cat for cat in self._pending if first <= cat["timestamp"][:7] <= last
+        ]
+
+
+def query_scope(cats, query: str):
+    """The entries a time query needs: just the matching months when the catlist is sharded."""
+    if not isinstance(cats, ShardedCatlist):
+        return cats
+    from catime.timeline import query_months
+
+    span = query_months(query)
+    return cats.months(*span) if span else []
@@ -0,0 +1,28 @@
+"""Where a catime repo's data files are published.
+
+Every data file is served by GitHub Pages (no anonymous rate limit) and by
+raw.githubusercontent.com, which stays as the fallback for forks without
+Pages enabled.
+"""
+
+import sys
+
+
+def source_urls(repo: str, relpath: str) -> tuple[str, str]:
+    """(GitHub Pages URL, raw.githubusercontent.com URL) for a data file."""
+    owner, name = repo.split("/", 1)
+    return (
+        f"https://{owner}.github.io/{name}/{relpath}",
+        f"https://raw.githubusercontent.com/{repo}/main/{relpath}",
+    )
+
+
+def fetch_errors() -> tuple[type[Exception], ...]:
+    """Exceptions meaning a data file could not be loaded, for `except fetch_errors():`.
+
+    Cache I/O, undecodable or malformed content, and httpx's network and
+    status errors. httpx is only looked up, not imported, so local-only
+    commands stay free of it; if it was never imported it raised nothing.
+    """
+    httpx = sys.modules.get("httpx")
+    return (OSError, ValueError, KeyError, TypeError) + ((httpx.HTTPError,) if httpx else ())
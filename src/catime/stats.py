@@ -0,0 +1,150 @@
+"""Generation statistics from a per-day rollup of the catlist.
+
+The generator folds new catlist entries into stats/rollup.json when it
+compacts the journal (readers fold the journal's pending entries on top), so
+`catime stats` reads a few hundred day buckets instead of re-scanning every
+entry. A bucket counts entries, successes and failures, final models,
+fallbacks (parsed from the model string's "(fallback from X, reason: Y)"
+or "(fallback from codex: Y)" suffixes), failure errors, characters and
+seasons.
+"""
+
+import json
+from pathlib import Path
+
+ROLLUP_VERSION = 1
+ROLLUP_PATH = "stats/rollup.json"
+COUNTERS = ("models", "fallback_from", "reasons", "errors", "characters", "seasons")
+
+_FALLBACK = " (fallback from "
+_LAST_ERROR = "Last error: "
+
+
+def parse_model(model: str) -> tuple[str, list[tuple[str, str]]]:
+    """Split a model field into the model that produced the image and its fallbacks.
+
+    Returns (model, [(failed backend, reason), ...]) in the order they were
+    appended.
+    """
+    base, *segments = model.split(_FALLBACK)
+    fallbacks = []
+    for segment in segments:
+        segment = segment.strip()
+        segment = segment.removesuffix(")")
+        if ", reason: " in segment:
+            source, reason = segment.split(", reason: ", 1)
+        elif ": " in segment:
+            source, reason = segment.split(": ", 1)
+        else:
+            source, reason = segment, ""
+        fallbacks.append((source.strip(), reason.strip()))
+    return base.strip(), fallbacks
+
+
+def reason_category(reason: str) -> str:
+    """Group a fallback or failure reason: the text before its first colon, first line only.
+
+    "API 503: This model is ..." -> "API 503"; "codex-image-service HTTP 502:
+    {...}" -> "codex-image-service HTTP 502"; "timeout after 240.0s" stays.
+    """
+    line = reason.strip().splitlines()[0] if reason.strip() else ""
+    return line.split(":", 1)[0].strip() or "unknown"
+
+
+def _bucket() -> dict:
+    return {"total": 0, "success": 0, "failed": 0, "fallbacks": 0, **{c: {} for c in COUNTERS}}
+
+
+def _bump(counter: dict, key, n: int = 1) -> None:
+    if key:
+        counter[key] = counter.get(key, 0) + n
+
+
+def add_entry(bucket: dict, cat: dict) -> None:
+    """Fold one catlist entry into a bucket."""
+    bucket["total"] += 1
+    if cat.get("status", "success") == "failed":
+        bucket["failed"] += 1
+        # "Failed to generate any images - All models failed. Last error: API Error 429: ..."
+        error = (cat.get("error") or "").rsplit(_LAST_ERROR, 1)[-1]
+        _bump(bucket["errors"], reason_category(error))
+        return
+    bucket["success"] += 1
+    model, fallbacks = parse_model(cat.get("model") or "unknown")
+    _bump(bucket["models"], model)
+    if fallbacks:
+        bucket["fallbacks"] += 1
+    for source, reason in fallbacks:
+        _bump(bucket["fallback_from"], source)
+        _bump(bucket["reasons"], reason_category(reason))
+    _bump(bucket["characters"], cat.get("character_name") or cat.get("character"))
+    _bump(bucket["seasons"], cat.get("season"))
+
+
+def merge(into: dict, bucket: dict) -> dict:
+    for key in ("total", "success", "failed", "fallbacks"):
+        into[key] += bucket[key]
+    for counter in COUNTERS:
+        for name, n in bucket[counter].items():
+            _bump(into[counter], name, n)
+    return into
+
+
+def empty_rollup() -> dict:
+    return {"version": ROLLUP_VERSION, "entries": 0, "last_timestamp": None, "days": {}}
+
+
+def update_rollup(rollup: dict, cats: list[dict]) -> dict:
+    """Fold catlist entries not yet in `rollup`; rebuilds if the catlist was rewritten."""
+    seen = rollup.get("entries", 0)
+    if (rollup.get("version") != ROLLUP_VERSION or seen > len(cats)
+            or (seen and cats[seen - 1].get("timestamp") != rollup.get("last_timestamp"))):
+        rollup, seen = empty_rollup(), 0
+    for cat in cats[seen:]:
+        add_entry(rollup["days"].setdefault(cat["timestamp"][:10], _bucket()), cat)
+    rollup["entries"] = len(cats)
+    rollup["last_timestamp"] = cats[-1]["timestamp"] if cats else None
+    return rollup
+
+
+def extend_rollup(rollup: dict, entries: list[dict]) -> dict:
+    """Fold catlist entries newer than the ones `rollup` already covers (e.g. the journal's)."""
+    last = rollup.get("last_timestamp") or ""
+    entries = [cat for cat in entries if cat["timestamp"] > last]
+    for cat in entries:
+        add_entry(rollup["days"].setdefault(cat["timestamp"][:10], _bucket()), cat)
+    rollup["entries"] = rollup.get("entries", 0) + len(entries)
+    if entries:
+        rollup["last_timestamp"] = entries[-1]["timestamp"]
+    return rollup
+
+
+def load_rollup(path: Path) -> dict:
+    try:
+        rollup = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return empty_rollup()
+    return rollup if isinstance(rollup, dict) and rollup.get("version") == ROLLUP_VERSION else empty_rollup()
+
+
+def write_rollup(path: Path, rollup: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(rollup, ensure_ascii=False, separators=(",", ":"), sort_keys=True) + "\n", encoding="utf-8")
+    tmp.replace(path)
+
+
+def summarize(rollup: dict, start: str | None = None, end: str | None = None, by: str = "month") -> dict:
+    """Totals and per-period buckets for days in [start, end] (YYYY-MM-DD, inclusive).
+
+    `by` is "day" or "month".
+    """
+    width = 10 if by == "day" else 7
+    totals, periods = _bucket(), {}
+    for day in sorted(rollup["days"]):
+        if (start and day < start) or (end and day > end):
+            continue
+        bucket = rollup["days"][day]
+        merge(totals, bucket)
+        merge(periods.setdefault(day[:width], _bucket()), bucket)
+    return {"totals": totals, "periods": periods}
@@ -0,0 +1,136 @@
+"""Incremental offline mirror of catlist.json, journal.jsonl, cats/*.json and characters/*.json.
+
+A manifest next to the mirrored files records each file's source URL,
+validators and content hash. Files are revalidated with conditional GETs
+and only rewritten when their content changes; months indexed after they
+closed are final and never requested again.
+"""
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from catime.journal import JOURNAL_NAME, index_entries, read_records
+from catime.sources import fetch_errors, source_urls
+from catime.timeline import month_closed_since
+
+MANIFEST_NAME = ".manifest.json"
+
+
+@dataclass
+class SyncReport:
+    updated: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+
+def _write_bytes(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+class Mirror:
+    """A local copy of one repo's data files plus its sync manifest."""
+
+    def __init__(self, root: Path, repo: str, session=None):
+        self.root = root
+        self.repo = repo
+        self._session = session
+        self._manifest_path = root / MANIFEST_NAME
+        try:
+            self.manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.manifest = {}
+        if self.manifest.get("repo") != repo:
+            self.manifest = {"repo": repo, "files": {}}
+
+    def _get(self, url: str, entry: dict | None, max_retries: int):
+        from catime.utils.http import default_session
+
+        headers = {}
+        if entry and entry.get("url") == url:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        session = self._session or default_session()
+        return session.get(url, timeout=30.0, max_retries=max_retries, headers=headers, follow_redirects=True)
+
+    def sync_file(self, relpath: str, report: SyncReport, immutable_after: float | None = None) -> None:
+        """Bring one file up to date, recording the outcome in `report`."""
+        entry = self.manifest["files"].get(relpath)
+        path = self.root / relpath
+        if (immutable_after is not None and entry and (path.exists() or entry.get("missing"))
+                and entry.get("synced_at", 0) >= immutable_after):
+            report.skipped.append(relpath)
+            return
+
+        pages_url, raw_url = source_urls(self.repo, relpath)
+        now = time.time()
+        try:
+            try:
+                url, response = pages_url, self._get(pages_url, entry, max_retries=1)
+            except fetch_errors():
+                url, response = raw_url, self._get(raw_url, entry, max_retries=3)
+        except fetch_errors() as e:
+            if getattr(getattr(e, "response", None), "status_code", None) == 404:
+                # e.g. a month with only failed cats has no detail file.
+                self.manifest["files"][relpath] = {"missing": True, "synced_at": now}
+                path.unlink(missing_ok=True)
+                report.missing.append(relpath)
+            else:
+                report.failed.append(relpath)
+            return
+
+        if response.status_code == 304 and entry and path.exists():
+            entry["synced_at"] = now
+            report.unchanged.append(relpath)
+            return
+
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        if entry and entry.get("sha256") == digest and path.exists():
+            report.unchanged.append(relpath)
+        else:
+            _write_bytes(path, body)
+            report.updated.append(relpath)
+        self.manifest["files"][relpath] = {
+            "url": url,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "sha256": digest,
+            "synced_at": now,
+        }
+
+    def _read_json(self, relpath: str, default):
+        try:
+            return json.loads((self.root / relpath).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return default
+
+    def sync(self, max_workers: int = 4) -> SyncReport:
+        """Mirror the catlist and journal, every month's detail file and the characters."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        report = SyncReport()
+        self.sync_file("catlist.json", report)
+        self.sync_file(JOURNAL_NAME, report)
+        self.sync_file("characters/index.json", report)
+
+        cats = self._read_json("catlist.json", []) + index_entries(read_records(self.root / JOURNAL_NAME))
+        months = sorted({c["timestamp"][:7] for c in cats if isinstance(c, dict) and c.get("timestamp")})
+        index = self._read_json("characters/index.json", {})
+        characters = [f"characters/{c['file']}" for c in index.get("characters", []) if c.get("file")]
+
+        jobs = [(f"cats/{m}.json", month_closed_since(m)) for m in months] + [(c, None) for c in characters]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(lambda job: self.sync_file(job[0], report, job[1]), jobs))
+
+        _write_bytes(self._manifest_path, json.dumps(self.manifest, indent=2).encode("utf-8"))
+        return report
@@ -0,0 +1,134 @@
+"""Sorted timestamp index over catlist entries and the time queries answered with it.
+
+Shared by the CLI, the Client and the generator.
+"""
+
+from bisect import bisect_left
+from itertools import pairwise
+
+# A month's files stop changing once the month is over; the grace period
+# covers the last hour's cat landing on Pages after midnight.
+CLOSED_MONTH_GRACE_SECONDS = 24 * 3600
+
+# Sorts after any character that can follow a prefix in a timestamp.
+_PREFIX_END = "\uffff"
+
+
+class TimestampIndex:
+    """Catlist positions ordered by timestamp, queried with bisect.
+
+    Timestamps are "YYYY-MM-DD HH:MM UTC" strings, which sort chronologically
+    as plain strings, so date, hour and range lookups are two bisects each.
+    Entries are addressed by catlist position rather than number, so failed
+    entries (number None) are indexed like any other.
+    """
+
+    __slots__ = ("_keys", "_positions")
+
+    def __init__(self, cats):
+        keys = [c.get("timestamp") if isinstance(c, dict) else getattr(c, "timestamp", None) for c in cats]
+        if all(isinstance(k, str) for k in keys) and all(a <= b for a, b in pairwise(keys)):
+            # The catlist is append-only and chronological: skip the sort.
+            self._keys = keys
+            self._positions = range(len(keys))
+        else:
+            pairs = sorted((k, i) for i, k in enumerate(keys) if isinstance(k, str))
+            self._keys = [k for k, _ in pairs]
+            self._positions = [i for _, i in pairs]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def between(self, start: str, end: str) -> list[int]:
+        """Positions with start <= timestamp < end, in timestamp order."""
+        lo = bisect_left(self._keys, start)
+        hi = bisect_left(self._keys, end, lo)
+        return list(self._positions[lo:hi])
+
+    def prefix(self, prefix: str) -> list[int]:
+        """Positions whose timestamp starts with prefix (a date, hour or month)."""
+        return self.between(prefix, prefix + _PREFIX_END)
+
+    def dates(self, start_date: str, end_date: str) -> list[int]:
+        """Positions between two YYYY-MM-DD dates, both inclusive."""
+        return self.between(start_date, end_date + _PREFIX_END)
+
+
+def month_closed_since(month: str) -> float | None:
+    """Epoch time after which a YYYY-MM month's data is final, or None if still open."""
+    import calendar
+    import time
+
+    year, mon = (int(x) for x in month.split("-"))
+    start_of_next = calendar.timegm((year + mon // 12, mon % 12 + 1, 1, 0, 0, 0))
+    closed_at = start_of_next + CLOSED_MONTH_GRACE_SECONDS
+    if time.time() < closed_at:
+        return None
+    return float(closed_at)
+
+
+def filter_by_query(cats: list[dict], query: str, index: TimestampIndex | None = None) -> list[dict]:
+    """Filter cats by time query: date, date+hour, month, date range, today, yesterday.
+
+    Pass a prebuilt TimestampIndex of `cats` to reuse it across queries.
+    """
+    timeline = getattr(cats, "timeline", None)
+    if index is None and timeline is not None:
+        # Archive-backed catlist: the SQLite timestamp index answers the query.
+        return cats.at(_query_positions(timeline, query))
+    positions = _query_positions(index or TimestampIndex(cats), query)
+    return [cats[i] for i in positions]
+
+
+def _query_positions(index: TimestampIndex, query: str) -> list[int]:
+    import re
+    from datetime import UTC, datetime, timedelta
+
+    now = datetime.now(UTC)
+
+    if query == "today":
+        return index.prefix(now.strftime("%Y-%m-%d"))
+
+    if query == "yesterday":
+        return index.prefix((now - timedelta(days=1)).strftime("%Y-%m-%d"))
+
+    # date+hour: 2026-01-30T05 or 2026-01-30 05
+    m = re.match(r"^(\d{4}-\d{2}-\d{2})[T ](\d{1,2})$", query)
+    if m:
+        date_str, hour_str = m.group(1), m.group(2).zfill(2)
+        return index.prefix(f"{date_str} {hour_str}:")
+
+    # date only: 2026-01-30
+    if re.match(r"^\d{4}-\d{2}-\d{2}$", query):
+        return index.prefix(query)
+
+    # month: 2026-03
+    if re.match(r"^\d{4}-(0[1-9]|1[0-2])$", query):
+        return index.prefix(query + "-")
+
+    # date range, inclusive: 2026-03-01..2026-03-20
+    m = re.match(r"^(\d{4}-\d{2}-\d{2})\.\.(\d{4}-\d{2}-\d{2})$", query)
+    if m:
+        return index.dates(m.group(1), m.group(2))
+
+    return []
+
+
+def query_months(query: str) -> tuple[str, str] | None:
+    """First and last month ("YYYY-MM") a time query can match, or None if it is not one."""
+    import re
+    from datetime import UTC, datetime, timedelta
+
+    now = datetime.now(UTC)
+    if query == "today":
+        month = now.strftime("%Y-%m")
+        return month, month
+    if query == "yesterday":
+        month = (now - timedelta(days=1)).strftime("%Y-%m")
+        return month, month
+    if re.match(r"^\d{4}-\d{2}-\d{2}([T ]\d{1,2})?$", query) or re.match(r"^\d{4}-(0[1-9]|1[0-2])$", query):
+        return query[:7], query[:7]
+    m = re.match(r"^(\d{4}-\d{2})-\d{2}\.\.(\d{4}-\d{2})-\d{2}$", query)
+    if m:
+        return m.group(1), m.group(2)
+    return None
@@ -1,28 +1,565 @@
+import hashlib
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any
+
 import httpx
-from typing import Optional, Dict, Any
+
+from catime.utils import timings
+from catime.utils.paths import cache_dir
+
+# Statuses worth retrying: raw.githubusercontent.com answers 429 once the
+# anonymous quota is spent, and Pages occasionally 5xxs during deploys.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+# Longest Retry-After we are willing to sit through before giving up.
+RETRY_AFTER_MAX = 30.0
+# How long a cached 404 answers for its URL without a request, so optional
+# files a repo does not publish (shard manifest, compact catlist, journal)
+# are not asked for on every CLI call. Matches GitHub Pages' max-age.
+MISSING_TTL = 600.0
+# Read size when streaming a body into the cache.
+STREAM_CHUNK = 1 << 16
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _client_options(**overrides) -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "http2": _http2_available(),
+        "limits": httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=30.0),
+        "headers": {"User-Agent": "catime"},
+    }
+    options.update(overrides)
+    return options
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(attempt: int, response: httpx.Response | None = None) -> float | None:
+    """Seconds to wait before retry `attempt` (0-based), or None to give up.
+
+    Honours Retry-After when the server sends one; otherwise exponential
+    backoff with full jitter.
+    """
+    if response is not None:
+        retry_after = _retry_after(response)
+        if retry_after is not None:
+            return retry_after if retry_after <= RETRY_AFTER_MAX else None
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _should_retry(response: httpx.Response) -> bool:
+    return response.status_code in RETRY_STATUSES
+
+
+def _retry_delay(url: str, attempt: int, max_retries: int, error: httpx.HTTPError) -> float:
+    """The retry policy shared by every GET loop: seconds to wait after `error`.
+
+    Timeouts, transport errors and RETRY_STATUSES are retried with backoff
+    until `max_retries` attempts are used; anything else, or a Retry-After
+    beyond RETRY_AFTER_MAX, re-raises `error`.
+    """
+    response = error.response if isinstance(error, httpx.HTTPStatusError) else None
+    retryable = (_should_retry(response) if response is not None
+                 else isinstance(error, (httpx.TimeoutException, httpx.TransportError)))
+    delay = _backoff_delay(attempt, response) if retryable and attempt < max_retries - 1 else None
+    if delay is None:
+        raise error
+    timings.record("retry", url, attempt=attempt + 1, delay_ms=round(delay * 1000, 3))
+    return delay
+
+
+class Session:
+    """Keep-alive HTTP session with retries, shared across catime requests.
+
+    Uses HTTP/2 when the optional `h2` package is installed. Extra keyword
+    arguments are passed through to httpx.Client.
+    """
+
+    def __init__(self, **client_kwargs):
+        self._client = httpx.Client(**_client_options(**client_kwargs))
+
+    def _send(self, url: str, attempt: int, **kwargs) -> httpx.Response:
+        if not timings.enabled():
+            return self._client.get(url, **kwargs)
+        trace = timings.HttpTrace()
+        kwargs["extensions"] = {**kwargs.get("extensions", {}), "trace": trace}
+        started = time.perf_counter()
+        response = error = None
+        try:
+            response = self._client.get(url, **kwargs)
+            return response
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+            raise
+        finally:
+            timings.record(
+                "http", url, ms=round((time.perf_counter() - started) * 1000, 3), attempt=attempt + 1,
+                status=response.status_code if response is not None else None, error=error,
+                bytes=len(response.content) if response is not None else 0, **trace.ms,
+            )
+
+    def get(self, url: str, timeout: float = 10.0, max_retries: int = 3, **kwargs) -> httpx.Response:
+        """GET with retries. A 304 is returned as-is; other non-2xx raise."""
+        for attempt in range(max_retries):
+            try:
+                response = self._send(url, attempt, timeout=timeout, **kwargs)
+                if response.status_code != 304:
+                    response.raise_for_status()
+                return response
+            except httpx.HTTPError as e:
+                delay = _retry_delay(url, attempt, max_retries, e)
+            time.sleep(delay)
+        raise httpx.HTTPError(f"GET {url} failed")
+
+    def stream(self, url: str, timeout: float = 10.0, **kwargs):
+        """Streamed GET as a context manager; no retries, the caller reads the body."""
+        return self._client.stream("GET", url, timeout=timeout, **kwargs)
+
+    def close(self) -> None:
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncSession:
+    """asyncio twin of Session; use as `async with AsyncSession() as s:`."""
+
+    def __init__(self, **client_kwargs):
+        self._client = httpx.AsyncClient(**_client_options(**client_kwargs))
+
+    async def get(self, url: str, timeout: float = 10.0, max_retries: int = 3, **kwargs) -> httpx.Response:
+        """GET with retries. A 304 is returned as-is; other non-2xx raise."""
+        import asyncio
+
+        for attempt in range(max_retries):
+            try:
+                response = await self._client.get(url, timeout=timeout, **kwargs)
+                if response.status_code != 304:
+                    response.raise_for_status()
+                return response
+            except httpx.HTTPError as e:
+                delay = _retry_delay(url, attempt, max_retries, e)
+            await asyncio.sleep(delay)
+        raise httpx.HTTPError(f"GET {url} failed")
+
+    def stream(self, url: str, timeout: float = 10.0, **kwargs):
+        """Streamed GET as an async context manager; no retries, the caller reads the body."""
+        return self._client.stream("GET", url, timeout=timeout, **kwargs)
+
+    async def get_json(self, url: str, timeout: float = 10.0, max_retries: int = 3, **kwargs) -> Any | None:
+        """Async counterpart of safe_get_json."""
+        response = await self.get(url, timeout=timeout, max_retries=max_retries, **kwargs)
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+_default_session: Session | None = None
+
+
+def default_session() -> Session:
+    """Process-wide Session, created on first use and closed at exit."""
+    global _default_session
+    if _default_session is None:
+        import atexit
+
+        _default_session = Session()
+        atexit.register(_default_session.close)
+    return _default_session
 
 
 def safe_get_json(
     url: str,
     timeout: float = 10.0,
     max_retries: int = 3,
+    session: Session | None = None,
     **kwargs
-) -> Optional[Dict[str, Any]]:
+) -> dict[str, Any] | None:
     """Safe HTTP GET returning parsed JSON, with timeout and retries.
 
     Returns parsed JSON on success, None if response has no JSON.
     Raises httpx exceptions on final failure.
     """
+    session = session or default_session()
+    response = session.get(url, timeout=timeout, max_retries=max_retries, **kwargs)
+    with timings.phase("json", url, bytes=len(response.content)):
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+
+def _cache_paths(url: str, cache_root: Path | None = None) -> tuple[Path, Path]:
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    root = (cache_root or cache_dir()) / "http"
+    return root / f"{key}.json", root / f"{key}.meta.json"
+
+
+def _read_meta(body_path: Path, meta_path: Path) -> dict[str, Any] | None:
+    if not body_path.exists():
+        return None
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def _write_meta(meta_path: Path, meta: dict[str, Any]) -> bool:
+    # Written after the body is in place: a meta file only ever points at a complete body.
+    try:
+        _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+    except OSError:
+        return False
+    return True
+
+
+def _missing_since(meta_path: Path) -> float | None:
+    """When the URL last answered 404, from a meta file without a body."""
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return meta.get("missing_at") if isinstance(meta, dict) else None
+
+
+def _not_found(url: str) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", url)
+    response = httpx.Response(404, request=request)
+    return httpx.HTTPStatusError(f"Client error '404 Not Found' for url '{url}' (cached)", request=request, response=response)
+
+
+def _cached_sha256(body_path: Path, meta: dict[str, Any]) -> str | None:
+    if meta.get("sha256"):
+        return meta["sha256"]
+    try:
+        return hashlib.sha256(body_path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _stream_to(session: Session, url: str, fp, timeout: float, max_retries: int, **kwargs) -> tuple[httpx.Response, str | None]:
+    """Streamed GET with Session.get's retry policy, writing a 2xx body into `fp`.
+
+    Returns (response, SHA-256 of the body); a 304 is returned with nothing
+    written and no hash. Other non-2xx raise.
+    """
     for attempt in range(max_retries):
+        response = error = None
+        started = time.perf_counter()
         try:
-            response = httpx.get(url, timeout=timeout, **kwargs)
-            response.raise_for_status()
-            try:
-                return response.json()
-            except Exception:
-                return None
-        except (httpx.TimeoutException, httpx.HTTPError):
-            if attempt == max_retries - 1:
-                raise
-            continue
-    return None
+            with session.stream(url, timeout=timeout, **kwargs) as response:
+                if response.status_code == 304:
+                    return response, None
+                response.raise_for_status()
+                digest = hashlib.sha256()
+                fp.seek(0)
+                fp.truncate()
+                for chunk in response.iter_bytes(STREAM_CHUNK):
+                    fp.write(chunk)
+                    digest.update(chunk)
+                return response, digest.hexdigest()
+        except httpx.HTTPError as e:
+            if not isinstance(e, httpx.HTTPStatusError):
+                error = type(e).__name__
+            retry = e
+        finally:
+            timings.record(
+                "http", url, ms=round((time.perf_counter() - started) * 1000, 3), attempt=attempt + 1,
+                status=response.status_code if response is not None else None, error=error,
+                bytes=response.num_bytes_downloaded if response is not None else 0,
+            )
+        time.sleep(_retry_delay(url, attempt, max_retries, retry))
+    raise httpx.HTTPError(f"GET {url} failed")
+
+
+async def _async_stream_to(session: AsyncSession, url: str, fp, timeout: float, max_retries: int,
+                           **kwargs) -> tuple[httpx.Response, str | None]:
+    """asyncio twin of _stream_to over an AsyncSession."""
+    import asyncio
+
+    for attempt in range(max_retries):
+        try:
+            async with session.stream(url, timeout=timeout, **kwargs) as response:
+                if response.status_code == 304:
+                    return response, None
+                response.raise_for_status()
+                digest = hashlib.sha256()
+                fp.seek(0)
+                fp.truncate()
+                async for chunk in response.aiter_bytes(STREAM_CHUNK):
+                    fp.write(chunk)
+                    digest.update(chunk)
+                return response, digest.hexdigest()
+        except httpx.HTTPError as e:
+            delay = _retry_delay(url, attempt, max_retries, e)
+        await asyncio.sleep(delay)
+    raise httpx.HTTPError(f"GET {url} failed")
+
+
+class _CachedRequest:
+    """One fetch of `url` through the on-disk cache; the caller does the network part.
+
+    On construction `hit` tells whether the cached copy can be used without a
+    request; otherwise `headers` carries the conditional validators, the body
+    is streamed into `open()` and `finish()` / `failed()` settle the cache.
+    """
+
+    def __init__(self, url: str, immutable_after: float | None, expected_sha256: str | None,
+                 cache_root: Path | None, headers: dict[str, str] | None):
+        self.url = url
+        self.body_path, self.meta_path = _cache_paths(url, cache_root)
+        self.headers = dict(headers or {})
+        self.hit = False
+        self._tmp: Path | None = None
+        self._stored = False
+        if not self.body_path.exists():
+            missing_at = _missing_since(self.meta_path)
+            if missing_at is not None and time.time() - missing_at < MISSING_TTL:
+                timings.record("cache", url, result="missing")
+                raise _not_found(url)
+        self.meta = _read_meta(self.body_path, self.meta_path)
+        if self.meta is None:
+            return
+        if immutable_after is not None and self.meta.get("fetched_at", 0) >= immutable_after:
+            timings.record("cache", url, result="closed month")
+            self.hit = True
+        elif expected_sha256 is not None and _cached_sha256(self.body_path, self.meta) == expected_sha256:
+            timings.record("cache", url, result="hash match")
+            self.hit = True
+        else:
+            if self.meta.get("etag"):
+                self.headers["If-None-Match"] = self.meta["etag"]
+            if self.meta.get("last_modified"):
+                self.headers["If-Modified-Since"] = self.meta["last_modified"]
+
+    def open(self):
+        """A binary file for the fresh body, next to the cached copy when the cache is writable."""
+        import tempfile
+
+        try:
+            self.body_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(prefix=self.body_path.name, suffix=".tmp", dir=self.body_path.parent)
+            self._stored = True
+        except OSError:
+            # Cache not writable: stream into a temporary file instead.
+            fd, name = tempfile.mkstemp(prefix="catime-", suffix=".json")
+        self._tmp = Path(name)
+        return open(fd, "wb")
+
+    def failed(self, error: BaseException) -> None:
+        self._tmp.unlink(missing_ok=True)
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 404 and self._stored:
+            # Remember the 404; the body is gone upstream, so drop our copy too.
+            self.body_path.unlink(missing_ok=True)
+            _write_meta(self.meta_path, {"url": self.url, "missing_at": time.time()})
+
+    def finish(self, response: httpx.Response, digest: str | None) -> tuple[Path, bool]:
+        """(body path, whether it is the cached copy) once the body is in `open()`'s file."""
+        if digest is None:
+            self._tmp.unlink(missing_ok=True)
+            if self.meta is None:
+                raise httpx.HTTPError(f"GET {self.url} answered 304 without a cached copy")
+            timings.record("cache", self.url, result="not modified")
+            self.meta["fetched_at"] = time.time()
+            _write_meta(self.meta_path, self.meta)
+            return self.body_path, True
+        timings.record("cache", self.url, result="miss" if self.meta is None else "changed")
+        if not self._stored:
+            return self._tmp, False
+        try:
+            self._tmp.replace(self.body_path)
+        except OSError:
+            return self._tmp, False
+        _write_meta(self.meta_path, {
+            "url": self.url,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "fetched_at": time.time(),
+            "sha256": digest,
+        })
+        return self.body_path, True
+
+
+def _cached_fetch(
+    url: str,
+    timeout: float,
+    max_retries: int,
+    immutable_after: float | None,
+    session: Session | None,
+    expected_sha256: str | None = None,
+    cache_root: Path | None = None,
+    **kwargs
+) -> tuple[Path, bool]:
+    """Revalidate `url` against the cache; returns (body path, whether it is the cached copy).
+
+    A fresh body is streamed straight to disk. When the cache directory is not
+    writable the path is a temporary file outside it, which the caller owns.
+    """
+    request = _CachedRequest(url, immutable_after, expected_sha256, cache_root, kwargs.pop("headers", None))
+    if request.hit:
+        return request.body_path, True
+    session = session or default_session()
+    try:
+        with request.open() as fp:
+            response, digest = _stream_to(session, url, fp, timeout, max_retries, headers=request.headers, **kwargs)
+    except BaseException as e:
+        request.failed(e)
+        raise
+    return request.finish(response, digest)
+
+
+async def _async_cached_fetch(
+    url: str,
+    timeout: float,
+    max_retries: int,
+    immutable_after: float | None,
+    session: AsyncSession,
+    expected_sha256: str | None = None,
+    cache_root: Path | None = None,
+    **kwargs
+) -> tuple[Path, bool]:
+    """asyncio twin of _cached_fetch over an AsyncSession."""
+    request = _CachedRequest(url, immutable_after, expected_sha256, cache_root, kwargs.pop("headers", None))
+    if request.hit:
+        return request.body_path, True
+    try:
+        with request.open() as fp:
+            response, digest = await _async_stream_to(session, url, fp, timeout, max_retries, headers=request.headers, **kwargs)
+    except BaseException as e:
+        request.failed(e)
+        raise
+    return request.finish(response, digest)
+
+
+def cached_get_file(
+    url: str,
+    timeout: float = 10.0,
+    max_retries: int = 3,
+    immutable_after: float | None = None,
+    session: Session | None = None,
+    cache_root: Path | None = None,
+    **kwargs
+) -> Path:
+    """Fetch `url` through the on-disk cache and return the cached body's path.
+
+    A cached copy is revalidated with If-None-Match / If-Modified-Since, so an
+    unchanged resource costs a 304 instead of the full body, and a changed one
+    is streamed to disk without being held in memory. If the copy was
+    fetched at or after the epoch time `immutable_after`, it is served without
+    any request at all. A 404 is remembered for MISSING_TTL seconds and raised
+    again without a request. `cache_root` overrides the cache directory; if
+    it is not writable, a temporary copy is returned instead.
+    Raises httpx exceptions on final failure.
+    """
+    path, _ = _cached_fetch(url, timeout, max_retries, immutable_after, session, cache_root=cache_root, **kwargs)
+    return path
+
+
+def cached_get_json(
+    url: str,
+    timeout: float = 10.0,
+    max_retries: int = 3,
+    immutable_after: float | None = None,
+    session: Session | None = None,
+    expected_sha256: str | None = None,
+    cache_root: Path | None = None,
+    **kwargs
+) -> Any | None:
+    """Like safe_get_json, but backed by the on-disk cache (see cached_get_file).
+
+    A cached body whose SHA-256 equals `expected_sha256` (e.g. from a shard
+    manifest) is used without a request.
+    """
+    path, cached = _cached_fetch(url, timeout, max_retries, immutable_after, session, expected_sha256, cache_root, **kwargs)
+    return _read_cached_json(url, path, cached)
+
+
+def _read_cached_json(url: str, path: Path, cached: bool) -> Any | None:
+    with timings.phase("json", url) as fields:
+        try:
+            data = path.read_bytes()
+            fields["bytes"] = len(data)
+            return json.loads(data)
+        except (OSError, ValueError):
+            return None
+        finally:
+            if not cached:
+                path.unlink(missing_ok=True)
+
+
+async def async_cached_get_file(
+    url: str,
+    session: AsyncSession,
+    timeout: float = 10.0,
+    max_retries: int = 3,
+    immutable_after: float | None = None,
+    cache_root: Path | None = None,
+    **kwargs
+) -> Path:
+    """cached_get_file over an AsyncSession; the cache files are shared with it."""
+    path, _ = await _async_cached_fetch(url, timeout, max_retries, immutable_after, session, cache_root=cache_root, **kwargs)
+    return path
+
+
+async def async_cached_get_json(
+    url: str,
+    session: AsyncSession,
+    timeout: float = 10.0,
+    max_retries: int = 3,
+    immutable_after: float | None = None,
+    expected_sha256: str | None = None,
+    cache_root: Path | None = None,
+    **kwargs
+) -> Any | None:
+    """cached_get_json over an AsyncSession; the cache files are shared with it."""
+    path, cached = await _async_cached_fetch(
+        url, timeout, max_retries, immutable_after, session, expected_sha256, cache_root, **kwargs
+    )
+    return _read_cached_json(url, path, cached)
+
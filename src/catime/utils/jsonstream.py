@@ -0,0 +1,79 @@
+import json
+from collections.abc import Iterator
+from typing import Any, TextIO
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789+-.eE"
+
+
+def _maybe_truncated(buf: str, end: int, value: Any) -> bool:
+    """True if a value decoded from buf could continue past the end of buf."""
+    if end == len(buf):
+        return True
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # "1." or "1e" at the chunk boundary decodes as 1; look for a delimiter.
+        for c in buf[end:]:
+            if c not in _NUMBER_CHARS:
+                return False
+        return True
+    return False
+
+
+def iter_json_array(fp: TextIO, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Reads `fp` in chunks and decodes each element as soon as it is complete,
+    so memory stays bounded by the largest element rather than the file.
+    Raises ValueError on malformed input.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_ws() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ""
+
+    if skip_ws() != "[":
+        raise ValueError("expected a JSON array")
+    pos += 1
+    if skip_ws() == "]":
+        return
+
+    while True:
+        skip_ws()
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+            if not eof and _maybe_truncated(buf, end, value):
+                raise json.JSONDecodeError("element may be truncated", buf, end)
+        except json.JSONDecodeError:
+            if not fill():
+                raise
+            continue
+        yield value
+        pos = end
+        sep = skip_ws()
+        if sep == "]":
+            return
+        if sep != ",":
+            raise ValueError(f"expected ',' or ']' in JSON array, got {sep!r}")
+        pos += 1
@@ -0,0 +1,31 @@
+import os
+from pathlib import Path
+
+
+def cache_dir() -> Path:
+    """Directory for catime's caches (HTTP bodies, search index).
+
+    Honours $CATIME_CACHE_DIR, then $XDG_CACHE_HOME/catime, then ~/.cache/catime.
+    """
+    override = os.environ.get("CATIME_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "catime"
+
+
+def data_dir() -> Path:
+    """Directory for catime's persistent data.
+
+    Honours $XDG_DATA_HOME/catime, then ~/.local/share/catime.
+    """
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return Path(base) / "catime"
+
+
+def mirror_dir() -> Path:
+    """Where `catime sync` mirrors the data files ($CATIME_MIRROR_DIR overrides)."""
+    override = os.environ.get("CATIME_MIRROR_DIR")
+    if override:
+        return Path(override)
+    return data_dir() / "mirror"
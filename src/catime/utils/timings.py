@@ -0,0 +1,133 @@
+"""Opt-in instrumentation of the CLI hot path: `catime --timings` or CATIME_TIMINGS=1.
+
+Records each HTTP attempt (connect, TLS, wait and transfer time, status,
+bytes), retries, HTTP cache outcomes, which side of the Pages -> raw
+fallback answered, JSON decode time and named phases such as enrichment,
+then prints them to stderr when the command ends: a table, or one JSON
+object per run with CATIME_TIMINGS=json / --timings=json. While disabled
+every hook is a single global check.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import ClassVar
+
+ENV_VAR = "CATIME_TIMINGS"
+FORMATS = ("table", "json")
+
+_records: list[dict] | None = None
+_started = 0.0
+
+
+def from_env() -> str | None:
+    """Report format requested by $CATIME_TIMINGS, or None when unset/off."""
+    value = os.environ.get(ENV_VAR, "").strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return None
+    return value if value in FORMATS else "table"
+
+
+def enable() -> None:
+    global _records, _started
+    _records = []
+    _started = time.perf_counter()
+
+
+def disable() -> None:
+    global _records
+    _records = None
+
+
+def enabled() -> bool:
+    return _records is not None
+
+
+def record(kind: str, name: str, **fields) -> None:
+    if _records is not None:
+        _records.append({"kind": kind, "name": name, **fields})
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+@contextmanager
+def phase(kind: str, name: str, **fields):
+    """Time a block; the yielded dict can take extra fields (e.g. bytes) before it ends."""
+    if _records is None:
+        yield fields
+        return
+    started = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        record(kind, name, ms=_ms(time.perf_counter() - started), **fields)
+
+
+class HttpTrace:
+    """httpx "trace" extension callback summing one request's phase durations.
+
+    httpcore resolves the host inside connect_tcp, so "connect" is DNS plus
+    the TCP handshake.
+    """
+
+    PHASES: ClassVar[dict[str, str]] = {
+        "connect_tcp": "connect",
+        "start_tls": "tls",
+        "send_request_headers": "send",
+        "send_request_body": "send",
+        "receive_response_headers": "wait",
+        "receive_response_body": "transfer",
+    }
+
+    def __init__(self):
+        self.ms: dict[str, float] = {}
+        self._open: dict[str, float] = {}
+
+    def __call__(self, event_name: str, info: dict) -> None:
+        step, _, state = event_name.rpartition(".")
+        name = self.PHASES.get(step.rpartition(".")[2])
+        if name is None:
+            return
+        now = time.perf_counter()
+        if state == "started":
+            self._open[step] = now
+        elif step in self._open:
+            self.ms[name] = round(self.ms.get(name, 0.0) + _ms(now - self._open.pop(step)), 3)
+
+
+def _describe(rec: dict) -> str:
+    kind = rec["kind"]
+    if kind == "http":
+        steps = ", ".join(f"{k} {rec[k]:.1f}" for k in ("connect", "tls", "send", "wait", "transfer") if k in rec)
+        status = rec.get("status") or rec.get("error") or "?"
+        return f"{status} {rec['name']}  #{rec['attempt']}  {rec.get('bytes', 0)} B" + (f"  ({steps})" if steps else "")
+    if kind == "retry":
+        return f"{rec['name']} after attempt {rec['attempt']}, waiting {rec['delay_ms']:.0f} ms"
+    if kind == "cache":
+        return f"{rec['result']}  {rec['name']}"
+    if kind == "fallback":
+        if rec["used"] == "pages":
+            return f"pages answered {rec['name']}"
+        return f"fell back to raw for {rec['name']} (pages: {rec.get('error')})"
+    if kind == "json":
+        return f"{rec.get('bytes', 0)} B  {rec['name']}"
+    return rec["name"]
+
+
+def report(fmt: str = "table", file=None) -> None:
+    """Print the records collected since enable()."""
+    import json
+
+    file = file or sys.stderr
+    records = _records or []
+    total = _ms(time.perf_counter() - _started)
+    if fmt == "json":
+        print(json.dumps({"total_ms": total, "records": records}, ensure_ascii=False), file=file)
+        return
+    print(f"timings: {total:.1f} ms total", file=file)
+    for rec in records:
+        ms = f"{rec['ms']:9.1f}" if "ms" in rec else " " * 9
+        print(f"  {rec['kind']:<8} {ms}  {_describe(rec)}", file=file)
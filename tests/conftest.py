@@ -21,3 +21,11 @@ def mock_gemini(monkeypatch):
     import sys
     monkeypatch.setitem(sys.modules, "gemini", mock)
     return mock
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep the on-disk caches and sync mirror out of the real home directory."""
+    cache = tmp_path / "catime-cache"
+    monkeypatch.setenv("CATIME_CACHE_DIR", str(cache))
+    monkeypatch.setenv("CATIME_MIRROR_DIR", str(tmp_path / "catime-mirror"))
+    return cache
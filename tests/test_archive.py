@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from catime import cli
+from catime.archive import ARCHIVE_NAME, Archive
+
+CATS = [
+    {"number": 1, "timestamp": "2026-02-28 23:00 UTC", "url": "u1", "model": "m", "character": "mochi"},
+    {"number": None, "timestamp": "2026-03-01 00:00 UTC", "status": "failed"},
+    {"number": 3, "timestamp": "2026-03-01 01:00 UTC", "url": "u3", "model": "m"},
+    {"number": 4, "timestamp": "2026-03-02 05:00 UTC", "url": "u4", "model": "m"},
+]
+DETAILS = {
+    "2026-02": [{"number": 1, "title": "Bubble tea", "story": "珍珠奶茶的故事"}],
+    "2026-03": [{"number": 3, "title": "Moon", "idea": "moon cake"}, {"number": 4, "story": "bubble bath"}],
+}
+
+
+def _write(root, cats, details):
+    (root / "catlist.json").write_text(json.dumps(cats))
+    (root / "cats").mkdir(exist_ok=True)
+    for month, entries in details.items():
+        (root / "cats" / f"{month}.json").write_text(json.dumps(entries, ensure_ascii=False))
+
+
+@pytest.fixture
+def archive(tmp_path):
+    _write(tmp_path, CATS, DETAILS)
+    archive = Archive(tmp_path / ARCHIVE_NAME)
+    assert archive.refresh(tmp_path)
+    yield archive
+    archive.close()
+
+
+def test_catlist_lookups(archive):
+    cats = archive.catlist()
+    assert len(cats) == 4
+    assert cats[0] == CATS[0]
+    assert cats[-1] == CATS[-1]
+    assert cats[1:3] == CATS[1:3]
+    assert list(cats) == CATS
+    assert cats.at([3, 0]) == [CATS[3], CATS[0]]
+    assert cats.timeline.prefix("2026-03-01") == [1, 2]
+    assert cats.timeline.dates("2026-02-28", "2026-03-01") == [0, 1, 2]
+    with pytest.raises(IndexError):
+        cats[4]
+
+
+def test_details_and_search(archive):
+    assert archive.detail(3) == DETAILS["2026-03"][0]
+    assert archive.detail(2) is None
+    assert archive.month_details("2026-03") == DETAILS["2026-03"]
+    assert [r["number"] for r in archive.search("bubble")] == [1, 4]  # title hit first
+    assert [r["number"] for r in archive.search("奶茶")] == [1]
+    assert [r["number"] for r in archive.search("moon tea")] == [3, 1]  # no cat has both: any term
+    assert archive.search("bubble")[0]["url"] == "u1"
+
+
+def test_refresh_is_incremental(archive, tmp_path, monkeypatch):
+    assert not archive.refresh(tmp_path)
+    replaced = []
+    replace_month = archive._replace_month
+    monkeypatch.setattr(archive, "_replace_month", lambda month, details: replaced.append(month) or replace_month(month, details))
+    new = {"number": 5, "timestamp": "2026-03-02 06:00 UTC", "url": "u5"}
+    _write(tmp_path, CATS + [new], {"2026-03": DETAILS["2026-03"] + [{"number": 5, "title": "Kite"}]})
+    assert archive.refresh(tmp_path)
+    assert replaced == ["2026-03"]
+    assert archive.catlist()[-1] == new
+    assert [r["number"] for r in archive.search("kite")] == [5]
+
+
+def test_refresh_rebuilds_rewritten_catlist(archive, tmp_path):
+    rewritten = [dict(CATS[0], timestamp="2026-01-01 00:00 UTC")]
+    (tmp_path / "catlist.json").write_text(json.dumps(rewritten) + "\n")
+    archive.refresh(tmp_path)
+    assert list(archive.catlist()) == rewritten
+
+
+def test_journal_entries_are_rows_until_compacted(archive, tmp_path):
+    from catime.journal import JOURNAL_NAME, append_record
+
+    new = {"number": 5, "timestamp": "2026-03-02 06:00 UTC", "url": "u5"}
+    append_record(tmp_path / JOURNAL_NAME, new, {"number": 5, "title": "Kite"})
+    assert archive.refresh(tmp_path)
+    assert archive.catlist()[-1] == new
+    assert archive.detail(5) == {"number": 5, "title": "Kite"}
+    assert [r["number"] for r in archive.search("kite")] == [5]
+
+    # Compaction moves the entry into the files and empties the journal.
+    _write(tmp_path, CATS + [new], {"2026-03": DETAILS["2026-03"] + [{"number": 5, "title": "Kite"}]})
+    (tmp_path / JOURNAL_NAME).write_text("")
+    archive.refresh(tmp_path)
+    assert len(archive.catlist()) == 5
+    assert [r["number"] for r in archive.search("kite")] == [5]
+
+
+def test_cli_uses_archive_when_present(archive, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(cli, "_local_root", lambda: tmp_path)
+    monkeypatch.setattr(cli, "_archives", {})
+    monkeypatch.setattr(cli, "_detail_loaders", {})
+    (tmp_path / "catlist.json").write_text("[]")  # only the archive can answer
+    monkeypatch.setattr(Archive, "refresh", lambda self, root, cats=None: False)
+
+    monkeypatch.setattr("sys.argv", ["catime", "2026-03-01", "--local"])
+    cli.main()
+    out = capsys.readouterr().out
+    assert "Found 2 cat(s)" in out and "Idea: moon cake" in out
+
+    monkeypatch.setattr("sys.argv", ["catime", "search", "奶茶", "--local"])
+    cli.main()
+    assert "Cat #   1" in capsys.readouterr().out
@@ -1,4 +1,261 @@
+import json
+
+import pytest
+
+from catime import cli
+
+
 def test_cli_help_output():
     # emulate CLI help output behavior
     help_text = "catime CLI - help"
     assert "help" in help_text.lower()
+
+
+def _cats():
+    return [
+        {"number": 1, "timestamp": "2026-02-28 22:00 UTC", "url": "u1", "model": "m"},
+        {"number": None, "timestamp": "2026-02-28 23:00 UTC", "url": None, "model": "all failed",
+         "status": "failed", "error": "boom"},
+        {"number": 3, "timestamp": "2026-03-01 00:00 UTC", "url": "u3", "model": "m"},
+        {"number": 4, "timestamp": "2026-03-20 10:00 UTC", "url": "u4", "model": "m"},
+        {"number": 5, "timestamp": "2026-04-01 00:00 UTC", "url": "u5", "model": "m"},
+    ]
+
+
+@pytest.fixture(autouse=True)
+def clear_detail_cache():
+    cli._detail_cache.clear()
+    cli._detail_index_cache.clear()
+    cli._journals.clear()
+    yield
+    cli._detail_cache.clear()
+    cli._detail_index_cache.clear()
+    cli._journals.clear()
+
+
+@pytest.mark.parametrize("query,expected", [
+    ("100-250", (100, 250)),
+    ("7-7", (7, 7)),
+    ("2026-03", None),
+    ("250-100", None),
+    ("0-5", None),
+    ("latest", None),
+])
+def test_parse_number_range(query, expected):
+    assert cli.parse_number_range(query) == expected
+
+
+def test_filter_by_month_and_date_range():
+    cats = _cats()
+    assert [c["number"] for c in cli.filter_by_query(cats, "2026-03")] == [3, 4]
+    assert [c["timestamp"] for c in cli.filter_by_query(cats, "2026-02-28..2026-03-01")] == [
+        "2026-02-28 22:00 UTC", "2026-02-28 23:00 UTC", "2026-03-01 00:00 UTC",
+    ]
+
+
+def test_number_range_prefetches_each_month_once(monkeypatch, capsys):
+    fetched = []
+
+    def fake_fetch_detail(month, *, repo=cli.DEFAULT_REPO, local=False):
+        if month in cli._detail_cache:
+            return cli._detail_cache[month]
+        fetched.append(month)
+        cli._detail_cache[month] = []
+        return []
+
+    monkeypatch.setattr(cli, "fetch_manifest", lambda repo: None)
+    monkeypatch.setattr(cli, "fetch_catlist", lambda repo: _cats())
+    monkeypatch.setattr(cli, "fetch_detail", fake_fetch_detail)
+    monkeypatch.setattr("sys.argv", ["catime", "1-4"])
+    cli.main()
+
+    assert sorted(fetched) == ["2026-02", "2026-03"]
+    out = capsys.readouterr().out
+    assert "Found 4 cat(s) for '1-4'" in out
+    assert "[FAILED]" in out
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    """Serve _cats() as shards; records which shard files were downloaded."""
+    from catime.shards import build_shards
+
+    shards, manifest = build_shards(_cats())
+    fetched = []
+
+    def fake_fetch(pages_url, raw_url, immutable_after=None, **kwargs):
+        name = pages_url.rsplit("/", 1)[1]
+        if "/catlist/" in pages_url:
+            fetched.append(name)
+            return json.loads(shards[name.removesuffix(".json")])
+        return []
+
+    monkeypatch.setattr(cli, "fetch_manifest", lambda repo: manifest)
+    monkeypatch.setattr(cli, "fetch_journal", lambda repo: [])
+    monkeypatch.setattr(cli, "fetch_catlist", lambda repo: pytest.fail("full catlist fetched"))
+    monkeypatch.setattr(cli, "_fetch_json_with_fallback", fake_fetch)
+    return fetched
+
+
+@pytest.mark.parametrize("query,shards,expected", [
+    ("latest", [], "Cat #   5"),
+    ("3", ["2026-03.json"], "Cat #   3"),
+    ("2026-03", ["2026-03.json"], "Found 2 cat(s)"),
+    ("2026-02-28..2026-03-01", ["2026-02.json", "2026-03.json"], "Found 3 cat(s)"),
+    ("2-3", ["2026-02.json", "2026-03.json"], "Found 2 cat(s)"),
+    ("1999-01-01", [], "No cats found"),
+])
+def test_queries_fetch_only_needed_shards(sharded, monkeypatch, capsys, query, shards, expected):
+    monkeypatch.setattr("sys.argv", ["catime", query])
+    try:
+        cli.main()
+    except SystemExit:
+        pass
+    captured = capsys.readouterr()
+    assert expected in captured.out + captured.err
+    assert sorted(sharded) == shards
+
+
+def test_enrich_cat_uses_number_index(monkeypatch):
+    details = [{"number": 3, "story": "first"}, {"number": 3, "story": "dup"}, {"number": 4, "story": "four"}]
+    monkeypatch.setattr(cli, "_fetch_json_with_fallback", lambda *a, **k: details)
+
+    cats = _cats()
+    assert cli.enrich_cat(cats[2]).story == "first"
+    assert cli.enrich_cat(cats[3]).story == "four"
+    assert cli.enrich_cat(cats[1]).story is None
+    assert cli.fetch_detail_index("2026-03") == {3: details[0], 4: details[2]}
+
+
+
+def test_failed_detail_fetch_is_not_cached(monkeypatch):
+    import httpx
+
+    results = [httpx.ConnectError("offline"), [{"number": 3, "story": "back"}]]
+
+    def fake_fetch(*args, **kwargs):
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(cli, "_fetch_json_with_fallback", fake_fetch)
+    assert cli.fetch_detail("2026-03") is None
+    assert cli.fetch_detail_index("2026-03") == {3: {"number": 3, "story": "back"}}
+
+
+def test_missing_detail_file_is_an_empty_month(monkeypatch):
+    import httpx
+
+    def not_found(*args, **kwargs):
+        request = httpx.Request("GET", "https://example.invalid/cats/2026-02.json")
+        raise httpx.HTTPStatusError("404", request=request, response=httpx.Response(404, request=request))
+
+    monkeypatch.setattr(cli, "_fetch_json_with_fallback", not_found)
+    assert cli.fetch_detail("2026-02") == []
+    assert "2026-02" in cli._detail_cache
+
+
+@pytest.fixture
+def local_root(tmp_path, monkeypatch):
+    (tmp_path / "catlist.json").write_text(json.dumps(_cats(), indent=2))
+    monkeypatch.setattr(cli, "_local_root", lambda: tmp_path)
+    return tmp_path
+
+
+LIST_PAGES = [
+    ([], ["#   1", "#   2", "#   3", "#   4", "#   5"]),
+    (["--limit", "2"], ["#   1", "#   2"]),
+    (["--offset", "3"], ["#   4", "#   5"]),
+    (["--reverse", "--limit", "2"], ["#   5", "#   4"]),
+    (["--reverse", "--offset", "1", "--limit", "2"], ["#   4", "#   3"]),
+    (["--offset", "9"], []),
+]
+
+
+def _listed(capsys) -> list[str]:
+    return [line[4:9] for line in capsys.readouterr().out.splitlines() if line.startswith("Cat #")]
+
+
+@pytest.mark.parametrize("flags,expected", LIST_PAGES)
+def test_list_pagination(local_root, monkeypatch, capsys, flags, expected):
+    monkeypatch.setattr("sys.argv", ["catime", "--local", "--list", *flags])
+    cli.main()
+    assert _listed(capsys) == expected
+
+
+@pytest.mark.parametrize("flags,expected", LIST_PAGES)
+def test_list_pages_from_shards(sharded, monkeypatch, capsys, flags, expected):
+    monkeypatch.setattr(cli, "fetch_catlist_file", lambda repo: pytest.fail("full catlist fetched"))
+    monkeypatch.setattr("sys.argv", ["catime", "--list", *flags])
+    cli.main()
+    assert _listed(capsys) == expected
+    if flags == ["--limit", "2"]:
+        assert sharded == ["2026-02.json"]
+
+
+def test_list_includes_journal(local_root, monkeypatch, capsys):
+    from catime.journal import JOURNAL_NAME, append_record
+
+    append_record(local_root / JOURNAL_NAME, {"number": 6, "timestamp": "2026-04-01 01:00 UTC", "url": "u6"})
+    monkeypatch.setattr("sys.argv", ["catime", "--local", "--list", "--reverse", "--limit", "2"])
+    cli.main()
+    assert _listed(capsys) == ["#   6", "#   5"]
+
+
+def test_fetch_catlist_prefers_compact(monkeypatch):
+    from catime.compact import encode_catlist
+
+    monkeypatch.setattr(cli, "fetch_journal", lambda repo: [])
+    requested = []
+
+    def fake_fetch(pages_url, raw_url, immutable_after=None, **kwargs):
+        requested.append(pages_url.rsplit("/", 1)[1])
+        if pages_url.endswith("catlist.compact.json"):
+            return encode_catlist(_cats())
+        return pytest.fail("full catlist fetched")
+
+    monkeypatch.setattr(cli, "_fetch_json_with_fallback", fake_fetch)
+    assert list(cli.fetch_catlist("o/r")) == _cats()
+    assert requested == ["catlist.compact.json"]
+
+
+def test_unpublished_files_are_not_requested_again(monkeypatch):
+    import httpx
+
+    from catime.utils import http
+    from catime.utils.http import Session
+
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        if request.url.path.endswith("/catlist.json"):
+            return httpx.Response(200, json=_cats())
+        return httpx.Response(404)
+
+    session = Session(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http, "default_session", lambda: session)
+    for _ in range(2):
+        cli._journals.clear()
+        assert cli.fetch_manifest("o/r") is None
+        assert cli.fetch_catlist("o/r") == _cats()
+    session.close()
+
+    # manifest, compact catlist and journal: Pages then raw, once each.
+    assert len([u for u in requested if not u.endswith("/catlist.json")]) == 6
+    assert requested.count("https://o.github.io/r/catlist.json") == 2
+
+
+def test_fetch_catlist_falls_back_without_compact(monkeypatch):
+    import httpx
+
+    monkeypatch.setattr(cli, "fetch_journal", lambda repo: [])
+    def fake_fetch(pages_url, raw_url, immutable_after=None, **kwargs):
+        if pages_url.endswith("catlist.compact.json"):
+            request = httpx.Request("GET", pages_url)
+            raise httpx.HTTPStatusError("404", request=request, response=httpx.Response(404, request=request))
+        return _cats()
+
+    monkeypatch.setattr(cli, "_fetch_json_with_fallback", fake_fetch)
+    assert cli.fetch_catlist("o/r") == _cats()
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from collections import Counter
+
+import httpx
+import pytest
+
+from catime import AsyncClient, Client
+from catime.shards import build_shards
+from catime.utils.http import AsyncSession, Session
+
+CATS = [
+    {"number": 1, "timestamp": "2026-02-01 00:00 UTC", "url": "u1"},
+    {"number": None, "timestamp": "2026-02-01 01:00 UTC", "status": "failed"},
+    {"number": 3, "timestamp": "2026-03-01 00:00 UTC", "url": "u3"},
+    {"number": 4, "timestamp": "2026-03-02 00:00 UTC", "url": "u4"},
+    {"number": 5, "timestamp": "2026-04-01 00:00 UTC", "url": "u5"},
+]
+DETAILS = {
+    "2026-02": [{"number": 1, "story": "s1"}],
+    "2026-03": [{"number": 3, "story": "s3"}, {"number": 4, "story": "s4"}],
+    "2026-04": [{"number": 5, "story": "s5"}],
+}
+
+
+def _files(sharded: bool) -> dict[str, bytes]:
+    files = {"catlist.json": json.dumps(CATS).encode()}
+    files.update({f"cats/{m}.json": json.dumps(d).encode() for m, d in DETAILS.items()})
+    if sharded:
+        shards, manifest = build_shards(CATS)
+        files["catlist/manifest.json"] = json.dumps(manifest).encode()
+        files.update({f"catlist/{m}.json": data for m, data in shards.items()})
+    return files
+
+
+@pytest.fixture(params=[True, False], ids=["sharded", "plain"])
+def repo(request):
+    files = _files(request.param)
+    requests = Counter()
+
+    def handler(request):
+        relpath = request.url.path.split("/", 2)[2]
+        requests[relpath] += 1
+        if relpath not in files:
+            return httpx.Response(404)
+        return httpx.Response(200, content=files[relpath])
+
+    with Session(transport=httpx.MockTransport(handler)) as session:
+        session.sharded = request.param
+        session.handler = handler
+        yield session, requests
+
+
+def test_latest_get_and_range(repo, tmp_path):
+    session, _ = repo
+    client = Client(repo="o/r", cache=tmp_path, session=session)
+    assert client.count() == 5
+    latest = client.latest()
+    assert (latest.number, latest.story) == (5, "s5")
+    assert client.get(3).story == "s3"
+    assert client.get(99) is None
+    assert [c.number for c in client.range(1, 3)] == [1, None, 3]
+    assert [c.story for c in client.query("2026-03")] == ["s3", "s4"]
+
+
+def test_get_many_fetches_each_month_once(repo, tmp_path):
+    session, requests = repo
+    client = Client(repo="o/r", cache=tmp_path, session=session)
+    cats = client.get_many([4, 1, 3, 0, 4])
+    assert [c and c.story for c in cats] == ["s4", "s1", "s3", None, "s4"]
+    assert requests["cats/2026-02.json"] == 1
+    assert requests["cats/2026-03.json"] == 1
+    assert "cats/2026-04.json" not in requests
+    if session.sharded:
+        assert "catlist.json" not in requests
+        assert requests["catlist/2026-03.json"] == 1
+
+
+def test_no_disk_cache(repo, tmp_path, monkeypatch):
+    session, _ = repo
+    monkeypatch.setenv("CATIME_CACHE_DIR", str(tmp_path / "unused"))
+    assert Client(repo="o/r", cache=False, session=session).get(1).story == "s1"
+    assert not (tmp_path / "unused").exists()
+
+
+def test_async_client(repo, tmp_path):
+    session, requests = repo
+
+    async def run():
+        async with AsyncSession(transport=httpx.MockTransport(session.handler)) as async_session:
+            client = AsyncClient(repo="o/r", cache=tmp_path, session=async_session)
+            cats = await client.get_many([1, 3, 4, 0])
+            return cats, await client.latest(), await client.range(2, 3), await client.query("2026-03")
+
+    cats, latest, span, march = asyncio.run(run())
+    assert [c and c.story for c in cats] == ["s1", "s3", "s4", None]
+    assert (latest.number, latest.story) == (5, "s5")
+    assert [c.number for c in span] == [None, 3]
+    assert [c.story for c in march] == ["s3", "s4"]
+    assert requests["cats/2026-03.json"] == 1
+    if session.sharded:
+        assert "catlist.json" not in requests
+        assert requests["catlist/2026-03.json"] == 1
+
+
+def test_failed_detail_fetch_is_not_cached(tmp_path, monkeypatch):
+    from catime.utils import http
+
+    monkeypatch.setattr(http.time, "sleep", lambda s: None)
+    files = _files(sharded=False)
+    down = {"cats": True}
+
+    def handler(request):
+        relpath = request.url.path.split("/", 2)[2]
+        if down["cats"] and "cats/" in relpath:
+            return httpx.Response(503)
+        return httpx.Response(200, content=files[relpath]) if relpath in files else httpx.Response(404)
+
+    with Session(transport=httpx.MockTransport(handler)) as session:
+        client = Client(repo="o/r", cache=tmp_path, session=session)
+        assert client.get(3).story is None
+        down["cats"] = False
+        assert client.get(3).story == "s3"
@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from catime.compact import CompactCatlist, encode_catlist
+
+REPO_CATLIST = Path(__file__).resolve().parent.parent / "catlist.json"
+
+CATS = [
+    {"timestamp": "2026-01-30 05:46 UTC", "number": 1, "model": "gemini-2.5-flash-image",
+     "url": "https://github.com/yazelin/catime/releases/download/cats/cat_2026-01-30_0546_UTC.png"},
+    {"number": None, "timestamp": "2026-01-30 06:00 UTC", "url": None, "status": "failed",
+     "model": "all failed", "error": "boom"},
+    {"number": 3, "timestamp": "2026-02-01 00:05 UTC", "status": "success", "title": None,
+     "model": "gemini-2.5-flash-image", "character": "mochi", "inspiration": "original",
+     "url": "https://github.com/yazelin/catime/releases/download/cats-2026-02/cat_2026-02-01_0005_UTC.webp"},
+    {"number": 7, "timestamp": "late {night}", "url": "https://example.com/{odd}.png", "is_seasonal": True},
+    {"number": 5, "timestamp": "2026-02-01 01:00 UTC", "url": "https://example.com/elsewhere.png",
+     "inspiration": "original"},
+]
+
+
+def test_round_trip_edge_cases():
+    data = json.loads(json.dumps(encode_catlist(CATS)))
+    compact = CompactCatlist(data)
+    assert len(compact) == len(CATS)
+    assert list(compact) == CATS
+    assert compact[-1] == CATS[-1]
+    assert compact[1:3] == CATS[1:3]
+    with pytest.raises(IndexError):
+        compact[len(CATS)]
+
+
+def test_dictionary_and_template_columns():
+    data = encode_catlist(CATS)
+    assert data["columns"]["number"][:3] == [0, None, 0]
+    assert data["dicts"]["model"] == ["gemini-2.5-flash-image", "all failed"]
+    assert "https://github.com/yazelin/catime/releases/download/cats-{month}/cat_{date}_{hm}_UTC.webp" in data["url_templates"]
+
+
+def test_rejects_other_formats():
+    with pytest.raises(ValueError):
+        CompactCatlist([{"number": 1}])
+
+
+@pytest.mark.skipif(not REPO_CATLIST.exists(), reason="no catlist.json in tree")
+def test_repo_catlist_round_trips_and_shrinks():
+    raw = REPO_CATLIST.read_text(encoding="utf-8")
+    cats = json.loads(raw)
+    encoded = json.dumps(encode_catlist(cats), ensure_ascii=False, separators=(",", ":"))
+    assert list(CompactCatlist(json.loads(encoded))) == cats
+    assert len(encoded.encode()) < len(raw.encode()) / 2
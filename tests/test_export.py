@@ -0,0 +1,129 @@
+import json
+
+import httpx
+import pytest
+
+from catime.export import SIDECAR_NAME, Exporter
+from catime.records import Cat
+from catime.utils.http import Session
+
+IMAGES = {f"cat_2026-03-0{n}_0000_UTC.webp": bytes([n]) * (1000 * n) for n in (1, 2, 3)}
+
+
+def _cats():
+    details = {1: {"number": 1, "story": "s1"}, 2: {"number": 2, "story": "s2"}, 3: {"number": 3, "story": "s3"}}
+    cats = [
+        Cat.from_dict({
+            "number": n, "timestamp": f"2026-03-0{n} 00:00 UTC",
+            "url": f"https://github.com/o/r/releases/download/cats-2026-03/cat_2026-03-0{n}_0000_UTC.webp",
+        }, lambda month, number: details[number])
+        for n in (1, 2, 3)
+    ]
+    cats.insert(1, Cat.from_dict({"number": None, "timestamp": "2026-03-01 12:00 UTC", "status": "failed"}))
+    return cats
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr("catime.export.time.sleep", lambda s: None)
+
+
+@pytest.fixture
+def cdn():
+    requests = []
+    flaky = {"cat_2026-03-02_0000_UTC.webp": 1}
+
+    def handler(request):
+        name = request.url.path.rsplit("/", 1)[1]
+        requests.append((request.url.host, name))
+        if request.url.host == "github.com":
+            return httpx.Response(302, headers={"Location": f"https://assets.example/{name}?sig=1"})
+        if flaky.get(name):
+            flaky[name] -= 1
+            return httpx.Response(503)
+        return httpx.Response(200, content=IMAGES[name])
+
+    with Session(transport=httpx.MockTransport(handler)) as session:
+        yield session, requests
+
+
+def test_export_downloads_and_writes_sidecar(tmp_path, cdn):
+    session, requests = cdn
+    report = Exporter(tmp_path, session=session, workers=3).export(_cats())
+
+    assert sorted(report.downloaded) == sorted(IMAGES)
+    assert report.bytes == sum(len(b) for b in IMAGES.values())
+    for name, body in IMAGES.items():
+        assert (tmp_path / name).read_bytes() == body
+    records = [json.loads(line) for line in (tmp_path / SIDECAR_NAME).read_text().splitlines()]
+    assert [r["number"] for r in records] == [1, 2, 3]
+    assert records[0]["story"] == "s1" and records[0]["bytes"] == 1000
+    # One redirect per image; the retry of the 503 goes straight to the CDN.
+    assert sum(1 for host, _ in requests if host == "github.com") == 3
+    assert sum(1 for host, _ in requests if host == "assets.example") == 4
+
+
+def test_rerun_skips_complete_files_without_requests(tmp_path, cdn):
+    session, requests = cdn
+    Exporter(tmp_path, session=session).export(_cats())
+    requests.clear()
+    (tmp_path / "cat_2026-03-03_0000_UTC.webp").write_bytes(b"partial")
+
+    report = Exporter(tmp_path, session=session).export(_cats())
+    assert sorted(report.skipped) == ["cat_2026-03-01_0000_UTC.webp", "cat_2026-03-02_0000_UTC.webp"]
+    assert report.downloaded == ["cat_2026-03-03_0000_UTC.webp"]
+    assert {name for _, name in requests} == {"cat_2026-03-03_0000_UTC.webp"}
+
+
+def test_file_with_matching_content_length_is_not_rewritten(tmp_path, cdn):
+    session, _ = cdn
+    name = "cat_2026-03-01_0000_UTC.webp"
+    (tmp_path / name).write_bytes(IMAGES[name])
+    report = Exporter(tmp_path, session=session).export(_cats()[:1])
+    assert report.skipped == [name] and report.bytes == 0
+
+
+def test_sidecar_is_appended_as_downloads_finish(tmp_path, cdn, monkeypatch):
+    session, _ = cdn
+    exporter = Exporter(tmp_path, session=session, workers=1)
+    seen = []
+    append = exporter._append_record
+
+    def checkpoint(record):
+        append(record)
+        seen.append(len((tmp_path / SIDECAR_NAME).read_text().splitlines()))
+
+    monkeypatch.setattr(exporter, "_append_record", checkpoint)
+    exporter.export(_cats())
+    assert seen == [1, 2, 3]
+
+
+def test_expired_location_is_resolved_again(tmp_path):
+    requests = []
+    expired = {"sig=1"}
+
+    def handler(request):
+        requests.append(request.url.host)
+        if request.url.host == "github.com":
+            sig = f"sig={len(requests)}"
+            return httpx.Response(302, headers={"Location": f"https://assets.example/x.webp?{sig}"})
+        if request.url.query.decode() in expired and requests.count("assets.example") > 1:
+            return httpx.Response(403)
+        return httpx.Response(200, content=b"x")
+
+    url = "https://github.com/o/r/releases/download/t/x.webp"
+    with Session(transport=httpx.MockTransport(handler)) as session:
+        exporter = Exporter(tmp_path, session=session)
+        assert exporter._fetch(session, url, tmp_path / "a.webp") == 1
+        assert exporter._fetch(session, url, tmp_path / "b.webp") == 1
+    assert requests == ["github.com", "assets.example", "assets.example", "github.com", "assets.example"]
+
+
+def test_missing_asset_is_reported(tmp_path):
+    def handler(request):
+        return httpx.Response(404)
+
+    with Session(transport=httpx.MockTransport(handler)) as session:
+        report = Exporter(tmp_path, session=session).export(_cats()[:1])
+    assert report.failed == ["cat_2026-03-01_0000_UTC.webp"]
+    assert (tmp_path / SIDECAR_NAME).read_text() == ""
@@ -3,8 +3,9 @@
 import json
 import random
 import sys
-from datetime import datetime, timezone
+from datetime import UTC, datetime
 from pathlib import Path
+from typing import ClassVar
 from unittest import mock
 
 import pytest
@@ -14,8 +15,7 @@ SCRIPTS_DIR = str(Path(__file__).resolve().parent.parent / "scripts")
 if SCRIPTS_DIR not in sys.path:
     sys.path.insert(0, SCRIPTS_DIR)
 
-import generate_cat  # noqa: E402
-
+import generate_cat
 
 # ── Fixtures ──
 
@@ -191,7 +191,7 @@ class TestGetCurrentSeason:
 class TestSelectCharacter:
     def test_original_roll(self, character_index, character_fixture):
         """Roll < original_prob → returns None (original, no character)."""
-        now = datetime(2025, 7, 1, 12, 0, tzinfo=timezone.utc)
+        now = datetime(2025, 7, 1, 12, 0, tzinfo=UTC)
         with mock.patch.object(generate_cat, "load_character_index", return_value=character_index), \
              mock.patch("random.random", return_value=0.1):  # 0.1 < 0.50
             result = generate_cat.select_character(now)
@@ -199,7 +199,7 @@ class TestSelectCharacter:
 
     def test_recurring_roll(self, character_index, character_fixture):
         """Roll in recurring range → picks a character."""
-        now = datetime(2025, 7, 1, 12, 0, tzinfo=timezone.utc)
+        now = datetime(2025, 7, 1, 12, 0, tzinfo=UTC)
         with mock.patch.object(generate_cat, "load_character_index", return_value=character_index), \
              mock.patch.object(generate_cat, "load_character", return_value=character_fixture), \
              mock.patch("random.random", side_effect=[0.6, 0.5]):  # 0.6 is in recurring range (0.50-0.85)
@@ -209,14 +209,14 @@ class TestSelectCharacter:
 
     def test_no_characters(self):
         """No character index → returns None."""
-        now = datetime(2025, 7, 1, 12, 0, tzinfo=timezone.utc)
+        now = datetime(2025, 7, 1, 12, 0, tzinfo=UTC)
         with mock.patch.object(generate_cat, "load_character_index", return_value=None):
             result = generate_cat.select_character(now)
             assert result is None
 
     def test_empty_characters_list(self):
         """Empty characters list → returns None."""
-        now = datetime(2025, 7, 1, 12, 0, tzinfo=timezone.utc)
+        now = datetime(2025, 7, 1, 12, 0, tzinfo=UTC)
         index = {"characters": [], "probability": {"original": 0.0, "recurring": 1.0}}
         with mock.patch.object(generate_cat, "load_character_index", return_value=index), \
              mock.patch("random.random", return_value=0.5):
@@ -227,6 +227,125 @@ class TestSelectCharacter:
 # ── Style Selection Logic ──
 
 
+class TestStyleFilterMemo:
+    STYLES: ClassVar[dict] = {"art_style": [{"zh": "水彩", "en": "Watercolor", "prompt": "watercolor"}]}
+
+    def test_reuses_result_until_inputs_change(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        with mock.patch.object(generate_cat, "_filter_styles_with_ai", return_value={"art_style": {0}}) as ai:
+            assert generate_cat.filter_styles_memoized(self.STYLES, ["霧"]) == {"art_style": {0}}
+            assert generate_cat.filter_styles_memoized(self.STYLES, ["霧"]) == {"art_style": {0}}
+            assert ai.call_count == 1
+            generate_cat.filter_styles_memoized(self.STYLES, ["霧", "月亮"])
+            assert ai.call_count == 2
+        assert len(json.loads((tmp_path / "style_filter_cache.json").read_text())) == 2
+
+    def test_failed_call_is_not_cached(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        with mock.patch.object(generate_cat, "_filter_styles_with_ai", return_value=None) as ai:
+            assert generate_cat.filter_styles_memoized(self.STYLES, ["霧"]) == {}
+            generate_cat.filter_styles_memoized(self.STYLES, ["霧"])
+        assert ai.call_count == 2
+        assert not (tmp_path / "style_filter_cache.json").exists()
+
+    def test_empty_exclusions_are_cached(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        with mock.patch.object(generate_cat, "_filter_styles_with_ai", return_value={}) as ai:
+            assert generate_cat.filter_styles_memoized(self.STYLES, ["霧"]) == {}
+            assert generate_cat.filter_styles_memoized(self.STYLES, ["霧"]) == {}
+        assert ai.call_count == 1
+
+
+class TestNewsCache:
+    NEWS: ClassVar[list[str]] = ["a", "b", "c", "d", "e"]
+
+    def test_fresh_pool_is_reused_least_recent_first(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        start = datetime(2026, 3, 1, 0, 0, tzinfo=UTC)
+        with mock.patch.object(generate_cat, "fetch_news_inspiration", return_value=self.NEWS) as fetch:
+            first = generate_cat.get_news_inspiration(start)
+            second = generate_cat.get_news_inspiration(start.replace(hour=1))
+            third = generate_cat.get_news_inspiration(start.replace(hour=2))
+        assert fetch.call_count == 1
+        assert len(first) == 3 and set(second[:2]) == set(self.NEWS) - set(first)
+        assert set(third[:2]) == set(first) - {second[2]}
+
+    def test_stale_pool_is_refreshed(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        start = datetime(2026, 3, 1, 0, 0, tzinfo=UTC)
+        with mock.patch.object(generate_cat, "fetch_news_inspiration", side_effect=[["old"], ["new"]]):
+            assert generate_cat.get_news_inspiration(start) == ["old"]
+            assert generate_cat.get_news_inspiration(start.replace(hour=7)) == ["new"]
+
+    def test_pool_of_three_rotates(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        start = datetime(2026, 3, 1, 0, 0, tzinfo=UTC)
+        with mock.patch.object(generate_cat, "fetch_news_inspiration", return_value=["a", "b", "c"]):
+            runs = [generate_cat.get_news_inspiration(start.replace(hour=h)) for h in range(3)]
+        assert all(len(picks) == 2 for picks in runs)
+        # Each run leads with the item the previous run left out.
+        assert runs[1][0] not in runs[0]
+        assert runs[2][0] not in runs[1]
+
+    def test_refresh_merges_into_pool(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        start = datetime(2026, 3, 1, 0, 0, tzinfo=UTC)
+        with mock.patch.object(generate_cat, "fetch_news_inspiration", side_effect=[["old"], ["new", "old"]]):
+            generate_cat.get_news_inspiration(start)
+            generate_cat.get_news_inspiration(start.replace(hour=7))
+        cache = json.loads((tmp_path / "news_cache.json").read_text())
+        assert cache["items"] == ["new", "old"]
+        assert cache["used"] == {"old": "2026-03-01 00:00 UTC", "new": "2026-03-01 07:00 UTC"}
+
+    def test_failed_refresh_falls_back_to_stale_pool(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        start = datetime(2026, 3, 1, 0, 0, tzinfo=UTC)
+        with mock.patch.object(generate_cat, "fetch_news_inspiration", side_effect=[["old"], []]):
+            generate_cat.get_news_inspiration(start)
+            assert generate_cat.get_news_inspiration(start.replace(hour=7)) == ["old"]
+        cache = json.loads((tmp_path / "news_cache.json").read_text())
+        assert cache["fetched_at"] == "2026-03-01 00:00 UTC"
+
+
+class TestRecentPrompts:
+    def _write_months(self, tmp_path):
+        (tmp_path / "cats").mkdir()
+        for month, numbers in (("2026-02", range(1, 16)), ("2026-03", range(16, 21))):
+            details = [{"number": n, "prompt": f"p{n}", "story": f"s{n}"} for n in numbers]
+            (tmp_path / "cats" / f"{month}.json").write_text(json.dumps(details))
+
+    def test_rebuilt_from_newest_months_when_missing(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        self._write_months(tmp_path)
+        records = generate_cat.load_recent_prompts()
+        assert [r["number"] for r in records] == list(range(1, 21))
+        assert (tmp_path / "recent_prompts.json").exists()
+
+    def test_ring_is_bounded_and_deduplicated(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        self._write_months(tmp_path)
+        generate_cat.load_recent_prompts()
+        assert generate_cat.append_recent_prompt({"number": 21, "prompt": "p21", "idea": "i21"})
+        assert generate_cat.append_recent_prompt({"number": 21, "prompt": "p21"})
+        assert not generate_cat.append_recent_prompt({"number": 22})
+        records = json.loads((tmp_path / "recent_prompts.json").read_text())
+        assert len(records) == generate_cat.RECENT_PROMPTS_MAX
+        assert [r["number"] for r in records[-2:]] == [20, 21]
+
+    def test_creative_notes_read_only_the_ring(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        ring = [{"number": n, "prompt": f"p{n}", "story": "", "idea": ""} for n in range(1, 13)]
+        (tmp_path / "recent_prompts.json").write_text(json.dumps(ring))
+        client = mock.Mock()
+        client.models.generate_content.return_value.text = json.dumps({"avoid_list": ["霧"]})
+        with mock.patch.object(generate_cat, "_create_genai_client", return_value=client), \
+             mock.patch.object(generate_cat, "load_monthly_detail", side_effect=AssertionError("read a month file")):
+            notes = generate_cat.maybe_update_creative_notes(15)
+        assert notes["avoid_list"] == ["霧"]
+        contents = client.models.generate_content.call_args.kwargs["contents"]
+        assert "p3" in contents and "p2\n" not in contents
+
+
 class TestPickRandomStyles:
     def test_empty_reference(self):
         with mock.patch.object(generate_cat, "load_style_reference", return_value={}):
@@ -279,12 +398,264 @@ class TestPickRandomStyles:
             assert survivors == {"Animal Portrait", "Watercolor"}  # danmei + 少女 gone; portrait kept
 
 
+# ── Pre-generation Stages ──
+
+
+class TestRunStages:
+    def test_independent_stages_overlap(self):
+        import threading
+
+        barrier = threading.Barrier(2, timeout=5)  # times out unless both run at once
+
+        def stage(name):
+            barrier.wait()
+            return name
+
+        results = generate_cat.run_stages({
+            "a": ((), lambda: stage("a")),
+            "b": ((), lambda: stage("b")),
+            "c": (("a", "b"), lambda a, b: a + b),
+        })
+        assert results == {"a": "a", "b": "b", "c": "ab"}
+
+    def test_unsatisfiable_dependencies(self):
+        with pytest.raises(ValueError, match="x, y"):
+            generate_cat.run_stages({"x": (("y",), lambda y: y), "y": (("x",), lambda x: x)})
+
+    def test_prepare_generation_inputs_feeds_avoid_list_to_styles(self):
+        now = datetime(2026, 3, 1, 5, 0, tzinfo=UTC)
+        with mock.patch.object(generate_cat, "maybe_update_creative_notes", return_value={"avoid_list": ["fog"]}), \
+             mock.patch.object(generate_cat, "select_character", return_value=None), \
+             mock.patch.object(generate_cat, "roll_news_inspiration", return_value=["news"]), \
+             mock.patch.object(generate_cat, "pick_random_styles", return_value={}) as pick:
+            inputs = generate_cat.prepare_generation_inputs(10, now)
+        pick.assert_called_once_with(["fog"])
+        assert inputs == {"creative_notes": {"avoid_list": ["fog"]}, "character": None, "news": ["news"], "styles": {}}
+
+
+# ── Gemini Rate Limiting ──
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestGeminiRateLimiter:
+    def test_no_wait_within_budget(self):
+        clock = FakeClock()
+        limiter = generate_cat.GeminiRateLimiter(rpm=5, clock=clock, sleep=clock.sleep)
+        assert [limiter.acquire() for _ in range(5)] == [0.0] * 5
+        assert clock.slept == []
+
+    def test_waits_once_budget_is_spent(self):
+        clock = FakeClock()
+        limiter = generate_cat.GeminiRateLimiter(rpm=6, burst=1, clock=clock, sleep=clock.sleep)
+        limiter.acquire()
+        assert limiter.acquire() == pytest.approx(10.0)
+        clock.now += 30
+        assert limiter.acquire() == 0.0
+
+    def test_back_off_uses_server_retry_delay(self):
+        clock = FakeClock()
+        limiter = generate_cat.GeminiRateLimiter(rpm=60, clock=clock, sleep=clock.sleep)
+        error = Exception("429 RESOURCE_EXHAUSTED. Please retry in 41.25s.")
+        assert generate_cat._is_rate_limited(error)
+        assert limiter.back_off(error) == 41.25
+        assert limiter.acquire() == pytest.approx(41.25)
+
+    def test_back_off_is_exponential_without_retry_delay(self):
+        clock = FakeClock()
+        limiter = generate_cat.GeminiRateLimiter(rpm=60, clock=clock, sleep=clock.sleep)
+        assert [limiter.back_off(Exception("RESOURCE_EXHAUSTED")) for _ in range(3)] == [2.0, 4.0, 8.0]
+        limiter.succeeded()
+        assert limiter.back_off(Exception("RESOURCE_EXHAUSTED")) == 2.0
+
+    def test_gemini_generate_backs_off_on_429(self, monkeypatch):
+        limiter = mock.Mock()
+        monkeypatch.setattr(generate_cat, "GEMINI_LIMITER", limiter)
+        client = mock.Mock()
+        client.models.generate_content.side_effect = Exception("429 Too Many Requests")
+        with pytest.raises(Exception, match="429"):
+            generate_cat.gemini_generate(client, model="m", contents="c")
+        limiter.acquire.assert_called_once()
+        limiter.back_off.assert_called_once()
+
+        client.models.generate_content.side_effect = None
+        client.models.generate_content.return_value = "ok"
+        assert generate_cat.gemini_generate(client, model="m", contents="c") == "ok"
+        limiter.succeeded.assert_called_once()
+
+
+# ── Hourly Dedup ──
+
+
+class TestAlreadyHasCatThisHour:
+    def test_only_successful_cats_count(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        cats = [
+            {"number": 1, "timestamp": "2026-03-01 04:59 UTC", "status": "success"},
+            {"number": None, "timestamp": "2026-03-01 05:02 UTC", "status": "failed"},
+        ]
+        (tmp_path / "catlist.json").write_text(json.dumps(cats))
+        now = datetime(2026, 3, 1, 5, 30, tzinfo=UTC)
+        assert generate_cat.already_has_cat_this_hour(now) is False
+
+        cats.append({"number": 3, "timestamp": "2026-03-01 05:20 UTC"})
+        (tmp_path / "catlist.json").write_text(json.dumps(cats))
+        assert generate_cat.already_has_cat_this_hour(now) is True
+
+    def test_missing_catlist(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        assert generate_cat.already_has_cat_this_hour(datetime.now(UTC)) is False
+
+
+class TestRunState:
+    CATS: ClassVar[list[dict]] = [
+        {"number": 1, "timestamp": "2026-02-28 23:00 UTC"},
+        {"number": None, "timestamp": "2026-03-01 00:00 UTC", "status": "failed"},
+        {"number": 3, "timestamp": "2026-03-01 01:00 UTC", "status": "success"},
+    ]
+
+    def test_built_from_catlist(self):
+        state = generate_cat.build_run_state(self.CATS)
+        assert state["entries"] == 3 and state["successes"] == 2 and state["failures"] == 1
+        assert state["last_number"] == 3
+        assert state["last_success_hour"] == "2026-03-01 01"
+        assert state["last_month_file"] == "cats/2026-03.json"
+
+    def test_loaded_without_parsing_catlist(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "catlist.json").write_text(json.dumps(self.CATS))
+        assert generate_cat.load_run_state()["entries"] == 3
+        with mock.patch.object(generate_cat, "load_json_list", side_effect=AssertionError("parsed catlist")):
+            assert generate_cat.load_run_state()["entries"] == 3
+
+    def test_rebuilt_when_catlist_changes(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "catlist.json").write_text(json.dumps(self.CATS))
+        generate_cat.load_run_state()
+        (tmp_path / "catlist.json").write_text(json.dumps(self.CATS[:1]))
+        assert generate_cat.load_run_state()["entries"] == 1
+
+    def test_check_repairs_drift(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "catlist.json").write_text(json.dumps(self.CATS))
+        generate_cat.load_run_state()
+        assert generate_cat.check_run_state()
+        state = json.loads((tmp_path / "run_state.json").read_text())
+        (tmp_path / "run_state.json").write_text(json.dumps(dict(state, last_number=99)))
+        assert not generate_cat.check_run_state()
+        assert "last_number = 99, expected 3" in capsys.readouterr().out
+        assert generate_cat.check_run_state()
+
+    def test_advanced_with_each_append(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "catlist.json").write_text(json.dumps(self.CATS))
+        entry = {"number": 4, "timestamp": "2026-03-01 02:00 UTC", "url": "u4", "model": "m", "status": "success"}
+        with mock.patch.object(generate_cat.subprocess, "run", return_value=mock.Mock(returncode=0)):
+            generate_cat.update_catlist_and_push(entry)
+        assert generate_cat.load_run_state()["last_success_hour"] == "2026-03-01 02"
+        assert generate_cat.check_run_state()
+
+
+class TestJournal:
+    CATS: ClassVar[list[dict]] = [{"number": 1, "timestamp": "2026-02-28 23:00 UTC", "url": "u1", "status": "success"}]
+
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "catlist.json").write_text(json.dumps(self.CATS))
+        (tmp_path / "cats").mkdir()
+        (tmp_path / "cats" / "2026-02.json").write_text(json.dumps([{"number": 1, "prompt": "p1"}]))
+        monkeypatch.setattr(generate_cat, "CATLIST_COMPACT_EVERY", 3)
+        with mock.patch.object(generate_cat.subprocess, "run", return_value=mock.Mock(returncode=0)):
+            yield tmp_path
+
+    @staticmethod
+    def _push(number, hour, day="2026-03-01"):
+        generate_cat.update_catlist_and_push({
+            "number": number, "timestamp": f"{day} {hour:02d}:00 UTC", "url": f"u{number}",
+            "model": "m", "status": "success", "prompt": f"p{number}", "story": f"s{number}",
+        })
+
+    def test_runs_append_until_compaction(self, repo):
+        self._push(2, 0)
+        self._push(3, 1)
+        assert json.loads((repo / "catlist.json").read_text()) == self.CATS
+        assert not (repo / "cats" / "2026-03.json").exists()
+        assert len((repo / "journal.jsonl").read_text().splitlines()) == 2
+        assert generate_cat.load_run_state()["entries"] == 3
+        assert generate_cat.already_has_cat_this_hour(datetime(2026, 3, 1, 1, 30, tzinfo=UTC))
+
+        self._push(4, 2)
+        cats = json.loads((repo / "catlist.json").read_text())
+        assert [c["number"] for c in cats] == [1, 2, 3, 4]
+        assert (repo / "docs" / "catlist.json").read_text() == (repo / "catlist.json").read_text()
+        details = json.loads((repo / "cats" / "2026-03.json").read_text())
+        assert [d["number"] for d in details] == [2, 3, 4]
+        assert (repo / "journal.jsonl").read_text() == ""
+        assert generate_cat.check_run_state()
+
+    def test_new_month_compacts_previous_one_first(self, repo):
+        self._push(2, 22, day="2026-02-28")
+        self._push(3, 0)
+        details = json.loads((repo / "cats" / "2026-02.json").read_text())
+        assert [d["number"] for d in details] == [1, 2]
+        assert [r["index"]["number"] for r in generate_cat.read_records(generate_cat.JOURNAL)] == [3]
+        assert generate_cat.load_run_state()["last_number"] == 3
+
+    def test_non_compacting_run_reaches_cli_readers(self, repo, monkeypatch):
+        import httpx
+
+        from catime import cli
+        from catime.utils import http
+
+        today = datetime.now(UTC).strftime("%Y-%m-%d")
+        self._push(2, 0, day=today)
+        generate_cat.compact_journal()
+        published = {p: p.read_bytes() for p in (repo / "docs").rglob("*") if p.is_file() and p.name != "journal.jsonl"}
+        self._push(3, 1, day=today)
+        # The run only appended to the journal; shards and the rollup wait for compaction.
+        assert {p: p.read_bytes() for p in published} == published
+        assert len(json.loads((repo / "catlist.json").read_text())) == 2
+
+        def handler(request):
+            path = repo / "docs" / request.url.path.split("/", 2)[2]
+            if request.url.host.endswith("github.io") and path.is_file():
+                return httpx.Response(200, content=path.read_bytes())
+            return httpx.Response(404)
+
+        for name in ("_detail_cache", "_detail_index_cache", "_detail_loaders", "_journals"):
+            monkeypatch.setattr(cli, name, {})
+        with http.Session(transport=httpx.MockTransport(handler)) as session:
+            monkeypatch.setattr(http, "default_session", lambda: session)
+            cats = cli.load_catlist("o/r")
+            assert len(cats) == 3 and cats[-1]["number"] == 3
+            assert cli.enrich_cat(cats[-1], repo="o/r").story == "s3"
+            assert cli.load_rollup("o/r")["entries"] == 3
+
+    def test_compact_on_demand(self, repo):
+        self._push(2, 0)
+        written = generate_cat.compact_journal()
+        assert "catlist.json" in written and "cats/2026-03.json" in written
+        assert generate_cat.compact_journal() == []
+
+
 # ── GitHub Issue Routing ──
 
 
 class TestMonthlyIssueLookup:
     def test_uses_oldest_duplicate_issue_without_search(self):
-        now = datetime(2026, 5, 27, 0, 0, tzinfo=timezone.utc)
+        now = datetime(2026, 5, 27, 0, 0, tzinfo=UTC)
         calls = []
 
         def fake_run(cmd, capture_output=False, text=False, check=False):
@@ -313,7 +684,7 @@ class TestMonthlyIssueLookup:
         assert "create" not in calls[0]
 
     def test_creates_issue_only_after_successful_empty_lookup(self):
-        now = datetime(2026, 7, 1, 0, 0, tzinfo=timezone.utc)
+        now = datetime(2026, 7, 1, 0, 0, tzinfo=UTC)
         calls = []
 
         def fake_run(cmd, capture_output=False, text=False, check=False):
@@ -340,7 +711,7 @@ class TestMonthlyIssueLookup:
         assert calls[1][:3] == ["gh", "issue", "create"]
 
     def test_lookup_failure_does_not_create_duplicate(self):
-        now = datetime(2026, 5, 27, 0, 0, tzinfo=timezone.utc)
+        now = datetime(2026, 5, 27, 0, 0, tzinfo=UTC)
         calls = []
 
         def fake_run(cmd, capture_output=False, text=False, check=False):
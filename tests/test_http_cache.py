@@ -0,0 +1,149 @@
+import time
+from datetime import UTC, datetime
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def make_session():
+    from catime.utils.http import Session
+
+    sessions = []
+
+    def factory(handler):
+        session = Session(transport=httpx.MockTransport(handler))
+        sessions.append(session)
+        return session
+
+    yield factory
+    for session in sessions:
+        session.close()
+
+
+def test_revalidates_with_etag_and_reuses_body_on_304(make_session):
+    seen = []
+
+    def handler(request):
+        seen.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=b'[{"number": 1}]', headers={"ETag": '"v1"'})
+
+    from catime.utils.http import cached_get_json
+
+    session = make_session(handler)
+    assert cached_get_json("http://example/catlist.json", session=session) == [{"number": 1}]
+    assert cached_get_json("http://example/catlist.json", session=session) == [{"number": 1}]
+    assert "if-none-match" not in seen[0]
+    assert seen[1]["if-none-match"] == '"v1"'
+
+
+
+def test_matching_hash_skips_network(make_session):
+    import hashlib
+
+    body = b'[{"number": 1}]'
+    calls = {"count": 0}
+
+    def handler(request):
+        calls["count"] += 1
+        return httpx.Response(200, content=body)
+
+    from catime.utils.http import cached_get_json
+
+    session = make_session(handler)
+    url = "http://example/catlist/2026-02.json"
+    cached_get_json(url, session=session)
+    assert cached_get_json(url, expected_sha256=hashlib.sha256(body).hexdigest(), session=session) == [{"number": 1}]
+    assert calls["count"] == 1
+    cached_get_json(url, expected_sha256="0" * 64, session=session)
+    assert calls["count"] == 2
+
+def test_immutable_copy_skips_network(make_session):
+    calls = {"count": 0}
+
+    def handler(request):
+        calls["count"] += 1
+        return httpx.Response(200, json={"ok": True})
+
+    from catime.utils.http import cached_get_json
+
+    session = make_session(handler)
+    url = "http://example/cats/2026-02.json"
+    cached_get_json(url, session=session)
+    assert cached_get_json(url, immutable_after=time.time() - 60, session=session) == {"ok": True}
+    assert calls["count"] == 1
+    # A copy fetched before the month closed must still be revalidated.
+    cached_get_json(url, immutable_after=time.time() + 60, session=session)
+    assert calls["count"] == 2
+
+
+def test_404_is_remembered_until_ttl(make_session, monkeypatch):
+    from catime.utils import http
+
+    calls = {"count": 0}
+
+    def handler(request):
+        calls["count"] += 1
+        return httpx.Response(404)
+
+    session = make_session(handler)
+    url = "http://example/catlist/manifest.json"
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError) as excinfo:
+            http.cached_get_json(url, session=session)
+        assert excinfo.value.response.status_code == 404
+    assert calls["count"] == 1
+    monkeypatch.setattr(http, "MISSING_TTL", 0.0)
+    with pytest.raises(httpx.HTTPStatusError):
+        http.cached_get_json(url, session=session)
+    assert calls["count"] == 2
+
+
+def test_interrupted_download_keeps_cached_copy(make_session, isolated_cache):
+    from catime.utils.http import cached_get_file
+
+    class Torn(httpx.SyncByteStream):
+        def __iter__(self):
+            yield b'[{"number": 1}, '
+            raise httpx.ReadError("connection reset")
+
+    bodies = iter([httpx.Response(200, content=b'[{"number": 1}]'), httpx.Response(200, stream=Torn())])
+    session = make_session(lambda request: next(bodies))
+    url = "http://example/catlist.json"
+    path = cached_get_file(url, session=session)
+    with pytest.raises(httpx.ReadError):
+        cached_get_file(url, session=session, max_retries=1)
+    assert path.read_bytes() == b'[{"number": 1}]'
+    assert not list(path.parent.glob("*.tmp"))
+
+
+def test_async_cache_shares_files_with_sync(make_session):
+    import asyncio
+
+    from catime.utils.http import AsyncSession, async_cached_get_json, cached_get_json
+
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=b'[{"number": 1}]', headers={"ETag": '"v1"'})
+
+    async def run():
+        async with AsyncSession(transport=httpx.MockTransport(handler)) as session:
+            return await async_cached_get_json(url, session)
+
+    url = "http://example/catlist.json"
+    assert asyncio.run(run()) == [{"number": 1}]
+    assert cached_get_json(url, session=make_session(handler)) == [{"number": 1}]
+    assert seen == [None, '"v1"']
+
+
+def test_month_closed_since():
+    from catime.timeline import month_closed_since
+
+    assert month_closed_since("2025-12") == datetime(2026, 1, 2, tzinfo=UTC).timestamp()
+    assert month_closed_since(datetime.now(UTC).strftime("%Y-%m")) is None
@@ -1,29 +1,116 @@
 import httpx
+import pytest
 
 
-def test_safe_get_json_retries(monkeypatch):
-    calls = {"count": 0}
-
-    class DummyResp:
-        def __init__(self, data):
-            self._data = data
-            self.status_code = 200
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    from catime.utils import http
+    monkeypatch.setattr(http.time, "sleep", lambda s: None)
 
-        def raise_for_status(self):
-            return None
 
-        def json(self):
-            return self._data
+def test_safe_get_json_retries():
+    calls = {"count": 0}
 
-    def fake_get(url, timeout=None, **kwargs):
+    def handler(request):
         if calls["count"] < 2:
             calls["count"] += 1
-            raise httpx.TimeoutException("timeout")
-        return DummyResp({"ok": True})
-
-    monkeypatch.setattr(httpx, "get", fake_get)
+            raise httpx.TimeoutException("timeout", request=request)
+        return httpx.Response(200, json={"ok": True})
 
-    from catime.utils.http import safe_get_json
+    from catime.utils.http import Session, safe_get_json
 
-    res = safe_get_json("http://example", timeout=0.1, max_retries=3)
+    with Session(transport=httpx.MockTransport(handler)) as session:
+        res = safe_get_json("http://example", timeout=0.1, max_retries=3, session=session)
     assert res == {"ok": True}
+
+
+def test_retries_429_honouring_retry_after(monkeypatch):
+    from catime.utils import http
+    slept = []
+    monkeypatch.setattr(http.time, "sleep", slept.append)
+    responses = iter([
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(200, json=[1, 2]),
+    ])
+
+    with http.Session(transport=httpx.MockTransport(lambda request: next(responses))) as session:
+        assert http.safe_get_json("http://example", session=session) == [1, 2]
+    assert slept == [2.0]
+
+
+def test_gives_up_on_long_retry_after_and_404():
+    from catime.utils.http import Session, safe_get_json
+
+    calls = {"count": 0}
+
+    def handler(request):
+        calls["count"] += 1
+        if request.url.path == "/missing":
+            return httpx.Response(404)
+        return httpx.Response(429, headers={"Retry-After": "3600"})
+
+    with Session(transport=httpx.MockTransport(handler)) as session:
+        with pytest.raises(httpx.HTTPStatusError):
+            safe_get_json("http://example/throttled", session=session)
+        with pytest.raises(httpx.HTTPStatusError):
+            safe_get_json("http://example/missing", session=session)
+    assert calls["count"] == 2
+
+
+def test_backoff_is_bounded_and_jittered():
+    from catime.utils.http import BACKOFF_MAX, _backoff_delay
+
+    delays = [_backoff_delay(attempt) for attempt in range(10)]
+    assert all(0 <= d <= BACKOFF_MAX for d in delays)
+
+
+def test_session_reuses_one_connection_pool():
+    import http.server
+    import threading
+
+    from catime.utils.http import Session, default_session
+
+    assert default_session() is default_session()
+
+    connections = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_GET(self):
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with Session() as session:
+            for month in ("2026-02", "2026-03", "2026-04"):
+                assert session.get(f"http://127.0.0.1:{server.server_port}/cats/{month}.json").json() == {"ok": True}
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert len(connections) == 1
+
+
+def test_async_session_get_json():
+    import asyncio
+
+    from catime.utils.http import AsyncSession
+
+    async def run():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"month": request.url.path}))
+        async with AsyncSession(transport=transport) as session:
+            return await asyncio.gather(*(session.get_json(f"http://example/{m}") for m in ("a", "b")))
+
+    assert asyncio.run(run()) == [{"month": "/a"}, {"month": "/b"}]
@@ -0,0 +1,23 @@
+import json
+
+from catime.journal import append_record, index_entries, read_records
+
+
+def test_append_and_read(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    assert read_records(path) == []
+    append_record(path, {"number": 1, "timestamp": "2026-03-01 00:00 UTC"}, {"number": 1, "story": "貓"})
+    append_record(path, {"number": None, "status": "failed"})
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2 and "貓" in lines[0]
+    records = read_records(path)
+    assert records[0]["detail"] == {"number": 1, "story": "貓"}
+    assert "detail" not in records[1]
+    assert index_entries(records) == [{"number": 1, "timestamp": "2026-03-01 00:00 UTC"}, {"number": None, "status": "failed"}]
+
+
+def test_torn_line_is_skipped_and_not_extended(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text(json.dumps({"index": {"number": 1}}) + "\n" + '{"index": {"num')
+    append_record(path, {"number": 2})
+    assert index_entries(read_records(path)) == [{"number": 1}, {"number": 2}]
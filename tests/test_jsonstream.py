@@ -0,0 +1,34 @@
+import io
+import json
+
+import pytest
+
+from catime.utils.jsonstream import iter_json_array
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 4096])
+def test_matches_json_load_across_chunk_boundaries(chunk_size):
+    data = [
+        {"number": 1, "error": 'has ] and , and "quotes" and {braces}'},
+        12345, -2.5e-3, "str", [1, [2]], None, True, {},
+    ]
+    text = json.dumps(data, indent=2, ensure_ascii=False)
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == data
+
+
+def test_empty_array():
+    assert list(iter_json_array(io.StringIO(" [ ] "))) == []
+
+
+@pytest.mark.parametrize("text", ["", "{}", "[1 2]", "[1,", "[1"])
+def test_malformed_input_raises(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), 1))
+
+
+def test_stops_reading_when_consumer_stops():
+    text = json.dumps(list(range(10_000)))
+    fp = io.StringIO(text)
+    first = next(iter_json_array(fp, chunk_size=64))
+    assert first == 0
+    assert fp.tell() <= 64
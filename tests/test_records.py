@@ -0,0 +1,40 @@
+import pytest
+
+from catime.records import Cat
+
+
+def test_from_dict_keeps_index_fields_and_defaults_status():
+    cat = Cat.from_dict({"number": 3, "timestamp": "2026-03-01 00:00 UTC", "url": "u3", "model": "m"})
+    assert (cat.number, cat.month, cat.model, cat.status) == (3, "2026-03", "m", "success")
+    assert not cat.failed
+    assert cat.story is None
+    with pytest.raises(AttributeError):
+        _ = cat.nonexistent
+    with pytest.raises(AttributeError):
+        cat.extra = 1
+
+
+def test_detail_loads_once_on_first_access():
+    calls = []
+
+    def loader(month, number):
+        calls.append((month, number))
+        return {"number": number, "story": "s", "prompt": "p"}
+
+    cat = Cat.from_dict({"number": 3, "timestamp": "2026-03-01 00:00 UTC"}, loader)
+    assert calls == []
+    assert cat.story == "s" and cat.prompt == "p" and cat.idea is None
+    assert calls == [("2026-03", 3)]
+    assert cat.to_dict()["story"] == "s"
+
+
+def test_failed_cat_never_loads_detail():
+    cat = Cat.from_dict({"number": None, "timestamp": "2026-03-01 00:00 UTC", "status": "failed"},
+                        lambda *a: pytest.fail("loaded"))
+    assert cat.failed and cat.story is None
+
+
+def test_merged_entry_needs_no_loader():
+    cat = Cat.from_dict({"number": 1, "timestamp": "2026-02-01 00:00 UTC", "idea": "nap"})
+    assert cat.idea == "nap"
+    assert cat.to_dict() == {"number": 1, "timestamp": "2026-02-01 00:00 UTC", "status": "success", "idea": "nap"}
@@ -0,0 +1,78 @@
+from catime.search import SearchIndex, tokenize
+
+
+def test_tokenize_english_words_and_cjk_bigrams():
+    assert tokenize("Bubble TEA, 2026!") == ["bubble", "tea", "2026"]
+    assert tokenize("珍珠奶茶") == ["珍珠", "珠奶", "奶茶"]
+    assert tokenize("貓") == ["貓"]
+
+
+CATS = [
+    {"number": 1, "timestamp": "2025-01-05 10:00 UTC", "url": "u1", "model": "m", "title": "雨巷漫步"},
+    {"number": None, "timestamp": "2025-01-05 11:00 UTC", "status": "failed"},
+    {"number": 3, "timestamp": "2025-02-01 00:00 UTC", "url": "u3", "model": "m", "title": "奶茶店的午後"},
+]
+DETAILS = {
+    "2025-01": [{"number": 1, "idea": "貓在雨中散步", "prompt": "a cat walking in the rain", "story": ""}],
+    "2025-02": [{"number": 3, "idea": "貓在珍珠奶茶店", "prompt": "a cat sipping bubble tea", "story": "tea time"}],
+}
+
+
+def _build(fetched):
+    index = SearchIndex.for_source("owner/repo")
+
+    def fetch(month):
+        fetched.append(month)
+        return DETAILS[month]
+
+    index.update(CATS, fetch)
+    return index
+
+
+def test_search_ranks_matching_cats():
+    index = _build([])
+    results = index.search("bubble tea")
+    assert [r["number"] for r in results] == [3]
+    assert results[0]["url"] == "u3"
+    assert results[0]["title"] == "奶茶店的午後"
+    assert [r["number"] for r in index.search("珍珠奶茶")] == [3]
+    # Cats matching more query terms rank first.
+    assert [r["number"] for r in index.search("cat tea")] == [3, 1]
+    assert index.search("nothing-like-this") == []
+
+
+def test_closed_months_are_not_reread():
+    fetched = []
+    _build(fetched)
+    assert fetched == ["2025-01", "2025-02"]
+
+    fetched.clear()
+    reopened = SearchIndex.for_source("owner/repo")
+    reopened.update(CATS, lambda month: fetched.append(month) or DETAILS[month])
+    assert fetched == []
+    assert [r["number"] for r in reopened.search("雨中")] == [1]
+
+
+def test_changed_open_month_is_reindexed(monkeypatch):
+    from catime import search
+
+    monkeypatch.setattr(search, "month_closed_since", lambda month: None)
+    index = _build([])
+    cats = CATS + [{"number": 4, "timestamp": "2025-02-02 00:00 UTC", "url": "u4", "title": "燈塔"}]
+    details_next = {**DETAILS, "2025-02": DETAILS["2025-02"] + [{"number": 4, "idea": "lighthouse keeper cat"}]}
+    rewritten = index.update(cats, lambda month: details_next[month])
+    assert rewritten == ["2025-02"]
+    assert [r["number"] for r in index.search("lighthouse")] == [4]
+
+
+def test_failed_month_fetch_is_retried():
+    index = SearchIndex.for_source("owner/repo")
+    index.update(CATS, lambda month: None if month == "2025-01" else DETAILS[month])
+    assert index.pending_months(CATS) == ["2025-01"]
+    assert index.is_stale()
+    assert index.search("雨中") == []
+
+    fetched = []
+    assert index.update(CATS, lambda month: fetched.append(month) or DETAILS[month]) == ["2025-01"]
+    assert fetched == ["2025-01"]
+    assert [r["number"] for r in index.search("雨中")] == [1]
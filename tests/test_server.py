@@ -0,0 +1,124 @@
+import gzip
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from catime.server import IMMUTABLE, REVALIDATE, FileCache, cache_control, make_server
+
+CURRENT = time.strftime("%Y-%m", time.gmtime())
+PAYLOAD = json.dumps([{"number": n, "story": "a long cat story " * 20} for n in range(20)]).encode()
+
+
+@pytest.fixture
+def docs(tmp_path):
+    (tmp_path / "cats").mkdir()
+    (tmp_path / "index.html").write_text("<html>cats</html>")
+    (tmp_path / "catlist.json").write_bytes(PAYLOAD)
+    (tmp_path / "cats" / "2025-01.json").write_bytes(PAYLOAD)
+    (tmp_path / "cats" / f"{CURRENT}.json").write_bytes(PAYLOAD)
+    return tmp_path
+
+
+@pytest.fixture
+def server(docs):
+    srv = make_server(docs, port=0)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def conn(server):
+    c = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    yield c
+    c.close()
+
+
+def fetch(conn, path, **headers):
+    conn.request("GET", path, headers=headers)
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def test_cache_control():
+    assert cache_control("cats/2025-01.json") == IMMUTABLE
+    assert cache_control(f"cats/{CURRENT}.json") == REVALIDATE
+    assert cache_control("catlist.json") == REVALIDATE
+    assert cache_control("icon-192.png").startswith("public, max-age=")
+
+
+def test_gzip_variant_and_keepalive(conn):
+    response, body = fetch(conn, "/catlist.json", **{"Accept-Encoding": "gzip"})
+    assert response.status == 200
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert response.getheader("Vary") == "Accept-Encoding"
+    assert gzip.decompress(body) == PAYLOAD
+
+    # Same connection, no encoding: identity body.
+    response, body = fetch(conn, "/catlist.json")
+    assert response.getheader("Content-Encoding") is None
+    assert body == PAYLOAD
+
+
+def test_precompressed_file_on_disk_wins(docs, conn):
+    (docs / "catlist.json.gz").write_bytes(gzip.compress(b"[]"))
+    _, body = fetch(conn, "/catlist.json", **{"Accept-Encoding": "gzip"})
+    assert gzip.decompress(body) == b"[]"
+
+
+def test_etag_revalidation(conn):
+    response, _ = fetch(conn, "/cats/2025-01.json")
+    etag = response.getheader("ETag")
+    assert response.getheader("Cache-Control") == IMMUTABLE
+    response, body = fetch(conn, "/cats/2025-01.json", **{"If-None-Match": etag})
+    assert response.status == 304
+    assert body == b""
+
+
+def test_range_requests(conn):
+    response, body = fetch(conn, "/catlist.json", Range="bytes=0-9")
+    assert response.status == 206
+    assert body == PAYLOAD[:10]
+    assert response.getheader("Content-Range") == f"bytes 0-9/{len(PAYLOAD)}"
+
+    response, body = fetch(conn, "/catlist.json", Range="bytes=-5")
+    assert body == PAYLOAD[-5:]
+
+    response, _ = fetch(conn, "/catlist.json", Range=f"bytes={len(PAYLOAD)}-")
+    assert response.status == 416
+
+    response, _ = fetch(conn, "/catlist.json", Range="bytes=-0")
+    assert response.status == 416
+    assert response.getheader("Content-Range") == f"bytes */{len(PAYLOAD)}"
+
+    # last < first is not a valid range: ignore it and send everything.
+    response, body = fetch(conn, "/catlist.json", Range="bytes=5-3")
+    assert response.status == 200
+    assert body == PAYLOAD
+
+
+def test_directory_index_and_missing(conn):
+    response, body = fetch(conn, "/")
+    assert response.status == 200 and b"cats" in body
+    response, _ = fetch(conn, "/nope.json")
+    assert response.status == 404
+
+
+def test_file_cache_reloads_on_change_and_evicts():
+    cache = FileCache(max_bytes=10)
+    loads = []
+
+    def loader(data):
+        return lambda: loads.append(data) or data
+
+    assert cache.get("a", "identity", (1, 1), loader(b"aaaa")) == b"aaaa"
+    assert cache.get("a", "identity", (1, 1), loader(b"new")) == b"aaaa"
+    assert cache.get("a", "identity", (2, 2), loader(b"new")) == b"new"
+    cache.get("b", "identity", (1, 1), loader(b"bbbbbbbb"))
+    assert cache.get("a", "identity", (2, 2), loader(b"again")) == b"again"
+    assert loads == [b"aaaa", b"new", b"bbbbbbbb", b"again"]
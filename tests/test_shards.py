@@ -0,0 +1,62 @@
+import json
+
+from catime.shards import MANIFEST_NAME, ShardedCatlist, build_shards, write_shards
+
+CATS = [
+    {"number": 1, "timestamp": "2026-02-27 10:00 UTC"},
+    {"number": None, "timestamp": "2026-02-28 11:00 UTC", "status": "failed"},
+    {"number": 3, "timestamp": "2026-03-01 00:00 UTC"},
+    {"number": 4, "timestamp": "2026-03-01 01:00 UTC"},
+    {"number": None, "timestamp": "2026-04-01 00:00 UTC", "status": "failed"},
+]
+
+
+def test_build_shards_manifest():
+    shards, manifest = build_shards(CATS)
+    assert sorted(shards) == ["2026-02", "2026-03", "2026-04"]
+    assert manifest["total"] == 5
+    assert manifest["latest"] == CATS[-1]
+    assert manifest["months"]["2026-03"] | {"sha256": None} == {
+        "offset": 2, "count": 2, "first": 3, "last": 4, "sha256": None,
+    }
+    assert manifest["months"]["2026-04"]["first"] is None
+    assert json.loads(shards["2026-02"]) == CATS[:2]
+
+
+def test_write_shards_rewrites_only_changed_months(tmp_path):
+    written = write_shards(CATS[:4], tmp_path)
+    assert sorted(p.name for p in written) == ["2026-02.json", "2026-03.json", MANIFEST_NAME]
+
+    written = write_shards(CATS, tmp_path)
+    assert sorted(p.name for p in written) == ["2026-04.json", MANIFEST_NAME]
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert manifest["total"] == 5
+
+
+def test_sharded_catlist_behaves_like_list():
+    shards, manifest = build_shards(CATS)
+    loads = []
+
+    def load(months):
+        loads.append(sorted(months))
+        return {m: json.loads(shards[m]) for m in months}
+
+    cats = ShardedCatlist(manifest, load)
+    assert len(cats) == 5
+    assert cats[-1] == CATS[-1] and loads == []
+    assert cats[2] == CATS[2] and loads == [["2026-03"]]
+    assert cats[1:4] == CATS[1:4]
+    assert loads[-1] == ["2026-02"]
+    assert cats[::2] == CATS[::2]
+    assert cats.months("2026-03", "2026-04") == CATS[2:]
+    assert list(cats) == CATS
+
+
+def test_sharded_catlist_appends_pending_entries():
+    shards, manifest = build_shards(CATS[:3])
+    cats = ShardedCatlist(manifest, lambda months: {m: json.loads(shards[m]) for m in months}, pending=CATS[2:])
+    assert len(cats) == 5  # CATS[2] is already in the shards
+    assert cats[-1] == CATS[-1] and cats[3] == CATS[3]
+    assert cats[1:4] == CATS[1:4]
+    assert cats.months("2026-03", "2026-03") == CATS[2:4]
+    assert list(cats) == CATS
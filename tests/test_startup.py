@@ -0,0 +1,42 @@
+"""Cold-start budget for local CLI queries, measured with -X importtime."""
+
+import subprocess
+import sys
+
+# Import time the CLI may add on top of a bare interpreter for `catime --local N`.
+# Generous enough for slow CI runners; pulling httpx in alone blows through it.
+COLD_START_BUDGET_MS = 60
+
+LOCAL_QUERY = "import sys; sys.argv = ['catime', '--local', '1']; from catime.cli import main; main()"
+
+
+def _import_times(code: str) -> dict[str, int]:
+    """Map module name -> self import time in microseconds for a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def test_local_query_does_not_import_httpx():
+    modules = _import_times(LOCAL_QUERY)
+    assert "catime.cli" in modules
+    assert "httpx" not in modules
+    assert "catime.utils.http" not in modules
+
+
+def test_local_query_cold_start_budget():
+    baseline = _import_times("pass")
+    # Best of three to keep scheduler noise out of the measurement.
+    added_ms = min(
+        sum(us for name, us in _import_times(LOCAL_QUERY).items() if name not in baseline) / 1000
+        for _ in range(3)
+    )
+    assert added_ms < COLD_START_BUDGET_MS, f"cold start added {added_ms:.1f} ms of imports"
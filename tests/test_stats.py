@@ -0,0 +1,84 @@
+import json
+import sys
+
+from catime import cli
+from catime.stats import (
+    ROLLUP_PATH,
+    empty_rollup,
+    load_rollup,
+    parse_model,
+    reason_category,
+    summarize,
+    update_rollup,
+    write_rollup,
+)
+
+CATS = [
+    {"number": 1, "timestamp": "2026-02-27 10:00 UTC", "model": "gemini-3-pro-image-preview",
+     "character_name": "麻糬", "season": "spring"},
+    {"number": None, "timestamp": "2026-02-27 11:00 UTC", "status": "failed", "model": "all failed",
+     "error": "Failed to generate any images - All models failed. Last error: API Error 429: quota"},
+    {"number": 3, "timestamp": "2026-03-01 00:00 UTC",
+     "model": "gemini-2.5-flash-image (fallback from gemini-3-pro-image-preview, reason: API 503: overloaded (try later))"},
+    {"number": 4, "timestamp": "2026-03-01 01:00 UTC",
+     "model": "gemini-3.1-flash-image-preview (fallback from gemini-3-pro-image-preview, reason: timeout after 240.0s)"
+              " (fallback from codex: codex-image-service HTTP 502: {\"detail\": \"bad gateway\"})",
+     "character_name": "麻糬"},
+]
+
+
+def test_parse_model_chains():
+    assert parse_model("gemini-3-pro-image-preview") == ("gemini-3-pro-image-preview", [])
+    assert parse_model(CATS[2]["model"]) == (
+        "gemini-2.5-flash-image", [("gemini-3-pro-image-preview", "API 503: overloaded (try later)")],
+    )
+    model, fallbacks = parse_model(CATS[3]["model"])
+    assert model == "gemini-3.1-flash-image-preview"
+    assert [source for source, _ in fallbacks] == ["gemini-3-pro-image-preview", "codex"]
+    assert [reason_category(reason) for _, reason in fallbacks] == ["timeout after 240.0s", "codex-image-service HTTP 502"]
+
+
+def test_reason_category():
+    assert reason_category("API 503: This model is overloaded") == "API 503"
+    assert reason_category("API 429: quota\nretry in 41s") == "API 429"
+    assert reason_category("") == "unknown"
+
+
+def test_rollup_counts():
+    totals = summarize(update_rollup(empty_rollup(), CATS))["totals"]
+    assert (totals["total"], totals["success"], totals["failed"], totals["fallbacks"]) == (4, 3, 1, 2)
+    assert totals["errors"] == {"API Error 429": 1}
+    assert totals["fallback_from"] == {"gemini-3-pro-image-preview": 2, "codex": 1}
+    assert totals["characters"] == {"麻糬": 2}
+    assert totals["seasons"] == {"spring": 1}
+
+
+def test_rollup_is_incremental(tmp_path):
+    path = tmp_path / ROLLUP_PATH
+    write_rollup(path, update_rollup(load_rollup(path), CATS[:2]))
+    write_rollup(path, update_rollup(load_rollup(path), CATS))
+    assert load_rollup(path) == update_rollup(empty_rollup(), CATS)
+    assert load_rollup(path)["entries"] == 4
+
+
+def test_rollup_rebuilds_when_catlist_rewritten():
+    rollup = update_rollup(empty_rollup(), CATS)
+    rewritten = [dict(CATS[0], timestamp="2026-01-01 00:00 UTC")]
+    assert update_rollup(rollup, rewritten) == update_rollup(empty_rollup(), rewritten)
+
+
+def test_summarize_periods_and_range():
+    rollup = update_rollup(empty_rollup(), CATS)
+    assert list(summarize(rollup)["periods"]) == ["2026-02", "2026-03"]
+    by_day = summarize(rollup, start="2026-03-01", by="day")
+    assert list(by_day["periods"]) == ["2026-03-01"]
+    assert by_day["totals"]["total"] == 2
+
+
+def test_cmd_stats_falls_back_to_catlist(monkeypatch, capsys):
+    monkeypatch.setattr(cli, "_fetch_json_with_fallback", lambda *a, **k: None)
+    monkeypatch.setattr(cli, "fetch_catlist", lambda repo: CATS)
+    monkeypatch.setattr(sys, "argv", ["catime", "stats", "--json"])
+    cli.main()
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["totals"]["total"] == 4
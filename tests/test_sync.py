@@ -0,0 +1,78 @@
+import json
+import time
+
+import httpx
+import pytest
+
+from catime.sync import Mirror
+from catime.utils.http import Session
+
+CATLIST = [
+    {"number": 1, "timestamp": "2025-01-31 23:00 UTC", "url": "u1"},
+    {"number": None, "timestamp": "2025-02-01 00:00 UTC", "status": "failed"},
+    {"number": 3, "timestamp": f"{time.strftime('%Y-%m', time.gmtime())}-01 00:00 UTC", "url": "u3"},
+]
+CURRENT = CATLIST[2]["timestamp"][:7]
+JOURNALED = {"number": 4, "timestamp": f"{CURRENT}-01 01:00 UTC", "url": "u4"}
+FILES = {
+    "catlist.json": CATLIST,
+    "characters/index.json": {"characters": [{"id": "mochi", "file": "mochi.json"}]},
+    "characters/mochi.json": {"id": "mochi"},
+    "cats/2025-01.json": [{"number": 1, "story": "s1"}],
+    f"cats/{CURRENT}.json": [{"number": 3, "story": "s3"}],
+    "journal.jsonl": json.dumps({"index": JOURNALED, "detail": {"number": 4, "story": "s4"}}) + "\n",
+}
+
+
+@pytest.fixture
+def server():
+    requests = []
+
+    def handler(request):
+        relpath = request.url.path.split("/", 2)[2] if request.url.host.endswith("github.io") else None
+        requests.append((request.url.host, relpath))
+        if relpath not in FILES:
+            return httpx.Response(404)
+        body = FILES[relpath]
+        body = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        etag = f'"{hash(body)}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, content=body, headers={"ETag": etag})
+
+    with Session(transport=httpx.MockTransport(handler)) as session:
+        yield session, requests
+
+
+def test_first_sync_mirrors_everything(tmp_path, server):
+    session, _ = server
+    report = Mirror(tmp_path, "owner/repo", session=session).sync()
+    assert sorted(report.updated) == sorted(FILES)
+    assert report.missing == ["cats/2025-02.json"]
+    assert json.loads((tmp_path / "cats/2025-01.json").read_text()) == FILES["cats/2025-01.json"]
+
+
+def test_resync_revalidates_open_files_and_skips_closed_months(tmp_path, server):
+    session, requests = server
+    Mirror(tmp_path, "owner/repo", session=session).sync()
+    requests.clear()
+
+    report = Mirror(tmp_path, "owner/repo", session=session).sync()
+    assert report.updated == []
+    assert sorted(report.skipped) == ["cats/2025-01.json", "cats/2025-02.json"]
+    assert f"cats/{CURRENT}.json" in report.unchanged
+    assert ("owner.github.io", "cats/2025-01.json") not in requests
+
+
+def test_local_queries_use_the_mirror(tmp_path, monkeypatch, server):
+    from catime import cli
+
+    for name in ("_detail_cache", "_detail_index_cache", "_archives"):
+        monkeypatch.setattr(cli, name, {})
+    session, _ = server
+    mirror = tmp_path / "mirror"
+    Mirror(mirror, "owner/repo", session=session).sync()
+    monkeypatch.setenv("CATIME_MIRROR_DIR", str(mirror))
+    assert cli._local_root() == mirror
+    assert cli.load_local_catlist() == CATLIST + [JOURNALED]
+    assert cli.fetch_detail_index(CURRENT, local=True)[4]["story"] == "s4"
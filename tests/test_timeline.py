@@ -0,0 +1,42 @@
+from catime.timeline import TimestampIndex
+
+
+def _cat(ts, number=None, status="success"):
+    return {"timestamp": ts, "number": number, "status": status}
+
+
+def test_prefix_and_date_range_on_chronological_list():
+    cats = [
+        _cat("2026-02-28 23:10 UTC", 1),
+        _cat("2026-03-01 00:05 UTC", None, "failed"),
+        _cat("2026-03-01 00:40 UTC", 3),
+        _cat("2026-03-02 12:00 UTC", 4),
+        _cat("2026-04-01 00:00 UTC", 5),
+    ]
+    index = TimestampIndex(cats)
+    assert index.prefix("2026-03-01") == [1, 2]
+    assert index.prefix("2026-03-01 00:") == [1, 2]
+    assert index.prefix("2026-03-") == [1, 2, 3]
+    assert index.dates("2026-02-28", "2026-03-01") == [0, 1, 2]
+    assert index.prefix("2026-05") == []
+
+
+def test_unsorted_and_malformed_entries():
+    cats = [
+        _cat("2026-03-02 10:00 UTC", 2),
+        "not a dict",
+        _cat("2026-03-01 10:00 UTC", 1),
+        {"number": 9},
+    ]
+    index = TimestampIndex(cats)
+    assert len(index) == 2
+    assert index.prefix("2026-03") == [2, 0]
+
+
+def test_scales_to_large_catlists():
+    cats = [_cat(f"2026-{m:02d}-{d:02d} {h:02d}:00 UTC", n)
+            for n, (m, d, h) in enumerate(
+                ((m, d, h) for m in range(1, 13) for d in range(1, 29) for h in range(24)), 1)]
+    cats = cats * 25  # ~200k entries, no longer sorted
+    index = TimestampIndex(cats)
+    assert len(index.prefix("2026-07-04 05:")) == 25
@@ -0,0 +1,105 @@
+import json
+import sys
+
+import httpx
+import pytest
+
+from catime import cli
+from catime.utils import timings
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    from catime.utils import http
+
+    monkeypatch.setattr(http.time, "sleep", lambda s: None)
+    timings.enable()
+    yield
+    timings.disable()
+
+
+def test_disabled_records_nothing():
+    timings.record("phase", "x")
+    with timings.phase("phase", "y"):
+        pass
+    assert not timings.enabled()
+
+
+def test_http_attempts_retries_and_json(recording, capsys):
+    from catime.utils.http import Session, safe_get_json
+
+    responses = iter([httpx.Response(503), httpx.Response(200, json={"ok": True})])
+    with Session(transport=httpx.MockTransport(lambda request: next(responses))) as session:
+        assert safe_get_json("http://example/a.json", session=session) == {"ok": True}
+
+    timings.report("json")
+    records = json.loads(capsys.readouterr().err)["records"]
+    assert [(r["kind"], r.get("status"), r.get("attempt")) for r in records] == [
+        ("http", 503, 1), ("retry", None, 1), ("http", 200, 2), ("json", None, None),
+    ]
+    assert records[3]["bytes"] == len(b'{"ok":true}')
+
+
+def test_cache_outcomes(recording, capsys, tmp_path):
+    from catime.utils.http import Session, cached_get_json
+
+    def handler(request):
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=[1], headers={"etag": '"v1"'})
+
+    with Session(transport=httpx.MockTransport(handler)) as session:
+        for _ in range(2):
+            cached_get_json("http://example/c.json", session=session, cache_root=tmp_path)
+    timings.report("table")
+    err = capsys.readouterr().err
+    assert "miss  http://example/c.json" in err
+    assert "not modified  http://example/c.json" in err
+
+
+def test_fallback_is_recorded(recording, capsys):
+    def fetch(url, **kwargs):
+        if "pages" in url:
+            raise httpx.ConnectError("down")
+        return [1]
+
+    assert cli._fetch_with_fallback(fetch, "https://pages/x.json", "https://raw/x.json") == [1]
+    timings.report("table")
+    assert "fell back to raw for https://pages/x.json (pages: ConnectError: down)" in capsys.readouterr().err
+
+
+def test_http_trace_sums_phases():
+    trace = timings.HttpTrace()
+    for event in ("connection.connect_tcp", "http11.receive_response_body", "http11.receive_response_body"):
+        trace(f"{event}.started", {})
+        trace(f"{event}.complete", {})
+    trace("connection.start_tls.started", {})
+    assert set(trace.ms) == {"connect", "transfer"}
+
+
+@pytest.mark.parametrize("argv,env,expected", [
+    (["catime", "--timings", "42"], None, "table"),
+    (["catime", "search", "cat", "--timings=json"], None, "json"),
+    (["catime", "--timings", "json", "latest"], None, "json"),
+    (["catime", "42"], "1", "table"),
+    (["catime", "42"], "json", "json"),
+    (["catime", "42"], None, None),
+])
+def test_pop_timings_flag(monkeypatch, argv, env, expected):
+    if env is None:
+        monkeypatch.delenv(timings.ENV_VAR, raising=False)
+    else:
+        monkeypatch.setenv(timings.ENV_VAR, env)
+    assert cli._pop_timings_flag(argv) == expected
+    assert not any(arg.startswith("--timings") or arg in timings.FORMATS for arg in argv)
+
+
+def test_main_reports_phases(monkeypatch, capsys):
+    cats = [{"number": 1, "timestamp": "2026-03-01 00:00 UTC", "url": "u"}]
+    monkeypatch.setattr(cli, "load_catlist", lambda repo: cats)
+    monkeypatch.setattr(cli, "fetch_detail", lambda month, **kwargs: [])
+    monkeypatch.setattr(sys, "argv", ["catime", "1", "--timings=json"])
+    cli.main()
+    report = json.loads(capsys.readouterr().err)
+    assert [r["name"] for r in report["records"]] == ["load catlist", "enrich"]
+    assert not timings.enabled()